@@ -0,0 +1,100 @@
+"""Time rendering many tables from slow storage with and without asyncio.
+
+The script writes `--files` synthetic result files and renders
+`--tables` tables of three columns each from them, first one after the
+other with `Renderer.render`, and then concurrently with
+`render_batch_async`.  To stand in for network-mounted storage, every
+read of a result file is delayed by `--latency-ms` milliseconds.
+
+Usage:
+
+    python benchmarks/bench_async_render.py --tables 30 --latency-ms 50
+
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from unittest.mock import patch
+
+from workload import Workload, write_workload
+
+import tomltable
+from tomltable.renderer import AsyncJsonLoader, Renderer, render_batch_async
+
+COLUMNS = 3
+
+
+def make_slow_loader(latency: float) -> Callable[[str, str], dict]:
+    """Return `load_json_file` with a delay before every read."""
+    def slow_load_json_file(filename: str, backend: str = "auto") -> dict:
+        time.sleep(latency)
+        return tomltable.load_json_file(filename, backend)
+
+    return slow_load_json_file
+
+
+async def render_concurrently(
+    tables: list[tuple[Renderer, list[str]]],
+    max_concurrency: int,
+) -> None:
+    """Render the tables with a shared loader."""
+    loader = AsyncJsonLoader(max_concurrency=max_concurrency)
+
+    async for _ in render_batch_async(tables, loader=loader):
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=12)
+    parser.add_argument("--tables", type=int, default=30)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    workload = Workload("async", models=args.files, coefficients=20)
+
+    with tempfile.TemporaryDirectory() as directory:
+        spec_filename, json_filenames = write_workload(
+            workload, Path(directory),
+        )
+
+        print(f"Wrote {args.files} result files.", file=sys.stderr)
+
+        # NOTE The spec has no header rows, so it fits any number of
+        # columns.
+        #
+        renderer = Renderer(spec_filename.read_text())
+        tables = [
+            (
+                renderer,
+                [
+                    str(json_filenames[(table + column) % args.files])
+                    for column in range(COLUMNS)
+                ],
+            )
+            for table in range(args.tables)
+        ]
+
+        with patch(
+            "tomltable.renderer.load_json_file",
+            make_slow_loader(args.latency_ms / 1000),
+        ):
+            start = time.perf_counter()
+
+            for table_renderer, data_sources in tables:
+                table_renderer.render(data_sources)
+
+            print(f"{'sequential':>10}: {time.perf_counter() - start:8.3f} s")
+
+            start = time.perf_counter()
+            asyncio.run(render_concurrently(tables, args.max_concurrency))
+            print(f"{'async':>10}: {time.perf_counter() - start:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
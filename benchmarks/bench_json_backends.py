@@ -0,0 +1,120 @@
+"""Compare the JSON backends of `load_json_file` on a large result file.
+
+The script writes a synthetic jsonwriter-shaped result file of about
+`--size-mb` megabytes, most of which is the array of residuals, and
+loads it with each backend in a separate process, so that the peak RSS
+of each can be measured.  The 'json' backend reads the file as text and
+decodes it with the standard library, as `load_json_file` always did.
+The other backends decode the memory-mapped file.  Backends that are
+not installed are skipped.
+
+Usage:
+
+    python benchmarks/bench_json_backends.py --size-mb 50
+
+"""
+import argparse
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from suite import get_peak_rss_mb
+from workload import Workload, make_result
+
+BACKENDS = ("json", "orjson", "msgspec")
+
+# NOTE A residual takes about 21 bytes in the file, including the
+# separator.
+#
+BYTES_PER_RESIDUAL = 21
+
+
+def write_result_file(filename: Path, size_mb: int) -> None:
+    """Write a result file of roughly `size_mb` megabytes."""
+    workload = Workload(
+        "backends",
+        models=1,
+        coefficients=20,
+        residuals=size_mb * 1024 * 1024 // BYTES_PER_RESIDUAL,
+    )
+
+    with filename.open("w") as json_file:
+        json.dump(make_result(workload, 1, random.Random(0)), json_file)
+
+
+def run_backend(backend: str, filename: str, repeat: int) -> None:
+    """Load the file with one backend and print the timing as JSON."""
+    import tomltable
+    from tomltable.jsondecode import resolve_backend
+
+    try:
+        resolve_backend(backend)
+    except ValueError:
+        print(json.dumps({"backend": backend, "installed": False}))
+        return
+
+    times = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        json_file = tomltable.load_json_file(filename, backend)
+        times.append(time.perf_counter() - start)
+
+        del json_file
+
+    print(json.dumps({
+        "backend": backend,
+        "installed": True,
+        "seconds": min(times),
+        "peak_rss_mb": get_peak_rss_mb(),
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backend", help=argparse.SUPPRESS)
+    parser.add_argument("--filename", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend is not None:
+        run_backend(args.backend, args.filename, args.repeat)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = Path(directory) / "result.json"
+
+        print(f"Writing {args.size_mb} MB to {filename}...", file=sys.stderr)
+        write_result_file(filename, args.size_mb)
+
+        for backend in BACKENDS:
+            output = subprocess.run(
+                [sys.executable, __file__,
+                 "--backend", backend,
+                 "--filename", str(filename),
+                 "--repeat", str(args.repeat)],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+
+            result = json.loads(output)
+
+            if not result["installed"]:
+                print(f"{backend:>10}: not installed")
+                continue
+
+            print(
+                f"{backend:>10}: "
+                f"{result['seconds']:8.3f} s, "
+                f"peak RSS {result['peak_rss_mb']:8.1f} MB",
+            )
+
+
+if __name__ == "__main__":
+    main()
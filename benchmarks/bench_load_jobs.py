@@ -0,0 +1,84 @@
+"""Time loading many JSON files from slow storage with --load-jobs.
+
+The script writes `--files` synthetic result files and calls `tomltable`
+in-process with one `-j` option for each, plus `--repeats` more for the
+first file, like a baseline model that is repeated in several columns.
+To stand in for network-mounted storage, every read of a result file is
+delayed by `--latency-ms` milliseconds.  The run is timed with each
+value of `--load-jobs` in `--jobs`.
+
+Usage:
+
+    python benchmarks/bench_load_jobs.py --files 200 --jobs 1 8 32
+
+"""
+import argparse
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from unittest.mock import patch
+
+from click.testing import CliRunner
+from workload import Workload, write_workload
+
+import tomltable
+from tomltable.cli import main as tomltable_main
+
+
+def make_slow_loader(latency: float) -> Callable[[str, str], dict]:
+    """Return `load_json_file` with a delay before every read."""
+    def slow_load_json_file(filename: str, backend: str = "auto") -> dict:
+        time.sleep(latency)
+        return tomltable.load_json_file(filename, backend)
+
+    return slow_load_json_file
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=10)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+
+    workload = Workload("load-jobs", models=args.files, coefficients=5)
+
+    with tempfile.TemporaryDirectory() as directory:
+        spec_filename, json_filenames = write_workload(
+            workload, Path(directory),
+        )
+        json_filenames += [json_filenames[0]] * args.repeats
+
+        print(
+            f"Wrote {args.files} result files, "
+            f"passing {len(json_filenames)}.",
+            file=sys.stderr,
+        )
+
+        arguments = ["--spec", str(spec_filename)]
+
+        for filename in json_filenames:
+            arguments.extend(["-j", str(filename)])
+
+        with patch(
+            "tomltable.cli.load_json_file",
+            make_slow_loader(args.latency_ms / 1000),
+        ):
+            for jobs in args.jobs:
+                start = time.perf_counter()
+                result = CliRunner().invoke(
+                    tomltable_main, [*arguments, "--load-jobs", str(jobs)],
+                )
+                seconds = time.perf_counter() - start
+
+                if result.exit_code != 0:
+                    raise result.exception
+
+                print(f"{jobs:>10}: {seconds:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
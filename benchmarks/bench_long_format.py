@@ -0,0 +1,94 @@
+"""Time indexing a long-format results file and filling tables from it.
+
+The script writes a synthetic results file with one row per model, term,
+and statistic, indexes it once with `load_long_results`, and then
+builds the values of `--tables` tables of `--columns` models each from
+the index, like `tomltable-batch` does for jobs that share the file.
+
+Usage:
+
+    python benchmarks/bench_long_format.py --models 2000 --terms 200
+
+"""
+import argparse
+import csv
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from tomltable import make_json_dict_for_keys
+from tomltable.longformat import load_long_results
+
+STATISTICS = ("est", "se", "t", "p", "stars")
+
+
+def write_results(filename: Path, models: int, terms: int) -> int:
+    """Write a long-format results file and return its number of rows."""
+    rng = random.Random(0)
+    rows = 0
+
+    with filename.open("w", newline="") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(("model", "term", "statistic", "value"))
+
+        for model in range(models):
+            for term in range(terms):
+                est = rng.gauss(0, 1)
+
+                writer.writerows([
+                    (f"m{model}", f"x{term}", "est", est),
+                    (f"m{model}", f"x{term}", "se", 0.1),
+                    (f"m{model}", f"x{term}", "t", est / 0.1),
+                    (f"m{model}", f"x{term}", "p", 0.05),
+                    (f"m{model}", f"x{term}", "stars", "*"),
+                ])
+                rows += len(STATISTICS)
+
+            writer.writerow((f"m{model}", "", "nobs", 1000))
+            rows += 1
+
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--models", type=int, default=2000)
+    parser.add_argument("--terms", type=int, default=200)
+    parser.add_argument("--tables", type=int, default=100)
+    parser.add_argument("--columns", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = Path(directory) / "results.csv"
+        rows = write_results(filename, args.models, args.terms)
+
+        print(f"Wrote {rows} rows to {filename}.", file=sys.stderr)
+
+        start = time.perf_counter()
+        results = dict(load_long_results(str(filename)))
+        print(f"{'index':>10}: {time.perf_counter() - start:8.3f} s")
+
+    models = list(results)
+    keys = {
+        f"{column}::coef::x{term}::{statistic}"
+        for column in range(1, args.columns + 1)
+        for term in range(min(args.terms, 10))
+        for statistic in ("est", "se", "stars")
+    }
+
+    start = time.perf_counter()
+
+    for table in range(args.tables):
+        first = table * args.columns % len(models)
+        make_json_dict_for_keys(
+            [results[model] for model in models[first:][:args.columns]],
+            keys,
+        )
+
+    print(f"{'tables':>10}: {time.perf_counter() - start:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
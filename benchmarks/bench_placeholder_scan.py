@@ -0,0 +1,124 @@
+"""Time the placeholder scanner on adversarial templates.
+
+Each case is a template that is built to make a backtracking search for
+conversion specifiers slow: many unbalanced '%(' openings, keys with
+many parenthesized groups, and specifiers that almost match.  The script
+times `compile_template` on each case at increasing sizes.  If the
+`regex` module is installed, then it also times the recursive pattern
+that tomltable used before, in a separate process with a time limit,
+because that pattern takes quadratic or exponential time on these cases.
+
+Usage:
+
+    python benchmarks/bench_placeholder_scan.py --sizes 1000 10000 100000
+
+"""
+import argparse
+import importlib.util
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+
+CASES: dict[str, Callable[[int], str]] = {
+    "unbalanced": lambda n: "x%(" * n,
+    "deep": lambda n: "x%(" + "(" * n,
+    "groups": lambda n: "x%(" + "(a)" * n,
+    "near-miss": lambda n: " %(a)0x" * n,
+    "table": lambda n: " & %(1::coef::I(x^2)::est).03f" * n,
+}
+
+RECURSIVE_PATTERN = (
+    r"(?V1)(^|[^%])%"
+    r"(?P<pat>\([^()]*(?&pat)*[^()]*\))"
+    r"[-# .0-9]*[dfs]"
+)
+
+
+def time_scanner(case: str, size: int) -> float:
+    from tomltable.compiled import compile_template
+
+    template = CASES[case](size)
+
+    start = time.perf_counter()
+    compile_template(template)
+
+    return time.perf_counter() - start
+
+
+def time_recursive_pattern(case: str, size: int) -> float:
+    import regex
+
+    pattern = regex.compile(RECURSIVE_PATTERN)
+    template = CASES[case](size)
+
+    start = time.perf_counter()
+    list(pattern.finditer(template))
+
+    return time.perf_counter() - start
+
+
+def time_recursive_pattern_in_subprocess(
+    case: str,
+    size: int,
+    timeout: float,
+) -> float | None:
+    """Return the time in seconds, or None if it exceeds `timeout`."""
+    try:
+        output = subprocess.run(
+            [sys.executable, __file__,
+             "--recursive-case", case, "--sizes", str(size)],
+            check=True,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        ).stdout
+    except subprocess.TimeoutExpired:
+        return None
+
+    return float(output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 2000, 4000, 8000],
+    )
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--recursive-case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.recursive_case is not None:
+        print(time_recursive_pattern(args.recursive_case, args.sizes[0]))
+        return
+
+    has_regex = importlib.util.find_spec("regex") is not None
+
+    print(f"{'case':>10} {'size':>8} {'scanner':>10} {'recursive':>10}")
+
+    for case in CASES:
+        recursive_timed_out = False
+
+        for size in args.sizes:
+            scanner = f"{time_scanner(case, size):9.4f}s"
+
+            if not has_regex:
+                recursive = "n/a"
+            elif recursive_timed_out:
+                recursive = "skipped"
+            else:
+                seconds = time_recursive_pattern_in_subprocess(
+                    case, size, args.timeout,
+                )
+
+                if seconds is None:
+                    recursive = f">{args.timeout:.0f}s"
+                    recursive_timed_out = True
+                else:
+                    recursive = f"{seconds:9.4f}s"
+
+            print(f"{case:>10} {size:>8} {scanner:>10} {recursive:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Compare `json.load` with the streaming JSON reader on a large file.
+
+The script writes a synthetic jsonwriter-shaped result file that holds a
+handful of coefficients and a long array of residuals, and then extracts
+the values that a typical regression table uses, once with `json.load`
+followed by `make_json_dict_for_keys` and once with
+`make_json_dict_streaming`.  Each method runs in a separate process so
+that its peak RSS can be measured.
+
+Usage:
+
+    python benchmarks/bench_streaming_json.py --size-mb 1024
+
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+KEYS = {
+    "1::coef::x::est",
+    "1::coef::x::se",
+    "1::coef::x::stars",
+    "1::nobs",
+    "1::r_squared",
+}
+
+
+def write_result_file(filename: Path, size_mb: int) -> None:
+    """Write a result file of roughly `size_mb` megabytes."""
+    residual = "-0.123456789012345"
+    count = size_mb * 1024 * 1024 // (len(residual) + 2)
+
+    with filename.open("w") as json_file:
+        json_file.write(
+            '{"coef": {"x": {"est": 1.5, "se": 0.25, "stars": "*"}}, '
+            '"residuals": [',
+        )
+
+        batch = ", ".join([residual] * 10_000)
+
+        for _ in range(count // 10_000):
+            json_file.write(batch)
+            json_file.write(", ")
+
+        json_file.write(
+            f'{residual}], "nobs": {count}, "r_squared": 0.5}}',
+        )
+
+
+def run_method(method: str, filename: str) -> None:
+    """Extract the values with one method and print timing as JSON."""
+    # Import here so that the import cost is not part of the baseline
+    # RSS of the parent process.
+    #
+    import tomltable
+    from tomltable.jsonstream import make_json_dict_streaming
+
+    start = time.perf_counter()
+
+    if method == "json.load":
+        json_dict = tomltable.make_json_dict_for_keys(
+            [tomltable.load_json_file(filename)], KEYS,
+        )
+    else:
+        json_dict = make_json_dict_streaming([filename], KEYS)
+
+    elapsed = time.perf_counter() - start
+
+    # NOTE ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    #
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    scale = 1 if sys.platform == "darwin" else 1024
+
+    print(json.dumps({
+        "method": method,
+        "seconds": elapsed,
+        "peak_rss_mb": max_rss * scale / 1024 / 1024,
+        "keys": len(json_dict),
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=1024)
+    parser.add_argument("--method", help=argparse.SUPPRESS)
+    parser.add_argument("--filename", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.method is not None:
+        run_method(args.method, args.filename)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = Path(directory) / "result.json"
+
+        print(f"Writing {args.size_mb} MB to {filename}...", file=sys.stderr)
+        write_result_file(filename, args.size_mb)
+
+        for method in ("streaming", "json.load"):
+            output = subprocess.run(
+                [sys.executable, __file__,
+                 "--method", method, "--filename", str(filename)],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+
+            result = json.loads(output)
+
+            print(
+                f"{result['method']:>10}: "
+                f"{result['seconds']:8.2f} s, "
+                f"peak RSS {result['peak_rss_mb']:8.1f} MB, "
+                f"{result['keys']} keys",
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Compare the peak memory of writing long tables with --streaming-output.
+
+For each number of coefficients in `--coefficients`, the script writes a
+synthetic specification with one body cell for each coefficient, and
+`--models` result files.  It then writes the table as a longtable to a
+file, once as a whole and once with `--streaming-output`.  Each run is
+in a separate process, so that its peak RSS can be measured.
+
+Usage:
+
+    python benchmarks/bench_streaming_output.py --coefficients 10000 40000
+
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from suite import get_peak_rss_mb
+from workload import Workload, write_workload
+
+MODES = ("whole", "streaming")
+
+
+def run_mode(mode: str, arguments: list[str]) -> None:
+    """Write the table in one mode and print the measurements as JSON."""
+    # Import here so that the import cost is not part of the baseline
+    # RSS of the parent process.
+    #
+    from tomltable.cli import main as tomltable_main
+
+    if mode == "streaming":
+        arguments = [*arguments, "--streaming-output"]
+
+    start = time.perf_counter()
+    tomltable_main(arguments, standalone_mode=False)
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        "mode": mode,
+        "seconds": elapsed,
+        "peak_rss_mb": get_peak_rss_mb(),
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--models", type=int, default=3)
+    parser.add_argument(
+        "--coefficients", type=int, nargs="+", default=[10_000, 40_000],
+    )
+    parser.add_argument("--mode", help=argparse.SUPPRESS)
+    parser.add_argument("--arguments", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode is not None:
+        run_mode(args.mode, json.loads(args.arguments))
+        return
+
+    for coefficients in args.coefficients:
+        workload = Workload(
+            "long", models=args.models, coefficients=coefficients,
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            spec_filename, json_filenames = write_workload(
+                workload, Path(directory),
+            )
+
+            arguments = ["--spec", str(spec_filename)]
+
+            for filename in json_filenames:
+                arguments.extend(["-j", str(filename)])
+
+            for mode in MODES:
+                output_filename = Path(directory) / f"{mode}.tex"
+
+                output = subprocess.run(
+                    [sys.executable, __file__,
+                     "--mode", mode,
+                     "--arguments", json.dumps([
+                         *arguments,
+                         "--format", "longtable",
+                         "--output", str(output_filename),
+                     ])],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout
+
+                result = json.loads(output)
+                size_mb = output_filename.stat().st_size / 1024 / 1024
+
+                print(
+                    f"{coefficients:>8} coefficients, "
+                    f"{result['mode']:>9}: "
+                    f"{result['seconds']:8.2f} s, "
+                    f"peak RSS {result['peak_rss_mb']:8.1f} MB, "
+                    f"table {size_mb:6.1f} MB",
+                )
+
+
+if __name__ == "__main__":
+    main()
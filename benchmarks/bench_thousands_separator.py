@@ -0,0 +1,88 @@
+"""Compare the two ways of adding thousands separators to a table.
+
+The first way fills the template and then runs `add_thousands_separator`
+on the whole document, which is what tomltable did before.  The second
+way passes `thousands_separator` to `CompiledTemplate.fill`, which only
+groups the formatted numbers from the JSON data.  Filling the template
+without separators is timed as a baseline.  The table has `--rows`
+rows, each with a label, an estimate, a standard error, and a count.
+
+Usage:
+
+    python benchmarks/bench_thousands_separator.py --rows 10000
+
+"""
+import argparse
+import time
+from collections.abc import Callable
+
+from tomltable import add_thousands_separator
+from tomltable.compiled import CompiledTemplate, compile_template
+
+
+def make_table(rows: int) -> tuple[CompiledTemplate, dict]:
+    template = "".join(
+        f"Variable {i} & %({i}::est).03f & (%({i}::se).04f) & "
+        f"%({i}::nobs)d \\\\\n"
+        for i in range(1, rows + 1)
+    )
+    json_dict = {}
+
+    for i in range(1, rows + 1):
+        json_dict[f"{i}::est"] = 1234.5 * i
+        json_dict[f"{i}::se"] = 0.5 / i
+        json_dict[f"{i}::nobs"] = 1000 * i
+
+    return compile_template(template), json_dict
+
+
+def fill_without_separators(
+    compiled: CompiledTemplate,
+    json_dict: dict,
+) -> str:
+    return compiled.fill(json_dict)
+
+
+def fill_whole_document(compiled: CompiledTemplate, json_dict: dict) -> str:
+    return add_thousands_separator(compiled.fill(json_dict))
+
+
+def fill_at_format_time(compiled: CompiledTemplate, json_dict: dict) -> str:
+    return compiled.fill(json_dict, thousands_separator=",")
+
+
+def best_time(
+    function: Callable[[CompiledTemplate, dict], str],
+    compiled: CompiledTemplate,
+    json_dict: dict,
+    repeat: int,
+) -> float:
+    times = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(compiled, json_dict)
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    compiled, json_dict = make_table(args.rows)
+
+    print(f"{'method':>14} {'seconds':>10}")
+
+    for name, function in (("none", fill_without_separators),
+                           ("whole-document", fill_whole_document),
+                           ("format-time", fill_at_format_time)):
+        seconds = best_time(function, compiled, json_dict, args.repeat)
+        print(f"{name:>14} {seconds:10.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Compare `traverse` with the recursive generator it replaced.
+
+The recursive generator nests one generator per level of the structure
+and rebuilds the path at every level, so each value costs time in
+proportion to its depth, and a deep enough structure raises
+`RecursionError`.  The script times both on four shapes:
+
+- wide: a long, flat list of numbers, like the residuals of a model,
+- dicts: many coefficients with a few values each,
+- deep: a single value nested `--depth` lists deep,
+- deep-wide: `--width` values at the bottom of the deep nesting.
+
+Usage:
+
+    python benchmarks/bench_traverse.py --size 1000000 --depth 2000
+
+"""
+import argparse
+import time
+from collections.abc import Callable, Generator
+from typing import Any
+
+from tomltable import traverse
+
+
+def traverse_recursively(
+    obj: Any,  # noqa: ANN401
+) -> Generator[tuple[str | None, Any], None, None]:
+    if isinstance(obj, dict):
+        for key, obj2 in obj.items():
+            for subpath, value in traverse_recursively(obj2):
+                if subpath is None:
+                    yield f"{key}", value
+                else:
+                    yield f"{key}::{subpath}", value
+    elif isinstance(obj, list):
+        for i, obj2 in enumerate(obj, 1):
+            for subpath, value in traverse_recursively(obj2):
+                if subpath is None:
+                    yield f"{i}", value
+                else:
+                    yield f"{i}::{subpath}", value
+    else:
+        yield None, obj
+
+
+def nest(value: Any, depth: int) -> Any:  # noqa: ANN401
+    for _ in range(depth):
+        value = [value]
+
+    return value
+
+
+def make_inputs(size: int, depth: int, width: int) -> dict[str, Any]:
+    return {
+        "wide": {"residuals": [0.5] * size},
+        "dicts": {
+            "coef": {
+                f"x{i}": {"est": 1.5, "se": 0.25, "p": 0.01, "stars": "**"}
+                for i in range(size // 4)
+            },
+        },
+        "deep": nest(1, depth),
+        "deep-wide": nest([0.5] * width, depth),
+    }
+
+
+def time_function(
+    function: Callable[[Any], Any],
+    obj: Any,  # noqa: ANN401
+) -> str:
+    start = time.perf_counter()
+
+    try:
+        for _ in function(obj):
+            pass
+    except RecursionError:
+        return "RecursionError"
+
+    return f"{time.perf_counter() - start:.4f}s"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--depth", type=int, default=500)
+    parser.add_argument("--width", type=int, default=10_000)
+    args = parser.parse_args()
+
+    inputs = make_inputs(args.size, args.depth, args.width)
+
+    print(f"{'input':>10} {'recursive':>15} {'explicit stack':>15}")
+
+    for name, obj in inputs.items():
+        recursive = time_function(traverse_recursively, obj)
+        explicit = time_function(traverse, obj)
+
+        print(f"{name:>10} {recursive:>15} {explicit:>15}")
+
+
+if __name__ == "__main__":
+    main()
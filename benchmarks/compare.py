@@ -0,0 +1,124 @@
+"""Compare benchmark results with a baseline and flag regressions.
+
+Both files are written by `suite.py --output`.  A benchmark is flagged
+if it takes more than `--time-tolerance` longer, or uses more than
+`--memory-tolerance` more memory, than in the baseline.  Benchmarks that
+take less than `--min-seconds` in both files are not flagged for time,
+because their timings are dominated by noise.
+
+The exit status is 1 if any benchmark is flagged, so the script can be
+used in CI:
+
+    python benchmarks/compare.py baseline.json current.json
+
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def find_regressions(
+    baseline: dict[str, dict[str, float]],
+    current: dict[str, dict[str, float]],
+    time_tolerance: float,
+    memory_tolerance: float,
+    min_seconds: float,
+) -> dict[str, list[str]]:
+    """Find the benchmarks that got slower or use more memory.
+
+    Benchmarks that are missing from either file are skipped.
+
+    Returns:
+        dict[str, list[str]]: A dict mapping the name of each benchmark
+            that regressed to the measurements that regressed.
+
+    Examples:
+        >>> find_regressions(
+        ...     {"a": {"seconds": 1.0, "peak_memory_mb": 10.0}},
+        ...     {"a": {"seconds": 1.5, "peak_memory_mb": 10.5}},
+        ...     0.2, 0.1, 0.001,
+        ... )
+        {'a': ['seconds']}
+
+    """
+    regressions = {}
+
+    for name in baseline.keys() & current.keys():
+        before = baseline[name]
+        after = current[name]
+        regressed = []
+
+        if (max(before["seconds"], after["seconds"]) >= min_seconds
+            and after["seconds"] > before["seconds"] * (1 + time_tolerance)):
+            regressed.append("seconds")
+
+        if (after["peak_memory_mb"]
+            > before["peak_memory_mb"] * (1 + memory_tolerance)):
+            regressed.append("peak_memory_mb")
+
+        if len(regressed) > 0:
+            regressions[name] = regressed
+
+    return regressions
+
+
+def format_change(before: float, after: float) -> str:
+    """Format the relative change between two measurements.
+
+    Examples:
+        >>> format_change(2.0, 3.0)
+        '+50.0%'
+        >>> format_change(0.0, 0.0)
+        '+0.0%'
+
+    """
+    if before == 0:
+        return "+0.0%" if after == 0 else "+inf%"
+
+    return f"{(after - before) / before:+.1%}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument("--time-tolerance", type=float, default=0.2)
+    parser.add_argument("--memory-tolerance", type=float, default=0.1)
+    parser.add_argument("--min-seconds", type=float, default=0.001)
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text())["results"]
+    current = json.loads(args.current.read_text())["results"]
+
+    regressions = find_regressions(
+        baseline,
+        current,
+        args.time_tolerance,
+        args.memory_tolerance,
+        args.min_seconds,
+    )
+
+    print(f"{'benchmark':>40} {'seconds':>10} {'peak MB':>10}")
+
+    for name in sorted(baseline.keys() & current.keys()):
+        before = baseline[name]
+        after = current[name]
+        seconds = format_change(before["seconds"], after["seconds"])
+        memory = format_change(
+            before["peak_memory_mb"], after["peak_memory_mb"],
+        )
+        flag = "  REGRESSION" if name in regressions else ""
+
+        print(f"{name:>40} {seconds:>10} {memory:>10}{flag}")
+
+    for name in sorted(baseline.keys() ^ current.keys()):
+        where = "baseline" if name in baseline else "current results"
+        print(f"{name:>40} only in the {where}")
+
+    if len(regressions) > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""Time each stage of rendering a table on synthetic workloads.
+
+For every workload in `workload.WORKLOADS`, the suite writes the result
+files and the table specification to a temporary directory, and then
+times the stages of rendering the table one by one: `parse_toml`,
+`make_template`, `make_json_dict`, `fill_template`, and
+`add_thousands_separator`.  It also times `main` from end to end,
+including the imports, in a separate process.
+
+Each in-process stage runs `--repeat` times and the fastest run is
+kept.  Its peak memory is measured with `tracemalloc` in one more run.
+For `main`, the peak memory is the peak RSS of the process.
+
+The results are saved as JSON, so that `compare.py` can compare them
+with a baseline:
+
+    python benchmarks/suite.py --output baseline.json
+    (change the code)
+    python benchmarks/suite.py --output current.json
+    python benchmarks/compare.py baseline.json current.json
+
+"""
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from workload import WORKLOADS, Workload, write_workload
+
+STAGES = (
+    "parse_toml",
+    "make_template",
+    "make_json_dict",
+    "fill_template",
+    "add_thousands_separator",
+    "main",
+)
+
+
+def measure(
+    function: Callable[[], Any],
+    repeat: int,
+) -> tuple[dict[str, float], Any]:
+    """Time a function and measure its peak memory use.
+
+    Returns:
+        tuple[dict[str, float], Any]: The measurements and the return
+            value of the function.
+
+    """
+    times = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "seconds": min(times),
+        "peak_memory_mb": peak / 1024 / 1024,
+    }, result
+
+
+def run_stages(
+    spec_filename: Path,
+    json_filenames: list[Path],
+    repeat: int,
+) -> dict[str, dict[str, float]]:
+    """Time the stages of rendering a table in this process."""
+    import tomltable
+    from tomltable.parser import load_toml, parse_toml
+    from tomltable.template import fill_template, make_template
+
+    filenames = [str(filename) for filename in json_filenames]
+    toml_spec = load_toml(spec_filename.read_text())
+    results = {}
+
+    results["parse_toml"], table_spec = measure(
+        lambda: parse_toml(toml_spec), repeat,
+    )
+    results["make_template"], template = measure(
+        lambda: make_template(table_spec, filenames, None, None), repeat,
+    )
+    results["make_json_dict"], json_dict = measure(
+        lambda: tomltable.make_json_dict(
+            [tomltable.load_json_file(filename) for filename in filenames],
+        ),
+        repeat,
+    )
+    results["fill_template"], table = measure(
+        lambda: fill_template(template, json_dict), repeat,
+    )
+    results["add_thousands_separator"], _ = measure(
+        lambda: tomltable.add_thousands_separator(table), repeat,
+    )
+
+    return results
+
+
+def get_peak_rss_mb() -> float:
+    """Return the peak RSS of this process in megabytes."""
+    # NOTE On Linux, ru_maxrss is carried over from the parent process
+    # across exec, but VmHWM isn't.
+    #
+    status = Path("/proc/self/status")
+
+    if status.exists():
+        for line in status.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+
+    # NOTE ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    #
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    scale = 1 if sys.platform == "darwin" else 1024
+
+    return max_rss * scale / 1024 / 1024
+
+
+def run_main(spec_filename: str, json_filenames: list[str]) -> None:
+    """Render a table with `main` and print the measurements as JSON."""
+    import contextlib
+    import io
+
+    start = time.perf_counter()
+
+    from tomltable.cli import main
+
+    arguments = ["--spec", spec_filename, "--human-readable-numbers"]
+
+    for filename in json_filenames:
+        arguments.extend(["-j", filename])
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        main(arguments, standalone_mode=False)
+
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        "seconds": elapsed,
+        "peak_memory_mb": get_peak_rss_mb(),
+    }))
+
+
+def measure_main(
+    spec_filename: Path,
+    json_filenames: list[Path],
+    repeat: int,
+) -> dict[str, float]:
+    """Time `main` in fresh processes and keep the fastest run."""
+    runs = []
+
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, __file__,
+             "--main", str(spec_filename),
+             *(str(filename) for filename in json_filenames)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        runs.append(json.loads(output))
+
+    return min(runs, key=lambda run: run["seconds"])
+
+
+def run_workload(workload: Workload, repeat: int) -> dict[str, dict]:
+    with tempfile.TemporaryDirectory() as directory:
+        spec_filename, json_filenames = write_workload(
+            workload, Path(directory),
+        )
+
+        results = run_stages(spec_filename, json_filenames, repeat)
+        results["main"] = measure_main(
+            spec_filename, json_filenames, repeat,
+        )
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--workload", choices=list(WORKLOADS), action="append",
+        help="Workload to run; can be repeated. Defaults to all of them.",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--main", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.main is not None:
+        run_main(args.main[0], args.main[1:])
+        return
+
+    results = {}
+
+    print(f"{'benchmark':>40} {'seconds':>10} {'peak MB':>10}")
+
+    for name in args.workload or list(WORKLOADS):
+        workload_results = run_workload(WORKLOADS[name], args.repeat)
+
+        for stage in STAGES:
+            key = f"{name}/{stage}"
+            results[key] = workload_results[stage]
+
+            print(
+                f"{key:>40} "
+                f"{results[key]['seconds']:10.4f} "
+                f"{results[key]['peak_memory_mb']:10.1f}",
+            )
+
+    if args.output is not None:
+        args.output.write_text(json.dumps({
+            "metadata": {
+                "created": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "repeat": args.repeat,
+            },
+            "results": results,
+        }, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Generate synthetic regression results and table specifications.
+
+The result files have the structure that jsonwriter writes: a 'coef'
+object with an estimate, a standard error, a t statistic, a p-value,
+and stars for each coefficient, along with the number of observations,
+the R-squared, and optionally a long array of residuals.  The table
+specification has one body cell per coefficient and one column per
+model, so the size of the table grows with both.
+
+The benchmark suite imports this module, but it can also be run on its
+own to write a workload to a directory:
+
+    python benchmarks/workload.py --models 20 --coefficients 50 out/
+
+"""
+import argparse
+import json
+import random
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class Workload:
+    """The size of a synthetic table.
+
+    Attributes:
+        name: A short name for the workload (e.g., 'wide').
+        models: The number of result files, i.e., table columns.
+        coefficients: The number of coefficients in each model.
+        residuals: The length of the residual array in each result file.
+
+    """
+
+    name: str
+    models: int
+    coefficients: int
+    residuals: int = 0
+
+
+WORKLOADS = {
+    workload.name: workload
+    for workload in (
+        Workload("small", models=3, coefficients=5),
+        Workload("wide", models=50, coefficients=10),
+        Workload("long", models=5, coefficients=500),
+        Workload("large-json", models=3, coefficients=5, residuals=1_000_000),
+    )
+}
+
+
+def coefficient_name(index: int) -> str:
+    """Name the coefficients like R does for a polynomial in `x`.
+
+    Examples:
+        >>> [coefficient_name(i) for i in range(3)]
+        ['(Intercept)', 'x1', 'I(x1^2)']
+
+    """
+    if index == 0:
+        return "(Intercept)"
+
+    if index % 2 == 1:
+        return f"x{index // 2 + 1}"
+
+    return f"I(x{index // 2}^2)"
+
+
+def make_result(
+    workload: Workload,
+    model: int,
+    rng: random.Random,
+) -> dict:
+    """Make the content of one jsonwriter-shaped result file."""
+    coef = {}
+
+    for index in range(workload.coefficients):
+        est = rng.gauss(0, 1000)
+        se = abs(rng.gauss(0, 100)) + 0.01
+        p = rng.random()
+
+        coef[coefficient_name(index)] = {
+            "est": est,
+            "se": se,
+            "t": est / se,
+            "p": p,
+            "stars": "***" if p < 0.01 else "**" if p < 0.05 else "",
+        }
+
+    result = {
+        "call": f"feols(fml = y ~ x, data = model_{model})",
+        "r_squared": rng.random(),
+        "coef": coef,
+        "nobs": rng.randint(1000, 10_000_000),
+    }
+
+    if workload.residuals > 0:
+        result["residuals"] = [
+            rng.gauss(0, 1) for _ in range(workload.residuals)
+        ]
+
+    return result
+
+
+def make_spec(workload: Workload) -> str:
+    """Make a TOML table specification for the result files."""
+    lines = [
+        "[header]",
+        "add-column-numbers = true",
+        "",
+    ]
+
+    for index in range(workload.coefficients):
+        lines.extend([
+            "[[body.cell]]",
+            f"label = 'Coefficient {index}'",
+            f"coef = '{coefficient_name(index)}'",
+            "",
+        ])
+
+    lines.extend([
+        "[[footer.cell]]",
+        "label = 'Observations'",
+        "cell = '%(n::nobs)d'",
+        "",
+        "[[footer.cell]]",
+        "label = '$R^2$'",
+        "cell = '%(n::r_squared).03f'",
+        "",
+    ])
+
+    return "\n".join(lines)
+
+
+def write_workload(
+    workload: Workload,
+    directory: Path,
+    seed: int = 0,
+) -> tuple[Path, list[Path]]:
+    """Write the specification and the result files to a directory.
+
+    Returns:
+        tuple[Path, list[Path]]: The path to the specification and the
+            paths to the result files.
+
+    """
+    rng = random.Random(seed)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    spec_filename = directory / f"{workload.name}.toml"
+    spec_filename.write_text(make_spec(workload))
+
+    json_filenames = []
+
+    for model in range(1, workload.models + 1):
+        json_filename = directory / f"{workload.name}_model_{model}.json"
+
+        with json_filename.open("w") as json_file:
+            json.dump(make_result(workload, model, rng), json_file)
+
+        json_filenames.append(json_filename)
+
+    return spec_filename, json_filenames
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--models", type=int, default=3)
+    parser.add_argument("--coefficients", type=int, default=5)
+    parser.add_argument("--residuals", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    spec_filename, json_filenames = write_workload(
+        Workload("custom", args.models, args.coefficients, args.residuals),
+        args.directory,
+        args.seed,
+    )
+
+    print(spec_filename)
+
+    for json_filename in json_filenames:
+        print(json_filename)
+
+
+if __name__ == "__main__":
+    main()
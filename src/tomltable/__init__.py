@@ -1,32 +1,79 @@
-import json
+import importlib
 import re
-import sys
-from collections.abc import Generator
-from pathlib import Path
+from collections.abc import Generator, Iterator
 from typing import Any
 
-import click
-import toml
-
-from tomltable.parser import confirm_consistent_column_count, parse_toml
-from tomltable.template import fill_template, make_template
+# NOTE The command-line interface and the functions that generate and
+# fill templates are imported on first use, so that importing tomltable
+# stays cheap.
+#
+_LAZY_ATTRIBUTES = {
+    "main": "tomltable.cli",
+    "confirm_consistent_column_count": "tomltable.parser",
+    "parse_toml": "tomltable.parser",
+    "fill_template": "tomltable.template",
+    "make_template": "tomltable.template",
+    "AsyncJsonLoader": "tomltable.renderer",
+    "Renderer": "tomltable.renderer",
+    "RenderResult": "tomltable.renderer",
+    "render_async": "tomltable.renderer",
+    "render_batch_async": "tomltable.renderer",
+    "RenderWarning": "tomltable.compiled",
+}
+
+MISSING = object()
+
+# The thousands separators that the command-line options can choose from.
+# A comma inside braces doesn't get the space that TeX adds after a comma
+# in math mode.
+#
+THOUSANDS_SEPARATORS = {
+    "comma": ",",
+    "thin-space": "\\,",
+    "braced-comma": "{,}",
+}
+
+# The output formats that `make_template` supports.
+#
+TABLE_FORMATS = ("tex", "longtable", "markdown", "html", "csv")
+
+# The JSON decoders that `load_json_file` can use.  'auto' uses orjson
+# or msgspec if either is installed, and the standard library otherwise.
+#
+JSON_BACKENDS = ("auto", "json", "orjson", "msgspec")
+
+# The default size limit of each cache in `tomltable.cache`, in MB.  It
+# is defined here so that the command-line option can show it without
+# importing the cache.
+#
+DEFAULT_CACHE_MAX_SIZE_MB = 1024
+
+
+def load_json_file(filename: str, backend: str = "auto") -> dict:
+    """Read a JSON file and return its content as a dict.
+
+    See `tomltable.jsondecode.load_json` for the backends.
 
+    """
+    from tomltable.jsondecode import load_json
 
-def load_json_file(filename: str) -> dict:
-    """Read a JSON file and return its content as a dict."""
-    with Path(filename).open() as json_file:
-        return json.load(json_file)
+    return load_json(filename, backend)
 
 
 def traverse(
     obj: Any,  # noqa: ANN401
 ) -> Generator[tuple[str | None, Any], None, None]:
-    """Recurse over a nested dict/list yielding paths and values.
+    """Walk over a nested dict/list yielding paths and values.
 
     This function flattens the structure by generating path strings
     where keys are combined with '::' for nested levels.  List indices
     start at 1.
 
+    The walk is depth-first and uses an explicit stack instead of
+    recursion, so there is no limit on the depth of the structure.  The
+    path of each dict or list is built once and shared as the prefix
+    of the paths inside it.
+
     Args:
         obj: The object to traverse. Can be a dict, list, or primitive
             value.
@@ -68,22 +115,33 @@ def traverse(
             [(None, 42)]
 
     """
-    if isinstance(obj, dict):
-        for key, obj2 in obj.items():
-            for subpath, value in traverse(obj2):
-                if subpath is None:
-                    yield f"{key}", value
-                else:
-                    yield f"{key}::{subpath}", value
-    elif isinstance(obj, list):
-        for i, obj2 in enumerate(obj, 1):
-            for subpath, value in traverse(obj2):
-                if subpath is None:
-                    yield f"{i}", value
-                else:
-                    yield f"{i}::{subpath}", value
-    else:
+    if not isinstance(obj, (dict, list)):
         yield None, obj
+        return
+
+    # Each element of the stack holds the path prefix of a dict or list
+    # and an iterator over its items that is resumed when the walk
+    # returns to it.
+    #
+    stack = [("", _iter_items(obj))]
+
+    while len(stack) > 0:
+        prefix, items = stack[-1]
+
+        for key, value in items:
+            path = f"{prefix}{key}"
+
+            if isinstance(value, (dict, list)):
+                stack.append((f"{path}::", _iter_items(value)))
+                break
+
+            yield path, value
+        else:
+            stack.pop()
+
+
+def _iter_items(obj: dict | list) -> Iterator[tuple[Any, Any]]:
+    return iter(obj.items()) if isinstance(obj, dict) else enumerate(obj, 1)
 
 
 def make_json_dict(json_files: list[dict]) -> dict:
@@ -108,183 +166,236 @@ def make_json_dict(json_files: list[dict]) -> dict:
     return dict(traverse(json_files))
 
 
-def add_thousands_separator(string: str) -> str:
-    """Insert thousands commas into large numbers in the input string.
+def lookup_path(
+    obj: Any,  # noqa: ANN401
+    path: str,
+) -> Any:  # noqa: ANN401
+    """Look up a path in a nested dict/list without flattening it.
+
+    This function walks the nested structure along the path, using the
+    same conventions as `traverse`: keys are combined with '::' and list
+    indices start at 1.  Only paths that `traverse` would yield are
+    found, i.e., the path has to end at a value that is neither a dict
+    nor a list.
+
+    Because dict keys may themselves contain '::', every way of
+    splitting the path at a '::' is considered.  If more than one of
+    them leads to a value, then the one that `traverse` would yield last
+    is returned, as that is the one that ends up in `make_json_dict`.
+
+    Args:
+        obj: The object to search. Can be a dict, list, or primitive
+            value.
+        path: The path to look up.
+
+    Returns:
+        Any: The value at the path, or `MISSING` if there is no such
+            value.
 
     Examples:
-        Adding commas to a large integer:
+        >>> data = [{"users": [{"name": "Alice"}, {"name": "Bob"}]}]
+        >>> lookup_path(data, "1::users::2::name")
+        'Bob'
+        >>> lookup_path(data, "1::users::3::name") is MISSING
+        True
+        >>> lookup_path(data, "1::users") is MISSING
+        True
+        >>> lookup_path({"a::b": {"c": 1}}, "a::b::c")
+        1
 
-            >>> text = "There are 31556926 seconds in a year."
-            >>> add_thousands_separator(text)
-            'There are 31,556,926 seconds in a year.'
+    """
+    return _lookup_parts(obj, path.split("::"), 0)
 
-        Adding commas to the integer part of a large decimal number:
 
-            >>> text = "14 pounds are 6350.2932 grams."
-            >>> add_thousands_separator(text)
-            '14 pounds are 6,350.2932 grams.'
+def _lookup_parts(
+    obj: Any,  # noqa: ANN401
+    parts: list[str],
+    start: int,
+) -> Any:  # noqa: ANN401
+    if start == len(parts):
+        return MISSING if isinstance(obj, (dict, list)) else obj
+
+    if isinstance(obj, list):
+        part = parts[start]
+
+        if (not part.isascii()
+            or not part.isdigit()
+            or str(int(part)) != part
+            or not 1 <= int(part) <= len(obj)):
+            return MISSING
+
+        return _lookup_parts(obj[int(part) - 1], parts, start + 1)
+
+    if isinstance(obj, dict):
+        candidates = []
+        key = parts[start]
+
+        for end in range(start + 1, len(parts) + 1):
+            if end > start + 1:
+                key = f"{key}::{parts[end - 1]}"
+
+            if key in obj:
+                value = _lookup_parts(obj[key], parts, end)
+
+                if value is not MISSING:
+                    candidates.append((key, value))
+
+        if len(candidates) == 0:
+            return MISSING
+
+        if len(candidates) > 1:
+            # NOTE `traverse` yields the values in the order of the
+            # dict keys, and `make_json_dict` keeps the last one.
+            #
+            order = {key: index for index, key in enumerate(obj)}
+            candidates.sort(key=lambda candidate: order[candidate[0]])
+
+        return candidates[-1][1]
+
+    return MISSING
+
+
+def make_json_dict_for_keys(json_files: list[dict], keys: set[str]) -> dict:
+    """Build a dict with only the given paths from multiple JSON dicts.
+
+    Unlike `make_json_dict`, this function doesn't flatten the input
+    dicts.  It looks up each path separately instead, so its cost
+    depends on the number of paths rather than on the size of the JSON
+    files.  Paths that are not present in the input are left out of the
+    result.
+
+    Examples:
+        >>> data = []
+        >>> data.append({"name": "Alice", "age": 42})
+        >>> data.append({"name": "Bob", "age": 39})
+        >>> make_json_dict_for_keys(data, {"2::name", "3::name"})
+        {'2::name': 'Bob'}
 
     """
+    result = {}
 
-    def replace(match: re.Match) -> str:
-        number = match.group(2)
+    for key in keys:
+        value = lookup_path(json_files, key)
 
-        if len(number) < 4:
-            return match.group(0)
+        if value is not MISSING:
+            result[key] = value
 
-        for position in range(len(number) - 3, 0, -3):
-            number = number[:position] + "," + number[position:]
+    return result
 
-        return f"{match.group(1)}{number}"
 
-    return re.sub(r"(^|[^.0-9])([0-9]+)", replace, string)
+def make_json_dict_from_flattened(
+    flattened_files: list[dict],
+    keys: set[str],
+) -> dict:
+    """Build a dict with only the given paths from flattened JSON dicts.
 
+    Each flattened dict maps the paths within one JSON file to values,
+    as yielded by `traverse`.  The result is the same as that of
+    `make_json_dict_for_keys` for the unflattened JSON dicts.
 
-@click.command(help=(
-    "Generate a LaTeX table from a TOML formatted table specification "
-    "(read from stdin) and a set of JSON files (specified as "
-    "arguments)."
-))
-@click.option("-j", "--json-filename",
-              required=True, type=str, multiple=True,
-              help=(
-                  "JSON file to use as input to the table. In a "
-                  "regression table, each JSON file would most likely "
-                  "correspond to a separate column."
-              ))
-@click.option("-t", "--title", required=False, type=str,
-              help=(
-                  r"Add title with the \caption{} command. Implies use "
-                  "of the table and threeparttable environments."
-              ))
-@click.option("-l", "--label", required=False, type=str,
-              help=(
-                  r"Add label with the \label{} command. Implies use "
-                  "of the table and threeparttable environments."
-              ))
-@click.option("-i", "--ignore-missing-keys", is_flag=True,
-              help=(
-                  "Ignore keys that are not present in the "
-                  "corresponding JSON file."
-              ))
-@click.option("-F", "--from-template", is_flag=True,
-              help=(
-                  "Treat stdin as a template instead of a table "
-                  "specification."
-              ))
-@click.option("-T", "--only-template", is_flag=True,
-              help=(
-                  "Print template instead of the final table to stdout."
-              ))
-@click.option("-H", "--human-readable-numbers", is_flag=True,
-              help=(
-                  "Add commas as thousands separators to numbers in "
-                  "the final table."
-              ))
-@click.option("-d", "--debug", is_flag=True)
-def main(
-    json_filename: str,
-    title: str | None,
-    label: str | None,
-    *,
-    ignore_missing_keys: bool = False,
-    from_template: bool = False,
-    only_template: bool = False,
-    human_readable_numbers: bool = False,
-    debug: bool = False,
-) -> None:
-    """Generate and print a LaTeX table from TOML spec and JSON files.
-
-    This function serves as the command-line entry point, handling
-    argument parsing via decorators.
-
-    Raises:
-        TableJsonMismatchError: If TOML spec doesn't match JSON files.
-        TableSpecificationError: If TOML spec fails validation checks.
-        ValueError: If incompatible command-line options are provided.
+    Examples:
+        >>> data = []
+        >>> data.append(dict(traverse({"name": "Alice", "age": 42})))
+        >>> data.append(dict(traverse(39)))
+        >>> json_dict = make_json_dict_from_flattened(
+        ...     data, {"1::name", "2", "3"},
+        ... )
+        >>> sorted(json_dict.items())
+        [('1::name', 'Alice'), ('2', 39)]
 
     """
-    if not debug:
-        sys.tracebacklimit = 0
+    result = {}
 
-    # Rule out some invalid argument combinations.
-    #
+    for key in keys:
+        column, _, subpath = key.partition("::")
 
-    if from_template and only_template:
-        msg = (
-            "--from-template and --only-template cannot be used "
-            "together."
-        )
-        raise ValueError(msg)
-
-    if from_template:
-        if title is not None:
-            msg = "--from-template and --title cannot be used together."
-            raise ValueError(msg)
-
-        if label is not None:
-            msg = "--from-template and --label cannot be used together."
-            raise ValueError(msg)
-
-    if only_template:
-        if ignore_missing_keys:
-            msg = (
-                "--only-template and --ignore-missing-keys cannot be "
-                "used together."
-            )
-            raise ValueError(msg)
-
-        if human_readable_numbers:
-            msg = (
-                "--only-template and --human-readable-numbers cannot "
-                "be used together."
-            )
-            raise ValueError(msg)
-
-    # Load or generate the template.
-    #
+        if (not column.isascii()
+            or not column.isdigit()
+            or str(int(column)) != column
+            or not 1 <= int(column) <= len(flattened_files)):
+            continue
+
+        flattened = flattened_files[int(column) - 1]
+        value = flattened.get(subpath if "::" in key else None, MISSING)
 
-    if from_template:
-        # Read the template from stdin.
-        #
-        template = sys.stdin.read()
-    else:
-        # Generate the template from the table specification on stdin.
-        #
+        if value is not MISSING:
+            result[key] = value
 
-        table_spec = parse_toml(
-            toml.loads(sys.stdin.read()))
+    return result
 
-        confirm_consistent_column_count(table_spec, [json_filename])
 
-        template = make_template(
-            table_spec, [json_filename], title, label,
-        )
+def get_thousands_separator(
+    human_readable_numbers: bool,
+    thousands_separator: str | None = None,
+) -> str | None:
+    """Return the separator that human-readable numbers are filled with.
 
-    # Use the template.
+    Args:
+        human_readable_numbers: Whether to add thousands separators.
+        thousands_separator: The name of the separator in
+            `THOUSANDS_SEPARATORS`, or None for the default comma.
+
+    Returns:
+        str | None: The separator, or None if numbers are left alone.
+
+    Examples:
+        >>> get_thousands_separator(True)
+        ','
+        >>> get_thousands_separator(False, "thin-space")
+        '\\\\,'
+        >>> get_thousands_separator(False) is None
+        True
+
+    """
+    # NOTE Setting the separator implies human-readable numbers, as with
+    # the command-line options.
     #
+    if human_readable_numbers or thousands_separator is not None:
+        return THOUSANDS_SEPARATORS[thousands_separator or "comma"]
+
+    return None
+
+
+def add_thousands_separator(string: str, separator: str = ",") -> str:
+    """Insert thousands separators into large numbers in the input string.
+
+    Examples:
+        Adding commas to a large integer:
+
+            >>> text = "There are 31556926 seconds in a year."
+            >>> add_thousands_separator(text)
+            'There are 31,556,926 seconds in a year.'
+
+        Adding commas to the integer part of a large decimal number:
+
+            >>> text = "14 pounds are 6350.2932 grams."
+            >>> add_thousands_separator(text)
+            '14 pounds are 6,350.2932 grams.'
 
-    if only_template:
-        print(template, end="")
-    else:
-        # Use the template to print the final table.
-        #
+        Using a different separator:
 
-        json_files = [
-            load_json_file(filename) for filename in json_filename
-        ]
+            >>> add_thousands_separator("31556926", "{,}")
+            '31{,}556{,}926'
 
-        result = fill_template(
-            template,
-            make_json_dict(json_files),
-            ignore_missing_keys=ignore_missing_keys,
-        )
+    """
 
-        if human_readable_numbers:
-            result = add_thousands_separator(result)
+    def replace(match: re.Match) -> str:
+        number = match.group(2)
+
+        if len(number) < 4:
+            return match.group(0)
+
+        for position in range(len(number) - 3, 0, -3):
+            number = number[:position] + separator + number[position:]
+
+        return f"{match.group(1)}{number}"
+
+    return re.sub(r"(^|[^.0-9])([0-9]+)", replace, string)
 
-        print(result, end="")
 
+def __getattr__(name: str) -> Any:  # noqa: ANN401
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
 
-if __name__ == "__main__":
-    main()
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
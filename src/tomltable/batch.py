@@ -0,0 +1,580 @@
+import contextlib
+import io
+import sys
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import click
+
+from tomltable import (
+    TABLE_FORMATS,
+    THOUSANDS_SEPARATORS,
+    get_thousands_separator,
+    load_json_file,
+    make_json_dict_for_keys,
+)
+from tomltable.compiled import (
+    VALUE_ESCAPES,
+    CompiledTemplate,
+    compile_template,
+    load_template,
+)
+from tomltable.errors import BatchSpecificationError
+from tomltable.parser import (
+    confirm_consistent_column_count,
+    load_toml,
+    parse_toml,
+    parse_toml_bool_field,
+    parse_toml_string_field,
+)
+from tomltable.parallel import map_with_shared_json_files
+from tomltable.template import make_template
+from tomltable.types import TableJob
+
+
+def parse_toml_path_field(
+    value: Any,  # noqa: ANN401
+    field_name: str,
+    parent_keys: str,
+    base_dir: Path,
+) -> str:
+    """Validate that a value is a string and resolve it as a path.
+
+    Relative paths are interpreted relative to `base_dir`.
+
+    Raises:
+        BatchSpecificationError: If the value is not a string.
+
+    Examples:
+        >>> parse_toml_path_field("a.json", "json", "table", Path("/x"))
+        '/x/a.json'
+        >>> parse_toml_path_field("/a.json", "json", "table", Path("/x"))
+        '/a.json'
+
+    """
+    if not isinstance(value, str):
+        msg = (
+            f"Value for field '{field_name}' in '{parent_keys}' should "
+            f"be a string but it has type '{type(value).__name__}' "
+            "instead."
+        )
+        raise BatchSpecificationError(msg)
+
+    return str(base_dir / value)
+
+
+def parse_toml_table_job(
+    obj: dict,
+    parent_key: str,
+    base_dir: Path,
+) -> TableJob:
+    """Parse a dict into a structured TableJob object.
+
+    Supported keys are 'spec', 'template', 'json', 'csv', 'models',
+    'csv-columns', 'output', 'title', 'label', 'ignore-missing-keys',
+    'human-readable-numbers', 'thousands-separator', and 'format'.
+    Exactly one of 'spec' and 'template' and exactly one of 'json' and
+    'csv' have to be specified, and 'output' is mandatory.  'models' and
+    'csv-columns' can only be specified with 'csv'.
+
+    Args:
+        obj: Dict containing the job specification.
+        parent_key: Key describing the job (e.g., "table.1").
+        base_dir: Directory that relative paths are interpreted in.
+
+    Returns:
+        TableJob: A validated and structured TableJob instance.
+
+    Raises:
+        BatchSpecificationError: If required fields are missing,
+            invalid keys are used, or if the fields are inconsistent.
+
+    Examples:
+        >>> obj = {"spec": "a.toml", "json": "a.json", "output": "a.tex"}
+        >>> job = parse_toml_table_job(obj, "table.1", Path("/x"))
+        >>> job.json_filenames
+        ['/x/a.json']
+
+    """
+    result = TableJob()
+
+    for key, value in obj.items():
+        if key in ("spec", "template", "output", "csv"):
+            setattr(
+                result,
+                key,
+                parse_toml_path_field(value, key, parent_key, base_dir),
+            )
+        elif key == "json":
+            values = value if isinstance(value, list) else [value]
+
+            if len(values) == 0:
+                msg = (
+                    f"Value for field 'json' in '{parent_key}' should "
+                    "be a string or a list of strings but it is an "
+                    "empty list instead."
+                )
+                raise BatchSpecificationError(msg)
+
+            result.json_filenames = [
+                parse_toml_path_field(x, key, parent_key, base_dir)
+                for x in values
+            ]
+        elif key in ("models", "csv-columns"):
+            if (not isinstance(value, list)
+                or any(not isinstance(x, str) for x in value)):
+                msg = (
+                    f"Value for field '{key}' in '{parent_key}' should "
+                    "be a list of strings."
+                )
+                raise BatchSpecificationError(msg)
+
+            if key == "models":
+                result.csv_models = value
+            elif len(value) != len(result.csv_columns):
+                msg = (
+                    f"Value for field '{key}' in '{parent_key}' should "
+                    "list the names of the model, term, statistic, and "
+                    "value columns."
+                )
+                raise BatchSpecificationError(msg)
+            else:
+                result.csv_columns = tuple(value)
+        elif key in ("title", "label"):
+            setattr(
+                result,
+                key,
+                parse_toml_string_field(value, key, parent_key),
+            )
+        elif key in ("ignore-missing-keys", "human-readable-numbers"):
+            setattr(
+                result,
+                key.replace("-", "_"),
+                parse_toml_bool_field(value, key, parent_key),
+            )
+        elif key == "thousands-separator":
+            value = parse_toml_string_field(value, key, parent_key)
+
+            if value not in THOUSANDS_SEPARATORS:
+                choices = ", ".join(
+                    f"'{name}'" for name in THOUSANDS_SEPARATORS
+                )
+                msg = (
+                    f"Value for field '{key}' in '{parent_key}' should "
+                    f"be one of {choices} but it is '{value}' instead."
+                )
+                raise BatchSpecificationError(msg)
+
+            result.thousands_separator = value
+        elif key == "format":
+            value = parse_toml_string_field(value, key, parent_key)
+
+            if value not in TABLE_FORMATS:
+                msg = (
+                    f"Value for field '{key}' in '{parent_key}' should "
+                    f"be one of {', '.join(TABLE_FORMATS)} but it is "
+                    f"'{value}' instead."
+                )
+                raise BatchSpecificationError(msg)
+
+            result.table_format = value
+        else:
+            msg = (
+                f"Field '{key}' for '{parent_key}' is not 'spec', "
+                "'template', 'json', 'csv', 'models', 'csv-columns', "
+                "'output', 'title', 'label', 'ignore-missing-keys', "
+                "'human-readable-numbers', 'thousands-separator', or "
+                "'format'."
+            )
+            raise BatchSpecificationError(msg)
+
+    if (result.spec is None) == (result.template is None):
+        msg = (
+            "Must specify exactly one of field 'spec' and field "
+            f"'template' for '{parent_key}'."
+        )
+        raise BatchSpecificationError(msg)
+
+    if result.template is not None and (
+        result.title is not None or result.label is not None
+    ):
+        msg = (
+            "Cannot specify field 'title' or field 'label' together "
+            f"with field 'template' for '{parent_key}'."
+        )
+        raise BatchSpecificationError(msg)
+
+    if (len(result.json_filenames) == 0) == (result.csv is None):
+        msg = (
+            "Must specify exactly one of field 'json' and field 'csv' "
+            f"for '{parent_key}'."
+        )
+        raise BatchSpecificationError(msg)
+
+    if result.csv is None and (
+        result.csv_models is not None or "csv-columns" in obj
+    ):
+        msg = (
+            "Cannot specify field 'models' or field 'csv-columns' "
+            f"without field 'csv' for '{parent_key}'."
+        )
+        raise BatchSpecificationError(msg)
+
+    if result.output is None:
+        msg = f"Must specify field 'output' for '{parent_key}'."
+        raise BatchSpecificationError(msg)
+
+    return result
+
+
+def parse_toml_batch(toml_spec: dict, base_dir: Path) -> list[TableJob]:
+    """Parse a batch specification dict into a list of jobs.
+
+    The batch specification has a single section, 'table', which is a
+    list of job specifications.
+
+    Args:
+        toml_spec: The full TOML batch specification as a dict.
+        base_dir: Directory that relative paths are interpreted in.
+
+    Returns:
+        list[TableJob]: The validated jobs in the order of the
+            specification.
+
+    Raises:
+        BatchSpecificationError: If the structure does not match
+            expectations.
+
+    """
+    for key in toml_spec:
+        if key != "table":
+            msg = f"Section should be 'table' but it is '{key}' instead."
+            raise BatchSpecificationError(msg)
+
+    tables = toml_spec.get("table", [])
+
+    if (not isinstance(tables, list)
+        or any(not isinstance(x, dict) for x in tables)):
+        msg = "Value for 'table' should be a list of dictionaries."
+        raise BatchSpecificationError(msg)
+
+    return [
+        parse_toml_table_job(obj, f"table.{index}", base_dir)
+        for index, obj in enumerate(tables, 1)
+    ]
+
+
+def format_error(error: Exception) -> str:
+    """Describe an error for the report of a job.
+
+    Examples:
+        >>> format_error(ValueError("Bad value."))
+        'ValueError: Bad value.'
+
+    """
+    return f"{type(error).__name__}: {error}"
+
+
+def load_json_files(
+    jobs: list[TableJob],
+) -> tuple[dict[str, Any], dict[str, str]]:
+    """Load every distinct JSON file that the jobs use exactly once.
+
+    A file that fails to load is recorded instead of stopping the batch,
+    so that only the jobs that use it fail.
+
+    Returns:
+        tuple[dict[str, Any], dict[str, str]]: A dict mapping each
+            filename to the content of the file, and a dict mapping the
+            filename of each file that failed to load to the error.
+
+    """
+    json_files = {}
+    errors = {}
+
+    for job in jobs:
+        if job.csv is not None:
+            continue
+
+        for filename in job.json_filenames:
+            if filename in json_files or filename in errors:
+                continue
+
+            try:
+                json_files[filename] = load_json_file(filename)
+            except Exception as error:  # noqa: BLE001
+                errors[filename] = format_error(error)
+
+    return json_files, errors
+
+
+def load_csv_results(
+    jobs: list[TableJob],
+) -> tuple[dict[str, Any], dict[str, str]]:
+    """Load every distinct long-format results file exactly once.
+
+    The models of each file are added to the result under the name
+    'FILE:MODEL', like JSON files, and `json_filenames` of each job that
+    uses the file is set to the names of its models.  A file that fails
+    to load and a model that is not in its file are recorded instead of
+    stopping the batch, so that only the jobs that use them fail.
+
+    Returns:
+        tuple[dict[str, Any], dict[str, str]]: A dict mapping the name
+            of each model to its values, and a dict mapping the name of
+            each file or model that failed to load to the error.
+
+    """
+    from tomltable.longformat import load_long_results
+
+    loaded: dict[tuple[str, tuple[str, ...]], dict[str, dict]] = {}
+    json_files = {}
+    errors = {}
+
+    for job in jobs:
+        if job.csv is None:
+            continue
+
+        key = (job.csv, job.csv_columns)
+
+        if key not in loaded:
+            try:
+                loaded[key] = dict(
+                    load_long_results(job.csv, job.csv_columns),
+                )
+            except Exception as error:  # noqa: BLE001
+                loaded[key] = None
+                errors.setdefault(job.csv, format_error(error))
+
+        results = loaded[key]
+
+        # NOTE The job refers to the file itself, so that it fails with
+        # the error of the file.
+        #
+        if results is None:
+            job.json_filenames = [job.csv]
+            continue
+
+        models = job.csv_models or list(results)
+
+        job.json_filenames = [f"{job.csv}:{model}" for model in models]
+
+        for model, filename in zip(models, job.json_filenames, strict=True):
+            if model in results:
+                json_files[filename] = results[model]
+            else:
+                errors[filename] = format_error(
+                    ValueError(f"Model '{model}' is not in {job.csv}."),
+                )
+
+    return json_files, errors
+
+
+def get_load_error(job: TableJob, errors: Mapping[str, str]) -> str | None:
+    """Return the error of the first file of a job that failed to load.
+
+    Examples:
+        >>> job = TableJob(json_filenames=["a.json", "b.json"])
+        >>> get_load_error(job, {"b.json": "OSError: No such file."})
+        'OSError: No such file.'
+        >>> get_load_error(job, {}) is None
+        True
+
+    """
+    for filename in job.json_filenames:
+        if filename in errors:
+            return errors[filename]
+
+    return None
+
+
+def make_job_template(job: TableJob) -> CompiledTemplate:
+    """Load or generate the compiled template for a job.
+
+    Raises:
+        TableJsonMismatchError: If TOML spec doesn't match JSON files.
+        TableSpecificationError: If TOML spec fails validation checks.
+
+    """
+    if job.template is not None:
+        return load_template(Path(job.template).read_text())
+
+    table_spec = parse_toml(
+        load_toml(Path(job.spec).read_text()))
+
+    confirm_consistent_column_count(table_spec, job.json_filenames)
+
+    return compile_template(
+        make_template(
+            table_spec,
+            job.json_filenames,
+            job.title,
+            job.label,
+            job.table_format,
+        ),
+    )
+
+
+@dataclass
+class JobResult:
+    """Outcome of rendering a job.
+
+    Attributes:
+        table: The final table, or None if rendering failed.
+        warnings: The warnings that were printed while rendering.
+        error: A description of the error if rendering failed.
+
+    """
+
+    table: str | None = None
+    warnings: str     = ""
+    error: str | None = None
+
+
+def render_job(job: TableJob, json_files: Mapping[str, Any]) -> str:
+    """Generate the final table for a job.
+
+    Args:
+        job: The job to render.
+        json_files: A dict mapping filenames to loaded JSON files.  It
+            has to include every file in `job.json_filenames`.
+
+    Returns:
+        str: The final table.
+
+    """
+    compiled_template = make_job_template(job)
+
+    json_dict = make_json_dict_for_keys(
+        [json_files[filename] for filename in job.json_filenames],
+        compiled_template.keys,
+    )
+
+    return compiled_template.fill(
+        json_dict,
+        ignore_missing_keys=job.ignore_missing_keys,
+        thousands_separator=get_thousands_separator(
+            job.human_readable_numbers, job.thousands_separator,
+        ),
+        escape=VALUE_ESCAPES.get(job.table_format),
+    )
+
+
+def run_job(job: TableJob, json_files: Mapping[str, Any]) -> JobResult:
+    """Render a job and capture its warnings and errors.
+
+    Unlike `render_job`, this function doesn't raise exceptions, so a
+    failing job doesn't prevent other jobs from being rendered.
+
+    """
+    warnings = io.StringIO()
+
+    try:
+        with contextlib.redirect_stderr(warnings):
+            table = render_job(job, json_files)
+    except Exception as error:  # noqa: BLE001
+        return JobResult(
+            warnings=warnings.getvalue(), error=format_error(error),
+        )
+
+    return JobResult(table=table, warnings=warnings.getvalue())
+
+
+@click.command(help=(
+    "Generate several LaTeX tables in one process from a TOML "
+    "formatted list of jobs. Each JSON or CSV file is loaded only "
+    "once, even if several tables use it."
+))
+@click.argument("jobs_filename", type=str)
+@click.option("-J", "--jobs", "max_workers",
+              type=click.IntRange(min=0), default=1, show_default=True,
+              help=(
+                  "Number of processes to render the tables with. Use "
+                  "0 for one process per CPU."
+              ))
+@click.option("-d", "--debug", is_flag=True)
+def main(
+    jobs_filename: str,
+    max_workers: int = 1,
+    *,
+    debug: bool = False,
+) -> None:
+    """Render every table in a batch specification to its output file.
+
+    Relative paths in the batch specification are interpreted relative
+    to the directory of the batch specification.  A table that fails to
+    render, e.g., because one of its JSON files is missing, is reported
+    on stderr, and the remaining tables are still rendered.  The output
+    files and the messages on stderr are the same regardless of the
+    number of processes.
+
+    Raises:
+        BatchSpecificationError: If the batch spec fails validation.
+        SystemExit: If any of the tables fails to render.
+
+    """
+    if not debug:
+        sys.tracebacklimit = 0
+
+    jobs_path = Path(jobs_filename)
+
+    jobs = parse_toml_batch(
+        load_toml(jobs_path.read_text()), jobs_path.parent,
+    )
+
+    json_files, errors = load_json_files(jobs)
+    csv_files, csv_errors = load_csv_results(jobs)
+
+    json_files.update(csv_files)
+    errors.update(csv_errors)
+
+    # The jobs that use a file that failed to load fail without being
+    # rendered, and the other jobs are rendered as usual.
+    #
+    failed_results = {
+        index: JobResult(error=error)
+        for index, job in enumerate(jobs)
+        if (error := get_load_error(job, errors)) is not None
+    }
+    pending = [
+        job for index, job in enumerate(jobs) if index not in failed_results
+    ]
+
+    if max_workers == 1:
+        rendered = [run_job(job, json_files) for job in pending]
+    else:
+        rendered = map_with_shared_json_files(
+            run_job, pending, json_files, max_workers or None,
+        )
+
+    rendered_results = iter(rendered)
+    results = [
+        failed_results[index]
+        if index in failed_results
+        else next(rendered_results)
+        for index in range(len(jobs))
+    ]
+
+    failure_count = 0
+
+    for job, result in zip(jobs, results, strict=True):
+        print(result.warnings, end="", file=sys.stderr)
+
+        if result.table is None:
+            print(f"error: {job.output}: {result.error}", file=sys.stderr)
+            failure_count += 1
+        else:
+            Path(job.output).write_text(result.table)
+
+    if failure_count > 0:
+        print(
+            f"error: {failure_count} of {len(jobs)} tables failed.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+import contextlib
+import functools
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from tomltable import DEFAULT_CACHE_MAX_SIZE_MB, traverse
+
+
+def hash_bytes(data: bytes) -> str:
+    """Return a hex digest of the data for content-addressed entries.
+
+    Examples:
+        >>> hash_bytes(b"{}")
+        'a22cbfd1a6f7d67d65014b57b47a96408c8f58b5'
+
+    """
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+@functools.cache
+def get_code_version() -> str:
+    """Return a hash of the source code of the installed tomltable.
+
+    The hash changes whenever another version is installed, and also
+    when the code of an editable install is changed.  Hashing the few
+    modules takes less than a millisecond, whereas importing
+    `importlib.metadata` to look up the version takes tens of
+    milliseconds.
+
+    """
+    digest = hashlib.blake2b(digest_size=20)
+
+    for path in sorted(Path(__file__).parent.glob("*.py")):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+
+    return digest.hexdigest()
+
+
+class EntryCache:
+    """Directory of cache entries that are shared between runs.
+
+    Entries are serialized with `marshal`, written to a temporary file,
+    and renamed into place, so concurrent readers never see a partially
+    written entry, and an entry that another process has just evicted
+    is treated as a miss.  Every hit updates the modification time of
+    the entry.  If new entries were written, `evict` removes the least
+    recently used entries until the total size of the cache is within
+    `max_size`.
+
+    Attributes:
+        directory: The directory that holds the entries.  Entries are
+            kept in a subdirectory for the running Python version,
+            because the `marshal` format is version-specific.
+        max_size: The size limit of the cache in bytes.
+
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_size: int = DEFAULT_CACHE_MAX_SIZE_MB * 1024 * 1024,
+    ) -> None:
+        self.directory = Path(directory) / sys.implementation.cache_tag
+        self.max_size = max_size
+        self.modified = False
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def read_entry(self, name: str) -> Any:  # noqa: ANN401
+        """Read an entry and mark it as recently used.
+
+        Returns:
+            Any: The content of the entry, or None if there is no such
+                entry or it cannot be read.
+
+        """
+        path = self.directory / name
+
+        try:
+            with path.open("rb") as entry_file:
+                value = marshal.load(entry_file)
+
+            os.utime(path)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+        return value
+
+    def write_entry(self, name: str, value: Any) -> None:  # noqa: ANN401
+        """Write an entry atomically."""
+        file_descriptor, temp_name = tempfile.mkstemp(
+            dir=self.directory, prefix=".tmp-",
+        )
+
+        try:
+            with os.fdopen(file_descriptor, "wb") as entry_file:
+                marshal.dump(value, entry_file)
+
+            Path(temp_name).replace(self.directory / name)
+            self.modified = True
+        except BaseException:
+            with contextlib.suppress(OSError):
+                Path(temp_name).unlink()
+            raise
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits."""
+        if not self.modified:
+            return
+
+        entries = []
+        total_size = 0
+
+        with os.scandir(self.directory) as iterator:
+            for entry in iterator:
+                if entry.name.startswith(".tmp-"):
+                    continue
+
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+
+                entries.append(
+                    (stat.st_mtime_ns, stat.st_size, entry.path),
+                )
+                total_size += stat.st_size
+
+        if total_size <= self.max_size:
+            return
+
+        entries.sort()
+
+        for _, size, path in entries:
+            with contextlib.suppress(OSError):
+                Path(path).unlink()
+
+            total_size -= size
+
+            if total_size <= self.max_size:
+                break
+
+
+class JsonCache(EntryCache):
+    """On-disk cache of flattened JSON files.
+
+    Each JSON file is stored as the dict that `traverse` yields for it.
+    Entries are content-addressed: a data entry is named after the hash
+    of the JSON text.  A second, small entry maps the resolved path,
+    size, and modification time of the JSON file to that hash, so a
+    warm lookup neither reads nor decodes the JSON file.
+
+    Attributes:
+        json_backend: The JSON decoder to use, one of `JSON_BACKENDS`.
+
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_size: int = DEFAULT_CACHE_MAX_SIZE_MB * 1024 * 1024,
+        json_backend: str = "auto",
+    ) -> None:
+        super().__init__(directory, max_size)
+        self.json_backend = json_backend
+
+    def load(self, filename: str) -> dict[str | None, Any]:
+        """Return the flattened content of a JSON file.
+
+        Raises:
+            ValueError: If the file is not valid JSON.
+
+        """
+        path = Path(filename).resolve()
+        stat_before = path.stat()
+        stat_key = hash_bytes(
+            f"{path}\0{stat_before.st_size}\0{stat_before.st_mtime_ns}"
+            .encode(),
+        )
+
+        content_hash = self.read_entry(f"{stat_key}.stat")
+
+        if content_hash is not None:
+            flattened = self.read_entry(f"{content_hash}.data")
+
+            if flattened is not None:
+                return flattened
+
+        data = path.read_bytes()
+        content_hash = hash_bytes(data)
+
+        flattened = self.read_entry(f"{content_hash}.data")
+
+        if flattened is None:
+            from tomltable.jsondecode import get_decoder
+
+            decode = get_decoder(self.json_backend)
+            flattened = dict(traverse(decode(data)))
+            self.write_entry(f"{content_hash}.data", flattened)
+
+        stat_after = path.stat()
+
+        # NOTE If the file changed while we were reading it, then the
+        # hash may not belong to the size and the modification time
+        # that we saw at first.
+        #
+        if (stat_after.st_size == stat_before.st_size
+            and stat_after.st_mtime_ns == stat_before.st_mtime_ns):
+            self.write_entry(f"{stat_key}.stat", content_hash)
+
+        return flattened
+
+
+class TemplateCache(EntryCache):
+    """On-disk cache of parsed table specifications and templates.
+
+    A template entry is named after the hash of everything that
+    `make_template` depends on: the table specification, the number of
+    columns, the title, the label, the output format, and the columns to
+    include.  A warm lookup therefore neither parses the TOML nor
+    generates the template.  If only the other parameters changed, the
+    parsed TOML, which is stored in an entry named after the hash of the
+    specification alone, is reused and validated again.  Like every
+    entry, it is plain data, so reading a cache directory that others
+    can write to doesn't run their code.
+
+    Both hashes include `get_code_version`, so entries written by
+    another version of tomltable, which may parse or render differently,
+    are never used.
+
+    """
+
+    def get_template(
+        self,
+        text: str,
+        json_filenames: list[str],
+        title: str | None,
+        label: str | None,
+        table_format: str,
+        columns: range | None = None,
+    ) -> str:
+        """Return the template for a table specification.
+
+        The arguments are the same as those of `make_template`, except
+        that the table specification is given as TOML text.
+
+        Raises:
+            TableJsonMismatchError: If TOML spec doesn't match JSON files.
+            TableSpecificationError: If TOML spec fails validation checks.
+
+        """
+        version = get_code_version()
+        template_key = hash_bytes(
+            repr((
+                version, text, len(json_filenames), title, label,
+                table_format, columns,
+            )).encode(),
+        )
+
+        template = self.read_entry(f"{template_key}.template")
+
+        if isinstance(template, str):
+            return template
+
+        from tomltable.parser import (
+            confirm_consistent_column_count,
+            load_toml,
+            parse_toml,
+        )
+        from tomltable.template import make_template
+
+        spec_key = hash_bytes(repr((version, text)).encode())
+        toml_spec = self.read_entry(f"{spec_key}.toml")
+
+        if not isinstance(toml_spec, dict):
+            toml_spec = load_toml(text)
+
+            # NOTE `marshal` can't serialize the dates that TOML allows,
+            # so such a specification is parsed again every time.
+            #
+            with contextlib.suppress(ValueError):
+                self.write_entry(f"{spec_key}.toml", toml_spec)
+
+        table_spec = parse_toml(toml_spec)
+
+        confirm_consistent_column_count(table_spec, json_filenames)
+
+        template = make_template(
+            table_spec, json_filenames, title, label, table_format, columns,
+        )
+        self.write_entry(f"{template_key}.template", template)
+
+        return template
@@ -0,0 +1,1282 @@
+import sys
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+import click
+
+from tomltable import (
+    DEFAULT_CACHE_MAX_SIZE_MB,
+    JSON_BACKENDS,
+    TABLE_FORMATS,
+    THOUSANDS_SEPARATORS,
+    get_thousands_separator,
+    load_json_file,
+    make_json_dict_for_keys,
+    make_json_dict_from_flattened,
+)
+from tomltable.profiling import Profiler
+
+# NOTE Only the modules that every run needs are imported here.  The
+# modules for the other code paths are imported where they are used, so
+# that, e.g., filling a compiled template doesn't import the TOML
+# parser.
+#
+
+# The placeholder for the number of the chunk in an --output filename,
+# and the separator between the chunks that are written to one file.
+#
+CHUNK_PLACEHOLDER = "{chunk}"
+CHUNK_SEPARATOR = "\n\n"
+
+
+def get_chunk_filename(filename: str, number: int) -> str:
+    """Return the filename of a chunk of a table that --max-columns split.
+
+    Examples:
+        >>> get_chunk_filename("tables/wide-{chunk}.tex", 2)
+        'tables/wide-2.tex'
+        >>> get_chunk_filename("tables/wide.tex", 2)
+        'tables/wide.tex'
+
+    """
+    return filename.replace(CHUNK_PLACEHOLDER, str(number))
+
+
+def split_columns(column_count: int, max_columns: int) -> list[range]:
+    """Split the columns into consecutive chunks of at most `max_columns`.
+
+    Examples:
+        >>> split_columns(5, 2)
+        [range(1, 3), range(3, 5), range(5, 6)]
+        >>> split_columns(2, 5)
+        [range(1, 3)]
+
+    """
+    return [
+        range(start, min(start + max_columns, column_count + 1))
+        for start in range(1, column_count + 1, max_columns)
+    ]
+
+
+def is_output_up_to_date(output_filename: str, fingerprint: str) -> bool:
+    """Check whether an --output was generated from the same inputs.
+
+    If the filename contains `CHUNK_PLACEHOLDER`, every chunk file that
+    the previous run recorded has to be up to date.
+
+    """
+    from tomltable.incremental import get_chunk_count, is_up_to_date
+
+    if CHUNK_PLACEHOLDER not in output_filename:
+        return is_up_to_date(output_filename, fingerprint)
+
+    chunk_count = get_chunk_count(get_chunk_filename(output_filename, 1))
+
+    return chunk_count is not None and all(
+        is_up_to_date(get_chunk_filename(output_filename, number), fingerprint)
+        for number in range(1, chunk_count + 1)
+    )
+
+
+def remove_stale_chunks(output_filename: str, chunk_count: int) -> None:
+    """Remove the chunk files after the last chunk of a table.
+
+    Such files are left over from a run that split the table into more
+    chunks.  Only files that tomltable generated are removed.
+
+    """
+    from tomltable.incremental import remove_output
+
+    number = chunk_count + 1
+
+    while remove_output(get_chunk_filename(output_filename, number)):
+        number += 1
+
+
+def get_chunk_caption(
+        title: str | None,
+        label: str | None,
+        chunk_index: int) -> tuple[str | None, str | None]:
+    """Return the title and the label of a chunk of a split table.
+
+    The first chunk keeps the title and the label.  The title of each
+    later chunk is marked as continued, and its label gets the number of
+    the chunk, so that every label is unique.
+
+    Examples:
+        >>> get_chunk_caption("Results", "tab:results", 0)
+        ('Results', 'tab:results')
+        >>> get_chunk_caption("Results", "tab:results", 1)
+        ('Results (continued)', 'tab:results:2')
+        >>> get_chunk_caption(None, None, 1)
+        (None, None)
+
+    """
+    if chunk_index == 0:
+        return title, label
+
+    return (
+        None if title is None else f"{title} (continued)",
+        None if label is None else f"{label}:{chunk_index + 1}",
+    )
+
+
+def join_chunk_lines(chunks: list[Iterable[str]]) -> Iterator[str]:
+    """Chain the lines of the chunks of a table for a single file.
+
+    The chunks are separated by an empty line, like with
+    `CHUNK_SEPARATOR`.
+
+    Examples:
+        >>> list(join_chunk_lines([["a", "b"], ["c"]]))
+        ['a', 'b', '', 'c']
+
+    """
+    for index, lines in enumerate(chunks):
+        if index > 0:
+            yield ""
+
+        yield from lines
+
+
+def parse_output(value: str, default_format: str) -> tuple[str, str]:
+    """Split an --output value into the output format and the filename.
+
+    Examples:
+        >>> parse_output("csv:tables/a.csv", "tex")
+        ('csv', 'tables/a.csv')
+        >>> parse_output("tables/a.tex", "tex")
+        ('tex', 'tables/a.tex')
+        >>> parse_output("C:/tables/a.tex", "tex")
+        ('tex', 'C:/tables/a.tex')
+
+    """
+    table_format, separator, filename = value.partition(":")
+
+    if separator == "" or table_format not in TABLE_FORMATS:
+        return default_format, value
+
+    return table_format, filename
+
+
+# Pairs of options that cannot be used together.
+#
+INCOMPATIBLE_OPTIONS = (
+    ("--from-template", "--only-template"),
+    ("--from-template", "--title"),
+    ("--from-template", "--label"),
+    ("--from-template", "--max-columns"),
+    ("--only-template", "--compile-template"),
+    *(
+        (template_option, option)
+        for template_option in ("--only-template", "--compile-template")
+        for option in ("--ignore-missing-keys",
+                       "--human-readable-numbers",
+                       "--streaming-json")
+    ),
+    ("--streaming-output", "--from-template"),
+    ("--streaming-output", "--compile-template"),
+    ("--streaming-output", "--cache-dir"),
+    ("--streaming-json", "--cache-dir"),
+    ("--jsonl", "--cache-dir"),
+    ("--csv", "--streaming-json"),
+    ("--csv", "--cache-dir"),
+    ("--load-jobs", "--streaming-json"),
+    ("--load-jobs", "--jsonl"),
+    ("--load-jobs", "--csv"),
+    *(
+        ("--watch", option)
+        for option in ("--only-template",
+                       "--compile-template",
+                       "--streaming-json",
+                       "--cache-dir",
+                       "--load-jobs",
+                       "--max-columns",
+                       "--streaming-output",
+                       "--jsonl",
+                       "--csv",
+                       "--profile",
+                       "--profile-json",
+                       "--profile-dump")
+    ),
+)
+
+# Pairs of an option and another option that it requires.
+#
+REQUIRED_OPTIONS = (
+    ("--jsonl-lines", "--jsonl"),
+    ("--jsonl-where", "--jsonl"),
+    ("--csv-model", "--csv"),
+    ("--csv-columns", "--csv"),
+    ("--watch", "--spec"),
+    ("--watch", "--output"),
+)
+
+
+def get_incompatible_options(option: str) -> list[str]:
+    """Return the options that cannot be used together with `option`.
+
+    Examples:
+        >>> get_incompatible_options("--streaming-json")[:2]
+        ['--only-template', '--compile-template']
+
+    """
+    return [
+        second if first == option else first
+        for first, second in INCOMPATIBLE_OPTIONS
+        if option in (first, second)
+    ]
+
+
+def check_options(is_set: dict[str, bool]) -> None:
+    """Rule out the invalid combinations of command-line options.
+
+    Args:
+        is_set: A dict mapping every option in `INCOMPATIBLE_OPTIONS` and
+            `REQUIRED_OPTIONS` to whether it is set.
+
+    Raises:
+        ValueError: If two incompatible options are set, or if an option
+            is set without an option that it requires.
+
+    Examples:
+        >>> from collections import defaultdict
+        >>> check_options(defaultdict(bool, {"--from-template": True}))
+        >>> check_options(defaultdict(bool, {
+        ...     "--from-template": True, "--title": True,
+        ... }))
+        Traceback (most recent call last):
+        ...
+        ValueError: --from-template and --title cannot be used together.
+        >>> check_options(defaultdict(bool, {"--csv-model": True}))
+        Traceback (most recent call last):
+        ...
+        ValueError: --csv-model requires --csv.
+
+    """
+    for first, second in INCOMPATIBLE_OPTIONS:
+        if is_set[first] and is_set[second]:
+            msg = f"{first} and {second} cannot be used together."
+            raise ValueError(msg)
+
+    for option, required in REQUIRED_OPTIONS:
+        if is_set[option] and not is_set[required]:
+            msg = f"{option} requires {required}."
+            raise ValueError(msg)
+
+
+def find_outdated_outputs(
+    text: str,
+    outputs: list[tuple[str, str]],
+    input_filenames: list[str],
+    input_options: dict[str, Any],
+    *,
+    always: bool = False,
+) -> dict[str, str]:
+    """Fingerprint the inputs of each --output that is not up to date.
+
+    Args:
+        text: The table specification or the template.
+        outputs: Pairs of an output format and a filename.
+        input_filenames: The files that the columns are read from.
+        input_options: The options that affect the output, except for
+            the output format.
+        always: Whether every output is out of date, e.g., because the
+            input can't be fingerprinted.
+
+    Returns:
+        dict[str, str]: A dict mapping the filenames of the outputs that
+            are out of date to the fingerprints of their inputs.
+
+    """
+    from tomltable.incremental import make_fingerprint
+
+    fingerprints = {}
+
+    for output_format, output_filename in outputs:
+        fingerprint = make_fingerprint(
+            text,
+            input_filenames,
+            {**input_options, "table_format": output_format},
+        )
+
+        if always or not is_output_up_to_date(output_filename, fingerprint):
+            fingerprints[output_filename] = fingerprint
+
+    return fingerprints
+
+
+def open_csv_input(
+    csv: str,
+    columns: tuple[str, str, str, str],
+    models: list[str],
+    profiler: Profiler,
+) -> tuple[list[str], Callable[[set[str]], dict]]:
+    """Load the models in a long-format CSV file as the columns.
+
+    Returns:
+        tuple: The names of the columns, and a function that returns the
+            values at the given keys as a dict.
+
+    """
+    from tomltable.longformat import load_long_results
+
+    with profiler.stage("load CSV"):
+        csv_results = load_long_results(csv, columns, models or None)
+
+    def make_json_dict(keys: set[str]) -> dict:
+        with profiler.stage("flatten JSON"):
+            return make_json_dict_for_keys(
+                [values for _, values in csv_results], keys,
+            )
+
+    return [f"{csv}:{model}" for model, _ in csv_results], make_json_dict
+
+
+def open_jsonl_input(
+    jsonl: str,
+    jsonl_lines: str | None,
+    jsonl_where: list[str],
+    profiler: Profiler,
+    *,
+    streaming_json: bool,
+    json_backend: str,
+) -> tuple[list[str], Callable[[set[str]], dict]]:
+    """Select the lines of a JSON Lines file as the columns.
+
+    Returns:
+        tuple: The names of the columns, and a function that returns the
+            values at the given keys as a dict.
+
+    """
+    from tomltable.jsonlines import (
+        JsonLinesReader,
+        parse_condition,
+        parse_line_ranges,
+    )
+
+    jsonl_reader = JsonLinesReader(
+        jsonl,
+        None if jsonl_lines is None else parse_line_ranges(jsonl_lines),
+        [parse_condition(condition) for condition in jsonl_where],
+        streaming=streaming_json,
+        json_backend=json_backend,
+    )
+
+    with profiler.stage("select JSON lines"):
+        json_filenames = [
+            f"{jsonl_reader.name}:{number}"
+            for number in jsonl_reader.select_lines()
+        ]
+
+    def make_json_dict(keys: set[str]) -> dict:
+        with profiler.stage("load JSON"):
+            return jsonl_reader.make_json_dict(keys)
+
+    return json_filenames, make_json_dict
+
+
+def open_json_input(
+    json_filenames: list[str],
+    profiler: Profiler,
+    warm_inputs: Any,  # noqa: ANN401
+    *,
+    streaming_json: bool,
+    json_backend: str,
+    load_jobs: int,
+    cache_dir: str | None,
+    cache_max_size: int,
+) -> tuple[list[str], Callable[[set[str]], dict]]:
+    """Use the JSON files as the columns.
+
+    The files are only loaded once the keys are known, so that the
+    streaming reader can skip the values that the table doesn't use.
+
+    Args:
+        json_filenames: Paths to the JSON files.
+        profiler: The profiler of the run.
+        warm_inputs: The inputs that the render server keeps in memory,
+            or None.
+        streaming_json: Whether to read the files with the streaming
+            reader.
+        json_backend: The JSON decoder, one of `JSON_BACKENDS`.
+        load_jobs: The number of threads to load the files with, or 0
+            for the default of the thread pool.
+        cache_dir: The cache directory, or None.
+        cache_max_size: The size limit of the cache in MB.
+
+    Returns:
+        tuple: The names of the columns, and a function that returns the
+            values at the given keys as a dict.
+
+    """
+
+    def make_streamed_json_dict(keys: set[str]) -> dict:
+        from tomltable.jsonstream import make_json_dict_streaming
+
+        # NOTE The streaming reader loads and flattens the JSON files in
+        # a single pass, so there is no time for each file.
+        #
+        with profiler.stage("load JSON"):
+            return make_json_dict_streaming(json_filenames, keys)
+
+    def make_cached_json_dict(keys: set[str]) -> dict:
+        from tomltable.cache import JsonCache
+        from tomltable.parallel import map_distinct_files
+
+        cache = JsonCache(
+            cache_dir, cache_max_size * 1024 * 1024, json_backend,
+        )
+
+        def load_cached(filename: str) -> dict:
+            with profiler.json_file(filename):
+                return cache.load(filename)
+
+        with profiler.stage("load JSON"):
+            flattened_files = map_distinct_files(
+                load_cached, json_filenames, load_jobs or None,
+            )
+
+            cache.evict()
+
+        with profiler.stage("flatten JSON"):
+            return make_json_dict_from_flattened(flattened_files, keys)
+
+    def make_loaded_json_dict(keys: set[str]) -> dict:
+        from tomltable.parallel import map_distinct_files
+
+        load_json = (
+            load_json_file
+            if warm_inputs is None
+            else warm_inputs.load_json_file
+        )
+
+        def load(filename: str) -> Any:  # noqa: ANN401
+            with profiler.json_file(filename):
+                return load_json(filename, json_backend)
+
+        with profiler.stage("load JSON"):
+            json_files = map_distinct_files(
+                load, json_filenames, load_jobs or None,
+            )
+
+        with profiler.stage("flatten JSON"):
+            return make_json_dict_for_keys(json_files, keys)
+
+    if streaming_json:
+        return json_filenames, make_streamed_json_dict
+
+    if cache_dir is not None:
+        return json_filenames, make_cached_json_dict
+
+    return json_filenames, make_loaded_json_dict
+
+
+def make_templates(
+    text: str,
+    table_formats: list[str],
+    chunks: list[range | None],
+    json_filenames: list[str],
+    title: str | None,
+    label: str | None,
+    profiler: Profiler,
+    *,
+    from_template: bool,
+    streaming_output: bool,
+    cache_dir: str | None,
+    cache_max_size: int,
+) -> dict[tuple[str, int], str | Iterator[str]]:
+    """Load or generate the template of each output format and chunk.
+
+    The templates are keyed by the output format and the index of the
+    chunk of columns.  There is a single chunk unless --max-columns
+    splits the table.
+
+    Returns:
+        dict: The templates, or with `streaming_output`, iterators over
+            the lines of the templates.
+
+    """
+    parts = [
+        (output_format, chunk_index)
+        for output_format in table_formats
+        for chunk_index in range(len(chunks))
+    ]
+
+    if from_template:
+        # The template on stdin is compiled or deserialized later.
+        #
+        return dict.fromkeys(parts, text)
+
+    if cache_dir is not None:
+        # Look up the templates in the cache, and only parse the table
+        # specification if one of them is missing.
+        #
+        from tomltable.cache import TemplateCache
+
+        template_cache = TemplateCache(
+            cache_dir, cache_max_size * 1024 * 1024,
+        )
+
+        with profiler.stage("generate template"):
+            templates = {
+                (output_format, chunk_index): template_cache.get_template(
+                    text,
+                    json_filenames,
+                    *get_chunk_caption(title, label, chunk_index),
+                    output_format,
+                    chunks[chunk_index],
+                )
+                for output_format, chunk_index in parts
+            }
+
+            template_cache.evict()
+
+        return templates
+
+    # Generate the templates from the table specification.
+    #
+
+    from tomltable.parser import (
+        confirm_consistent_column_count,
+        load_toml,
+        parse_toml,
+    )
+    from tomltable.template import iter_template_lines, make_template
+
+    with profiler.stage("parse TOML"):
+        table_spec = parse_toml(load_toml(text))
+
+        confirm_consistent_column_count(table_spec, json_filenames)
+
+    # NOTE Every output format shares the parsed specification.  With
+    # --streaming-output, the lines of the templates are generated while
+    # they are used instead of being kept.
+    #
+    if streaming_output:
+        return {
+            (output_format, chunk_index): iter_template_lines(
+                table_spec,
+                json_filenames,
+                *get_chunk_caption(title, label, chunk_index),
+                output_format,
+                chunks[chunk_index],
+            )
+            for output_format, chunk_index in parts
+        }
+
+    with profiler.stage("generate template"):
+        return {
+            (output_format, chunk_index): make_template(
+                table_spec,
+                json_filenames,
+                *get_chunk_caption(title, label, chunk_index),
+                output_format,
+                chunks[chunk_index],
+            )
+            for output_format, chunk_index in parts
+        }
+
+
+def compile_templates(
+    templates: dict[tuple[str, int], str],
+    profiler: Profiler,
+    warm_inputs: Any,  # noqa: ANN401
+) -> dict[tuple[str, int], Any]:
+    """Compile or deserialize the templates and count the placeholders.
+
+    The render server, if `warm_inputs` is not None, keeps the compiled
+    templates in memory.
+
+    """
+    if warm_inputs is None:
+        from tomltable.compiled import load_template
+    else:
+        load_template = warm_inputs.load_template
+
+    with profiler.stage("compile template"):
+        compiled_templates = {
+            part: load_template(template)
+            for part, template in templates.items()
+        }
+
+    placeholders = [
+        placeholder
+        for compiled_template in compiled_templates.values()
+        for placeholder in compiled_template.placeholders
+    ]
+
+    profiler.count("placeholders", len(placeholders))
+    profiler.count(
+        "distinct_specifiers",
+        len({placeholder.specifier for placeholder in placeholders}),
+    )
+
+    return compiled_templates
+
+
+def fill_compiled_templates(
+    compiled_templates: dict[tuple[str, int], Any],
+    make_json_dict: Callable[[set[str]], dict],
+    profiler: Profiler,
+    *,
+    ignore_missing_keys: bool,
+    thousands_separator: str | None,
+) -> dict[tuple[str, int], str]:
+    """Fill the templates with the values that they use.
+
+    The values for every output format are loaded in one go, and they
+    are escaped for the output format of each template.
+
+    """
+    from tomltable.compiled import VALUE_ESCAPES
+
+    json_dict = make_json_dict(set().union(*(
+        compiled_template.keys
+        for compiled_template in compiled_templates.values()
+    )))
+
+    profiler.count("json_keys", len(json_dict))
+
+    # NOTE Thousands separators are added while the template is filled,
+    # so they are part of this stage.
+    #
+    with profiler.stage("fill template"):
+        return {
+            (output_format, chunk_index): compiled_template.fill(
+                json_dict,
+                ignore_missing_keys=ignore_missing_keys,
+                thousands_separator=thousands_separator,
+                escape=VALUE_ESCAPES.get(output_format),
+            )
+            for (output_format, chunk_index), compiled_template
+            in compiled_templates.items()
+        }
+
+
+def fill_template_streams(
+    templates: dict[tuple[str, int], Iterator[str]],
+    make_json_dict: Callable[[set[str]], dict],
+    profiler: Profiler,
+    context: click.Context,
+    *,
+    ignore_missing_keys: bool,
+    thousands_separator: str | None,
+) -> dict[tuple[str, int], Iterator[str]]:
+    """Fill the lines of the templates while they are written.
+
+    The keys must be known before the JSON files are loaded, so the
+    lines are spooled to temporary files, which `context` closes, while
+    the keys are found, and they are filled from there.  This is cheaper
+    than generating them twice.
+
+    """
+    from tomltable.compiled import VALUE_ESCAPES
+    from tomltable.template import (
+        fill_template_lines,
+        read_spooled_lines,
+        spool_template_lines,
+    )
+
+    spools = {}
+    keys = set()
+
+    with profiler.stage("generate template"):
+        for part, lines in templates.items():
+            spool, part_keys = spool_template_lines(lines)
+            spools[part] = context.with_resource(spool)
+            keys.update(part_keys)
+
+    json_dict = make_json_dict(keys)
+
+    profiler.count("json_keys", len(json_dict))
+
+    # NOTE The lines are filled, and thousands separators are added,
+    # while they are written, so this is part of writing the output.
+    #
+    return {
+        (output_format, chunk_index): fill_template_lines(
+            read_spooled_lines(spool),
+            json_dict,
+            ignore_missing_keys=ignore_missing_keys,
+            thousands_separator=thousands_separator,
+            escape=VALUE_ESCAPES.get(output_format),
+        )
+        for (output_format, chunk_index), spool in spools.items()
+    }
+
+
+def write_results(
+    targets: list[tuple[str, str | None]],
+    results: dict[tuple[str, int], Any],
+    chunk_count: int,
+    fingerprints: dict[str, str],
+    *,
+    streaming_output: bool,
+) -> None:
+    """Write the tables or templates of each target.
+
+    Args:
+        targets: Pairs of an output format and a filename, or None for
+            stdout.
+        results: The tables or templates, keyed by the output format
+            and the index of the chunk.  With `streaming_output`, they
+            are iterators over lines.
+        chunk_count: The number of chunks of each table.
+        fingerprints: A dict mapping the filenames to the fingerprints
+            of their inputs.
+        streaming_output: Whether to write the results line by line.
+
+    """
+    for output_format, output_filename in targets:
+        tables = [
+            results[output_format, chunk_index]
+            for chunk_index in range(chunk_count)
+        ]
+
+        if output_filename is None:
+            if streaming_output:
+                from tomltable.template import write_lines
+
+                write_lines(sys.stdout, join_chunk_lines(tables))
+            else:
+                print(CHUNK_SEPARATOR.join(tables), end="")
+
+            continue
+
+        from tomltable.incremental import write_output, write_output_lines
+
+        if streaming_output:
+            write, join = write_output_lines, join_chunk_lines
+        else:
+            write, join = write_output, CHUNK_SEPARATOR.join
+
+        if CHUNK_PLACEHOLDER in output_filename:
+            for number, table in enumerate(tables, start=1):
+                write(
+                    get_chunk_filename(output_filename, number),
+                    table,
+                    fingerprints[output_filename],
+                    len(tables),
+                )
+
+            remove_stale_chunks(output_filename, len(tables))
+        else:
+            write(
+                output_filename,
+                join(tables),
+                fingerprints[output_filename],
+            )
+
+
+@click.command(help=(
+    "Generate a LaTeX table from a TOML formatted table specification "
+    "(read from stdin) and a set of JSON files (specified as "
+    "arguments)."
+))
+@click.option("-s", "--spec", type=str,
+              help=(
+                  "Read the table specification (or the template with "
+                  "--from-template) from this file instead of stdin."
+              ))
+@click.option("-j", "--json-filename", type=str, multiple=True,
+              help=(
+                  "JSON file to use as input to the table. In a "
+                  "regression table, each JSON file would most likely "
+                  "correspond to a separate column."
+              ))
+@click.option("--jsonl", type=str,
+              help=(
+                  "JSON Lines file to use as input to the table instead "
+                  "of JSON files, with one column per line, or '-' for "
+                  "stdin (requires --spec)."
+              ))
+@click.option("--jsonl-lines", type=str, metavar="RANGES",
+              help=(
+                  "Only use these lines of the --jsonl file, e.g., "
+                  "'1-10,15,20-'. Lines are numbered from 1."
+              ))
+@click.option("--jsonl-where", type=str, multiple=True,
+              metavar="PATH[!]=VALUE",
+              help=(
+                  "Only use the lines of the --jsonl file where the value "
+                  "at PATH equals (or with '!=', doesn't equal) VALUE, "
+                  "which is read as JSON if possible. Can be given more "
+                  "than once; every condition has to hold."
+              ))
+@click.option("--csv", type=str,
+              help=(
+                  "Long-format CSV or TSV file of results to use as "
+                  "input to the table instead of JSON files, with one "
+                  "row per model, term, and statistic, and one column "
+                  "per model. Files ending in '.tsv' or '.tab' are "
+                  "tab-separated."
+              ))
+@click.option("--csv-model", type=str, multiple=True,
+              help=(
+                  "Model in the --csv file to use as a column. Can be "
+                  "given more than once. Defaults to every model, in "
+                  "the order in which they first appear."
+              ))
+@click.option("--csv-columns", type=str,
+              metavar="MODEL,TERM,STATISTIC,VALUE",
+              help=(
+                  "Names of the columns of the --csv file. Defaults to "
+                  "'model,term,statistic,value'."
+              ))
+@click.option("-t", "--title", required=False, type=str,
+              help=(
+                  r"Add title with the \caption{} command. Implies use "
+                  "of the table and threeparttable environments."
+              ))
+@click.option("-l", "--label", required=False, type=str,
+              help=(
+                  r"Add label with the \label{} command. Implies use "
+                  "of the table and threeparttable environments."
+              ))
+@click.option("-i", "--ignore-missing-keys", is_flag=True,
+              help=(
+                  "Ignore keys that are not present in the "
+                  "corresponding JSON file."
+              ))
+@click.option("-F", "--from-template", is_flag=True,
+              help=(
+                  "Treat stdin as a template instead of a table "
+                  "specification. The template can be either plain "
+                  "or compiled."
+              ))
+@click.option("-T", "--only-template", is_flag=True,
+              help=(
+                  "Print template instead of the final table to stdout."
+              ))
+@click.option("-C", "--compile-template", is_flag=True,
+              help=(
+                  "Print compiled template instead of the final table "
+                  "to stdout. Filling a compiled template with "
+                  "--from-template is faster than filling a plain one."
+              ))
+@click.option("-H", "--human-readable-numbers", is_flag=True,
+              help=(
+                  "Add thousands separators to the numbers from the "
+                  "JSON files in the final table."
+              ))
+@click.option("--thousands-separator",
+              type=click.Choice(list(THOUSANDS_SEPARATORS)),
+              help=(
+                  "Thousands separator for --human-readable-numbers: "
+                  r"',', '\,', or '{,}'. Defaults to comma. Implies "
+                  "--human-readable-numbers."
+              ))
+@click.option("-S", "--streaming-json", is_flag=True,
+              help=(
+                  "Read only the values that the table uses from the "
+                  "JSON files instead of loading the files in full. "
+                  "This reduces memory use for large JSON files."
+              ))
+@click.option("--json-backend", type=click.Choice(JSON_BACKENDS),
+              default="auto", show_default=True,
+              help=(
+                  "JSON decoder. 'auto' uses orjson or msgspec if either "
+                  "is installed, and the standard library otherwise. "
+                  "Not used with --streaming-json."
+              ))
+@click.option("--load-jobs", type=click.IntRange(min=0),
+              default=1, show_default=True,
+              help=(
+                  "Number of threads to load the JSON files with. Use "
+                  "0 for the default of the thread pool. A file that "
+                  "is given more than once is loaded only once."
+              ))
+@click.option("--max-columns", type=click.IntRange(min=1),
+              help=(
+                  "Split a table with more columns into tables of at "
+                  "most this many consecutive columns, each with its "
+                  "own header and footer. If the filename of --output "
+                  "contains '{chunk}', each table is written to its own "
+                  "file, with '{chunk}' replaced by its number."
+              ))
+@click.option("-c", "--cache-dir", type=str, envvar="TOMLTABLE_CACHE",
+              help=(
+                  "Directory for caching the decoded JSON files and "
+                  "the generated templates between runs. Defaults to "
+                  "the value of the TOMLTABLE_CACHE environment "
+                  "variable."
+              ))
+@click.option("--cache-max-size", type=click.IntRange(min=0),
+              default=DEFAULT_CACHE_MAX_SIZE_MB, show_default=True,
+              help=(
+                  "Size limit of the cache directory in megabytes. The "
+                  "least recently used entries are removed first."
+              ))
+@click.option("--format", "table_format",
+              type=click.Choice(TABLE_FORMATS), default="tex",
+              show_default=True,
+              help=(
+                  "Output format of the table (or the template with "
+                  "--only-template or --compile-template)."
+              ))
+@click.option("--streaming-output", is_flag=True,
+              help=(
+                  "Generate, fill, and write the table one line at a "
+                  "time instead of as a whole. This keeps memory use "
+                  "flat for tables with many rows. Use --format "
+                  "longtable for tables that span several pages."
+              ))
+@click.option("-o", "--output", type=str, multiple=True,
+              metavar="[FORMAT:]FILE",
+              help=(
+                  "Write the result to this file instead of stdout. "
+                  "The file is only written if its content changes, "
+                  "and nothing is done if the inputs haven't changed "
+                  "since the last run. Prefix the filename with a "
+                  "format (e.g., 'csv:table.csv') to override --format. "
+                  "Can be given more than once to write several "
+                  "formats from a single load of the JSON files."
+              ))
+@click.option("-w", "--watch", is_flag=True,
+              help=(
+                  "Keep running and update the output whenever the "
+                  "specification or a JSON file changes. Requires "
+                  "--spec and --output."
+              ))
+@click.option("--profile", is_flag=True,
+              help=(
+                  "Print the wall time and the peak memory of each stage "
+                  "to stderr, along with the number of JSON keys and "
+                  "placeholders, and the slowest JSON file. Tracing "
+                  "memory slows the run down."
+              ))
+@click.option("--profile-json", type=str,
+              help="Write the profile as JSON to this file.")
+@click.option("--profile-dump", type=str,
+              help=(
+                  "Also run cProfile and save its statistics to this "
+                  "file for use with pstats."
+              ))
+@click.option("-d", "--debug", is_flag=True)
+def main(
+    spec: str | None,
+    json_filename: tuple[str, ...],
+    title: str | None,
+    label: str | None,
+    *,
+    jsonl: str | None = None,
+    jsonl_lines: str | None = None,
+    jsonl_where: tuple[str, ...] = (),
+    csv: str | None = None,
+    csv_model: tuple[str, ...] = (),
+    csv_columns: str | None = None,
+    ignore_missing_keys: bool = False,
+    from_template: bool = False,
+    only_template: bool = False,
+    compile_template: bool = False,
+    human_readable_numbers: bool = False,
+    thousands_separator: str | None = None,
+    streaming_json: bool = False,
+    json_backend: str = "auto",
+    load_jobs: int = 1,
+    max_columns: int | None = None,
+    cache_dir: str | None = None,
+    cache_max_size: int = DEFAULT_CACHE_MAX_SIZE_MB,
+    table_format: str = "tex",
+    streaming_output: bool = False,
+    output: tuple[str, ...] = (),
+    watch: bool = False,
+    profile: bool = False,
+    profile_json: str | None = None,
+    profile_dump: str | None = None,
+    debug: bool = False,
+) -> None:
+    """Generate and print a LaTeX table from TOML spec and JSON files.
+
+    This function serves as the command-line entry point, handling
+    argument parsing via decorators.
+
+    Raises:
+        TableJsonMismatchError: If TOML spec doesn't match JSON files.
+        TableSpecificationError: If TOML spec fails validation checks.
+        ValueError: If incompatible command-line options are provided.
+
+    """
+    if not debug:
+        sys.tracebacklimit = 0
+
+    if thousands_separator is not None:
+        human_readable_numbers = True
+
+    context = click.get_current_context()
+    is_set = {
+        "--spec": spec is not None,
+        "--json-filename": len(json_filename) > 0,
+        "--jsonl": jsonl is not None,
+        "--jsonl-lines": jsonl_lines is not None,
+        "--jsonl-where": len(jsonl_where) > 0,
+        "--csv": csv is not None,
+        "--csv-model": len(csv_model) > 0,
+        "--csv-columns": csv_columns is not None,
+        "--title": title is not None,
+        "--label": label is not None,
+        "--ignore-missing-keys": ignore_missing_keys,
+        "--from-template": from_template,
+        "--only-template": only_template,
+        "--compile-template": compile_template,
+        "--human-readable-numbers": human_readable_numbers,
+        "--streaming-json": streaming_json,
+        "--load-jobs": load_jobs != 1,
+        "--max-columns": max_columns is not None,
+        "--cache-dir": cache_dir is not None,
+        "--streaming-output": streaming_output,
+        "--output": len(output) > 0,
+        "--watch": watch,
+        "--profile": profile,
+        "--profile-json": profile_json is not None,
+        "--profile-dump": profile_dump is not None,
+    }
+
+    # NOTE TOMLTABLE_CACHE only sets a default, so the runs that can't
+    # use a cache ignore it instead of failing like with --cache-dir.
+    #
+    if (context.get_parameter_source("cache_dir")
+        is click.core.ParameterSource.ENVIRONMENT
+        and any(is_set[option]
+                for option in get_incompatible_options("--cache-dir"))):
+        cache_dir = None
+        is_set["--cache-dir"] = False
+
+    check_options(is_set)
+
+    inputs = ["--json-filename", "--jsonl", "--csv"]
+
+    if [is_set[option] for option in inputs].count(True) != 1:
+        msg = "Exactly one of --json-filename, --jsonl, and --csv is required."
+        raise ValueError(msg)
+
+    if jsonl == "-" and spec is None:
+        msg = (
+            "--jsonl - requires --spec, because the table specification "
+            "is read from stdin otherwise."
+        )
+        raise ValueError(msg)
+
+    if csv is not None:
+        from tomltable.longformat import DEFAULT_COLUMNS, parse_columns
+
+        columns = (
+            DEFAULT_COLUMNS
+            if csv_columns is None
+            else parse_columns(csv_columns)
+        )
+
+    if json_backend != "auto":
+        from tomltable.jsondecode import resolve_backend
+
+        # Fail before doing any work if the backend is not installed.
+        #
+        resolve_backend(json_backend)
+
+    outputs = [parse_output(value, table_format) for value in output]
+
+    if len({filename for _, filename in outputs}) < len(outputs):
+        msg = "The same file is given to --output more than once."
+        raise ValueError(msg)
+
+    for option in ("--from-template", "--watch"):
+        if is_set[option] and len(outputs) > 1:
+            msg = f"{option} can only be used with a single --output."
+            raise ValueError(msg)
+
+    # The options that affect the output.
+    #
+    options = {
+        "title": title,
+        "label": label,
+        "ignore_missing_keys": ignore_missing_keys,
+        "from_template": from_template,
+        "only_template": only_template,
+        "compile_template": compile_template,
+        "human_readable_numbers": human_readable_numbers,
+        "max_columns": max_columns,
+        "thousands_separator": get_thousands_separator(
+            human_readable_numbers, thousands_separator,
+        ),
+    }
+
+    # NOTE The render server passes the JSON files and the templates that
+    # it keeps in memory as the context object.
+    #
+    warm_inputs = context.obj
+
+    if watch:
+        if warm_inputs is not None:
+            msg = "--watch cannot be used through the render server."
+            raise ValueError(msg)
+
+        from tomltable.watch import WatchedTable, watch_table
+
+        output_format, output_filename = outputs[0]
+
+        watch_table(
+            WatchedTable(
+                spec,
+                list(json_filename),
+                output_filename,
+                {**options, "table_format": output_format},
+            ),
+        )
+        return
+
+    # NOTE The profile is reported when the context is closed, so that
+    # a run that fails is reported, too, and the server doesn't keep
+    # tracing memory after a failed call.
+    #
+    profiler = Profiler(
+        enabled=(
+            profile or profile_json is not None or profile_dump is not None
+        ),
+        report_text=profile,
+        json_filename=profile_json,
+        cprofile_filename=profile_dump,
+    )
+    profiler.start()
+    context.call_on_close(profiler.stop)
+
+    with profiler.stage("read input"):
+        text = (
+            sys.stdin.read() if spec is None else Path(spec).read_text()
+        )
+
+    # Each target is an output format and a filename, or None for
+    # stdout.  Skip the outputs that were generated from the same
+    # inputs, and everything if all of them were.
+    #
+
+    if len(outputs) == 0:
+        targets = [(table_format, None)]
+        fingerprints = {}
+    else:
+        if jsonl is not None:
+            input_filenames = [] if jsonl == "-" else [jsonl]
+            input_options = {
+                **options,
+                "jsonl_lines": jsonl_lines,
+                "jsonl_where": list(jsonl_where),
+            }
+        elif csv is not None:
+            input_filenames = [csv]
+            input_options = {
+                **options,
+                "csv_models": list(csv_model),
+                "csv_columns": list(columns),
+            }
+        else:
+            input_filenames = list(json_filename)
+            input_options = options
+
+        # NOTE Lines from stdin can't be fingerprinted without reading
+        # them, so the outputs are always regenerated.
+        #
+        with profiler.stage("fingerprint inputs"):
+            fingerprints = find_outdated_outputs(
+                text,
+                outputs,
+                input_filenames,
+                input_options,
+                always=jsonl == "-",
+            )
+
+        targets = [
+            (output_format, output_filename)
+            for output_format, output_filename in outputs
+            if output_filename in fingerprints
+        ]
+
+        if len(targets) == 0:
+            return
+
+    # The sources of the columns: the models in the CSV file, the JSON
+    # files, or the selected lines of the JSON Lines file.
+    #
+
+    if csv is not None:
+        json_filenames, make_json_dict = open_csv_input(
+            csv, columns, list(csv_model), profiler,
+        )
+    elif jsonl is None:
+        json_filenames, make_json_dict = open_json_input(
+            list(json_filename),
+            profiler,
+            warm_inputs,
+            streaming_json=streaming_json,
+            json_backend=json_backend,
+            load_jobs=load_jobs,
+            cache_dir=cache_dir,
+            cache_max_size=cache_max_size,
+        )
+    else:
+        json_filenames, make_json_dict = open_jsonl_input(
+            jsonl,
+            jsonl_lines,
+            list(jsonl_where),
+            profiler,
+            streaming_json=streaming_json,
+            json_backend=json_backend,
+        )
+
+    if max_columns is None:
+        chunks = [None]
+    else:
+        chunks = split_columns(len(json_filenames), max_columns) or [None]
+
+    templates = make_templates(
+        text,
+        list(dict.fromkeys(output_format for output_format, _ in targets)),
+        chunks,
+        json_filenames,
+        title,
+        label,
+        profiler,
+        from_template=from_template,
+        streaming_output=streaming_output,
+        cache_dir=cache_dir,
+        cache_max_size=cache_max_size,
+    )
+
+    fill_options = {
+        "ignore_missing_keys": ignore_missing_keys,
+        "thousands_separator": options["thousands_separator"],
+    }
+
+    if only_template:
+        results = templates
+    elif streaming_output:
+        results = fill_template_streams(
+            templates, make_json_dict, profiler, context, **fill_options,
+        )
+    else:
+        compiled_templates = compile_templates(
+            templates, profiler, warm_inputs,
+        )
+
+        if compile_template:
+            results = {
+                part: compiled_template.dumps()
+                for part, compiled_template in compiled_templates.items()
+            }
+        else:
+            results = fill_compiled_templates(
+                compiled_templates, make_json_dict, profiler, **fill_options,
+            )
+
+    with profiler.stage("write output"):
+        write_results(
+            targets,
+            results,
+            len(chunks),
+            fingerprints,
+            streaming_output=streaming_output,
+        )
+
+
+if __name__ == "__main__":
+    main()
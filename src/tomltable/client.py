@@ -0,0 +1,244 @@
+import json
+import os
+import shutil
+import socket
+import stat
+import struct
+import sys
+import tempfile
+from pathlib import Path
+from typing import BinaryIO
+
+# NOTE This module is imported by the thin client, which exists to avoid
+# the cost of importing the rest of tomltable.  It should only import
+# modules from the standard library.
+#
+
+FRAME_HEADER = struct.Struct("!cI")
+
+# Frame types.  The client sends a request and then answers requests for
+# stdin.  The server sends stdout and stderr as they are written, and
+# finally the exit code.
+#
+REQUEST = b"R"
+STDIN_REQUEST = b"I"
+STDIN_DATA = b"i"
+STDOUT = b"O"
+STDERR = b"E"
+EXIT = b"X"
+
+# Environment variables with this prefix are passed to the server.
+#
+ENVIRONMENT_PREFIX = "TOMLTABLE_"
+
+
+def get_socket_path() -> str:
+    """Return the path of the socket that the render server listens on.
+
+    The path is taken from the TOMLTABLE_SOCKET environment variable if
+    it is set.  Otherwise the socket is placed in the runtime directory
+    of the user, or in the temporary directory if there is none.
+
+    """
+    if "TOMLTABLE_SOCKET" in os.environ:
+        return os.environ["TOMLTABLE_SOCKET"]
+
+    directory = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+
+    return str(Path(directory) / f"tomltable-{os.getuid()}.sock")
+
+
+def is_private_socket(path: str) -> bool:
+    """Return whether a socket belongs to the user and only to them.
+
+    A socket in a shared directory, e.g., the temporary directory, could
+    have been created by another user to receive the calls of this one,
+    including stdin and the environment variables that are sent along.
+    The server creates its socket without permissions for the group and
+    for others, so a socket that has them is not from the user's server.
+
+    """
+    try:
+        status = os.stat(path)
+    except OSError:
+        return False
+
+    return (
+        stat.S_ISSOCK(status.st_mode)
+        and status.st_uid == os.getuid()
+        and status.st_mode & 0o077 == 0
+    )
+
+
+def receive_exactly(connection: socket.socket, size: int) -> bytes:
+    """Receive exactly `size` bytes.
+
+    Raises:
+        ConnectionError: If the connection is closed before then.
+
+    """
+    chunks = []
+
+    while size > 0:
+        chunk = connection.recv(min(size, 1024 * 1024))
+
+        if len(chunk) == 0:
+            msg = "Connection closed in the middle of a frame."
+            raise ConnectionError(msg)
+
+        chunks.append(chunk)
+        size -= len(chunk)
+
+    return b"".join(chunks)
+
+
+def send_frame(
+    connection: socket.socket,
+    frame_type: bytes,
+    payload: bytes = b"",
+) -> None:
+    header = FRAME_HEADER.pack(frame_type, len(payload))
+
+    connection.sendall(header + payload)
+
+
+def receive_frame(connection: socket.socket) -> tuple[bytes, bytes]:
+    """Receive a frame.
+
+    Returns:
+        tuple[bytes, bytes]: The type and the payload of the frame.
+
+    """
+    frame_type, length = FRAME_HEADER.unpack(
+        receive_exactly(connection, FRAME_HEADER.size),
+    )
+
+    return frame_type, receive_exactly(connection, length)
+
+
+def render_remotely(
+    connection: socket.socket,
+    args: list[str],
+    stdin: BinaryIO | None = None,
+    stdout: BinaryIO | None = None,
+    stderr: BinaryIO | None = None,
+) -> int:
+    """Send a tomltable call to the render server and relay the result.
+
+    Stdin is only read and sent if the server asks for it, so calls with
+    `--spec` don't wait for stdin.
+
+    Args:
+        connection: A socket connected to the server.
+        args: The command-line arguments of the call.
+        stdin: The stream to send as stdin.  Defaults to `sys.stdin`.
+        stdout: The stream to write stdout to.  Defaults to
+            `sys.stdout`.
+        stderr: The stream to write stderr to.  Defaults to
+            `sys.stderr`.
+
+    Returns:
+        int: The exit code of the call.
+
+    """
+    if stdin is None:
+        stdin = sys.stdin.buffer
+
+    if stdout is None:
+        stdout = sys.stdout.buffer
+
+    if stderr is None:
+        stderr = sys.stderr.buffer
+
+    environ = {
+        name: value
+        for name, value in os.environ.items()
+        if name.startswith(ENVIRONMENT_PREFIX)
+    }
+
+    # NOTE click wraps the help text to the width of the terminal.
+    #
+    columns, lines = shutil.get_terminal_size()
+    environ["COLUMNS"] = str(columns)
+    environ["LINES"] = str(lines)
+
+    request = {"args": args, "cwd": str(Path.cwd()), "env": environ}
+
+    send_frame(connection, REQUEST, json.dumps(request).encode())
+
+    while True:
+        frame_type, payload = receive_frame(connection)
+
+        if frame_type == STDIN_REQUEST:
+            send_frame(connection, STDIN_DATA, stdin.read())
+        elif frame_type == STDOUT:
+            stdout.write(payload)
+            stdout.flush()
+        elif frame_type == STDERR:
+            stderr.write(payload)
+            stderr.flush()
+        elif frame_type == EXIT:
+            return int(payload)
+        else:
+            msg = f"Unexpected frame type {frame_type!r} from server."
+            raise ConnectionError(msg)
+
+
+def connect_to_server() -> socket.socket | None:
+    """Connect to the render server.
+
+    Returns:
+        socket.socket | None: The connection, or None if no server
+            listens on the socket or if the socket is not private to the
+            user.
+
+    """
+    socket_path = get_socket_path()
+
+    if not os.path.exists(socket_path):
+        return None
+
+    if not is_private_socket(socket_path):
+        print(
+            f"warning: Not using the socket '{socket_path}' because it "
+            "belongs to another user or others can access it.",
+            file=sys.stderr,
+        )
+        return None
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        connection.connect(socket_path)
+    except OSError:
+        connection.close()
+        return None
+
+    return connection
+
+
+def main() -> None:
+    """Run tomltable through the render server if one is running.
+
+    The arguments are the same as those of `tomltable`.  If no server
+    listens on the socket, or if the socket is not private to the user,
+    then the table is rendered in this process instead, so the client
+    can be used whether or not a server runs.
+
+    """
+    connection = connect_to_server()
+
+    if connection is None:
+        # Only import the rest of tomltable when it is needed.
+        #
+        from tomltable.cli import main as tomltable_main
+
+        tomltable_main(prog_name="tomltable")
+        return
+
+    with connection:
+        sys.exit(render_remotely(connection, sys.argv[1:]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,591 @@
+import html
+import json
+import re
+import sys
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+PARENTHESIS_PATTERN = re.compile(r"[()]")
+DIGITS_PATTERN = re.compile(r"[0-9]+")
+
+MODIFIER_CHARACTERS = frozenset("-# .0123456789")
+FLAG_CHARACTERS = "-# 0"
+CONVERSIONS = frozenset("dfs")
+
+COMPILED_TEMPLATE_HEADER = "% tomltable compiled template v1\n"
+
+
+@dataclass(frozen=True)
+class Placeholder:
+    """A conversion specifier in a template.
+
+    Attributes:
+        key: The path inside the parentheses (e.g., '1::nobs').
+        conversion: The conversion type ('d', 'f', or 's').
+        flags: The conversion flags (e.g., '-' or '0').
+        width: The minimum field width.
+        precision: The precision, including the leading period (e.g.,
+            '.03').
+
+    """
+
+    key: str
+    conversion: str
+    flags: str     = ""
+    width: str     = ""
+    precision: str = ""
+
+    @property
+    def specifier(self) -> str:
+        """The conversion specifier as it appears in the template."""
+        return (
+            f"%({self.key}){self.flags}{self.width}{self.precision}"
+            f"{self.conversion}"
+        )
+
+    @property
+    def format(self) -> str:
+        """The conversion specifier without the key."""
+        return (
+            f"%{self.flags}{self.width}{self.precision}{self.conversion}"
+        )
+
+
+def match_parentheses(text: str) -> dict[int, int]:
+    """Find the closing parenthesis that belongs to each opening one.
+
+    This is a single pass with a stack.  Parentheses without a partner
+    are left out.
+
+    Returns:
+        dict[int, int]: A dict mapping the position of each opening
+            parenthesis to the position of its closing parenthesis.
+
+    Examples:
+        >>> match_parentheses("(a(b)) (")
+        {2: 4, 0: 5}
+        >>> match_parentheses(")(")
+        {}
+
+    """
+    closing = {}
+    stack = []
+
+    for match in PARENTHESIS_PATTERN.finditer(text):
+        if match.group() == "(":
+            stack.append(match.start())
+        elif len(stack) > 0:
+            closing[stack.pop()] = match.start()
+
+    return closing
+
+
+def split_modifiers(modifiers: str) -> tuple[str, str, str]:
+    """Split the modifiers of a specifier into flags, width, and precision.
+
+    Examples:
+        >>> split_modifiers("-5.2")
+        ('-', '5', '.2')
+        >>> split_modifiers(".03")
+        ('', '', '.03')
+
+    """
+    flags_end = len(modifiers) - len(modifiers.lstrip(FLAG_CHARACTERS))
+    width_end = flags_end
+
+    while width_end < len(modifiers) and modifiers[width_end].isdigit():
+        width_end += 1
+
+    return (
+        modifiers[:flags_end],
+        modifiers[flags_end:width_end],
+        modifiers[width_end:],
+    )
+
+
+def iter_placeholders(
+    template: str,
+) -> Iterator[tuple[int, int, Placeholder]]:
+    """Find the conversion specifiers in a template.
+
+    A conversion specifier is a '%' that is not preceded by another '%',
+    followed by a key in parentheses, modifiers made of the characters
+    '-# .0123456789', and a conversion type ('d', 'f', or 's').  The key
+    may itself contain balanced parentheses, as in
+    '%(1::coef::I(x^2)::est).03f'.
+
+    The template is scanned from left to right once, and the partner of
+    each parenthesis is looked up in the result of `match_parentheses`,
+    so the running time is linear in the length of the template even if
+    the parentheses in it are unbalanced.
+
+    Yields:
+        tuple[int, int, Placeholder]: The start and the end position of
+            each specifier in the template, and the parsed specifier.
+
+    Examples:
+        >>> [
+        ...     placeholder.key
+        ...     for _, _, placeholder in iter_placeholders(
+        ...         "%(a)s%(b(c))d %%(d)s %(e",
+        ...     )
+        ... ]
+        ['a', 'b(c)']
+
+    """
+    closing = None
+    start = template.find("%(")
+
+    while start >= 0:
+        if start == 0 or template[start - 1] != "%":
+            if closing is None:
+                closing = match_parentheses(template)
+
+            key_end = closing.get(start + 1)
+
+            if key_end is not None:
+                end = key_end + 1
+
+                # NOTE Each run of modifiers follows a different closing
+                # parenthesis, so the runs don't overlap.
+                #
+                while (end < len(template)
+                       and template[end] in MODIFIER_CHARACTERS):
+                    end += 1
+
+                if end < len(template) and template[end] in CONVERSIONS:
+                    flags, width, precision = split_modifiers(
+                        template[key_end + 1:end],
+                    )
+
+                    yield start, end + 1, Placeholder(
+                        key=template[start + 2:key_end],
+                        conversion=template[end],
+                        flags=flags,
+                        width=width,
+                        precision=precision,
+                    )
+
+                    start = template.find("%(", end + 1)
+                    continue
+
+        start = template.find("%(", start + 1)
+
+
+def group_thousands(number: str, separator: str) -> str:
+    """Insert thousands separators into the integer part of a number.
+
+    Unlike `add_thousands_separator`, this function expects a single
+    formatted number, so only the first run of digits is grouped.
+
+    Examples:
+        >>> group_thousands("-31556926.50", "{,}")
+        '-31{,}556{,}926.50'
+        >>> group_thousands("  950.1234", ",")
+        '  950.1234'
+
+    """
+    match = DIGITS_PATTERN.search(number)
+
+    if match is None:
+        return number
+
+    start, end = match.span()
+
+    if end - start < 4:
+        return number
+
+    head = start + ((end - start) % 3 or 3)
+    groups = [number[start:head]]
+    groups.extend(number[i:i + 3] for i in range(head, end, 3))
+
+    return number[:start] + separator.join(groups) + number[end:]
+
+
+def make_formatter(format_string: str) -> Callable[[Any], str]:
+    """Create a function that formats a single value.
+
+    Examples:
+        >>> make_formatter("%.03f")(3.14159)
+        '3.142'
+
+    """
+    def formatter(value: Any) -> str:  # noqa: ANN401
+        return format_string % (value,)
+
+    return formatter
+
+
+def make_grouping_formatter(
+    placeholder: Placeholder,
+    separator: str,
+) -> Callable[[Any], str]:
+    """Create a function that formats a value with thousands separators.
+
+    Only integers and floats are grouped, strings are formatted as they
+    are.  For '%d' and '%f' without flags or width, the value is
+    formatted with the ',' option of the format specification
+    mini-language, which groups the digits while formatting.  Otherwise
+    the digits are grouped with `group_thousands` after formatting.
+
+    Examples:
+        >>> placeholder = Placeholder("nobs", "f", precision=".02")
+        >>> make_grouping_formatter(placeholder, "{,}")(31556926.5)
+        '31{,}556{,}926.50'
+        >>> placeholder = Placeholder("id", "s")
+        >>> make_grouping_formatter(placeholder, ",")("12345")
+        '12345'
+
+    """
+    formatter = make_formatter(placeholder.format)
+
+    def grouping_formatter(value: Any) -> str:  # noqa: ANN401
+        result = formatter(value)
+
+        if isinstance(value, (int, float)) and len(result) > 3:
+            result = group_thousands(result, separator)
+
+        return result
+
+    if (placeholder.flags != ""
+        or placeholder.width != ""
+        or placeholder.conversion == "s"
+        or (placeholder.conversion == "d" and placeholder.precision != "")):
+        return grouping_formatter
+
+    format_spec = f",{placeholder.precision}{placeholder.conversion}"
+    fast_types = (int,) if placeholder.conversion == "d" else (int, float)
+
+    def fast_grouping_formatter(value: Any) -> str:  # noqa: ANN401
+        # NOTE Subclasses such as bool format differently, so they take
+        # the slower path.
+        #
+        if type(value) not in fast_types:
+            return grouping_formatter(value)
+
+        result = format(value, format_spec)
+
+        return result if separator == "," else result.replace(",", separator)
+
+    return fast_grouping_formatter
+
+
+def escape_markdown(value: str) -> str:
+    r"""Escape the characters that delimit cells in a Markdown table.
+
+    Examples:
+        >>> escape_markdown("a | b")
+        'a \\| b'
+
+    """
+    return value.replace("|", "\\|")
+
+
+def escape_html(value: str) -> str:
+    """Escape the characters that have a special meaning in HTML.
+
+    Examples:
+        >>> escape_html('<b> & "c"')
+        '&lt;b&gt; &amp; &quot;c&quot;'
+
+    """
+    return html.escape(value)
+
+
+def escape_csv(value: str) -> str:
+    """Escape the double quotes in a quoted CSV field.
+
+    Examples:
+        >>> escape_csv('a "b"')
+        'a ""b""'
+
+    """
+    return value.replace('"', '""')
+
+
+# The functions that escape the values filled into a template, for the
+# output formats that need it.  Values in LaTeX tables are not escaped,
+# because they often contain markup such as stars in '^{***}'.
+#
+VALUE_ESCAPES: dict[str, Callable[[str], str]] = {
+    "markdown": escape_markdown,
+    "html": escape_html,
+    "csv": escape_csv,
+}
+
+
+@dataclass
+class RenderWarning:
+    """A problem with a value that didn't stop a table from rendering.
+
+    Attributes:
+        specifier: The conversion specifier, e.g., '%(1::nobs)d'.
+        key: The path in the specifier.
+        message: A description of the problem.
+
+    """
+
+    specifier: str
+    key: str
+    message: str
+
+
+def warn(
+    placeholder: Placeholder,
+    message: str,
+    warnings: list[RenderWarning] | None,
+) -> None:
+    """Print a warning to stderr, or append it to `warnings`."""
+    if warnings is None:
+        print(f"warning: {message}", file=sys.stderr)
+    else:
+        warnings.append(
+            RenderWarning(placeholder.specifier, placeholder.key, message),
+        )
+
+
+@dataclass
+class CompiledTemplate:
+    """A template split into literal segments and placeholders.
+
+    Compiling a template searches it for conversion specifiers only
+    once.  Filling it afterwards is a single pass over the segments,
+    with a cached formatter for each distinct specifier, so the same
+    template can be filled with many sets of JSON data cheaply.
+
+    `literals` always has one more element than `placeholders`: the
+    template is `literals[0]`, followed by the first placeholder,
+    followed by `literals[1]`, and so on.
+
+    Attributes:
+        literals: The text between the placeholders.
+        placeholders: The placeholders in order of appearance.
+
+    Examples:
+        >>> compiled = compile_template("%(1::name)s is %(1::age)d.")
+        >>> compiled.literals
+        ['', ' is ', '.']
+        >>> compiled.fill({"1::name": "Alice", "1::age": 42})
+        'Alice is 42.'
+
+    """
+
+    literals: list[str]
+    placeholders: list[Placeholder]
+
+    def __post_init__(self) -> None:
+        self.formatters = {
+            placeholder.format: make_formatter(placeholder.format)
+            for placeholder in self.placeholders
+        }
+        self.grouping_formatters = {}
+
+    @property
+    def keys(self) -> set[str]:
+        """The set of paths that the template refers to."""
+        return {placeholder.key for placeholder in self.placeholders}
+
+    def fill(
+        self,
+        json_dict: dict,
+        *,
+        ignore_missing_keys: bool = False,
+        thousands_separator: str | None = None,
+        escape: Callable[[str], str] | None = None,
+        warnings: list[RenderWarning] | None = None,
+    ) -> str:
+        """Substitute paths in the template with data from a dict.
+
+        This method behaves the same way as `fill_template`, except that
+        the warnings are appended to `warnings` instead of being printed
+        to stderr if it is not None.
+
+        Examples:
+            >>> compiled = compile_template("<td>%(1::name)s</td>")
+            >>> compiled.fill({"1::name": "<b>A&B</b>"}, escape=escape_html)
+            '<td>&lt;b&gt;A&amp;B&lt;/b&gt;</td>'
+
+        Raises:
+            ValueError: If a path in the template is not found in
+                `json_dict` and `ignore_missing_keys` is False.
+
+        """
+        parts = [self.literals[0]]
+
+        for placeholder, literal in zip(
+            self.placeholders, self.literals[1:], strict=True,
+        ):
+            parts.append(
+                self.fill_placeholder(
+                    placeholder,
+                    json_dict,
+                    ignore_missing_keys=ignore_missing_keys,
+                    thousands_separator=thousands_separator,
+                    escape=escape,
+                    warnings=warnings,
+                ),
+            )
+            parts.append(literal)
+
+        return "".join(parts)
+
+    def fill_placeholder(
+        self,
+        placeholder: Placeholder,
+        json_dict: dict,
+        *,
+        ignore_missing_keys: bool = False,
+        thousands_separator: str | None = None,
+        escape: Callable[[str], str] | None = None,
+        warnings: list[RenderWarning] | None = None,
+    ) -> str:
+        key = placeholder.key
+
+        if key not in json_dict:
+            msg = (
+                f"Specifier '{placeholder.specifier}' refers to key "
+                f"'{key}' but this key is not in the JSON object."
+            )
+
+            if ignore_missing_keys:
+                warn(placeholder, msg, warnings)
+                return ""
+            else:
+                raise ValueError(msg)
+
+        value = json_dict[key]
+
+        # NOTE Only numbers from the JSON files are grouped, not digits
+        # in strings or in the template itself.
+        #
+        if thousands_separator is None:
+            formatter = self.formatters[placeholder.format]
+        else:
+            formatter = self.grouping_formatters.get(
+                (placeholder.format, thousands_separator),
+            )
+
+            if formatter is None:
+                formatter = make_grouping_formatter(
+                    placeholder, thousands_separator,
+                )
+                self.grouping_formatters[
+                    placeholder.format, thousands_separator
+                ] = formatter
+
+        try:
+            result = formatter(value)
+        except TypeError:
+            warn(
+                placeholder,
+                f"'{value}' has the wrong type "
+                f"for specifier '{placeholder.specifier}'.",
+                warnings,
+            )
+            return ""
+
+        return result if escape is None else escape(result)
+
+    def dumps(self) -> str:
+        """Serialize the compiled template.
+
+        The result starts with `COMPILED_TEMPLATE_HEADER`, which is a
+        LaTeX comment, followed by the template data as JSON.
+
+        Examples:
+            >>> compiled = compile_template("%(1::nobs)d obs.")
+            >>> loads_compiled_template(compiled.dumps()) == compiled
+            True
+
+        """
+        data = {
+            "literals": self.literals,
+            "placeholders": [
+                [
+                    placeholder.key,
+                    placeholder.conversion,
+                    placeholder.flags,
+                    placeholder.width,
+                    placeholder.precision,
+                ]
+                for placeholder in self.placeholders
+            ],
+        }
+
+        return COMPILED_TEMPLATE_HEADER + json.dumps(data) + "\n"
+
+
+def compile_template(template: str) -> CompiledTemplate:
+    """Split a template into literal segments and placeholders.
+
+    Conversion specifiers are found with `iter_placeholders`.
+
+    Args:
+        template: The LaTeX template string.
+
+    Returns:
+        CompiledTemplate: The compiled template.
+
+    Examples:
+        >>> compiled = compile_template("(%(1::coef::I(x^2)::se).04f)")
+        >>> compiled.placeholders[0]    # doctest: +NORMALIZE_WHITESPACE
+        Placeholder(key='1::coef::I(x^2)::se', conversion='f',
+                    flags='', width='', precision='.04')
+
+    """
+    literals = []
+    placeholders = []
+    position = 0
+
+    for start, end, placeholder in iter_placeholders(template):
+        literals.append(template[position:start])
+        placeholders.append(placeholder)
+        position = end
+
+    literals.append(template[position:])
+
+    return CompiledTemplate(literals, placeholders)
+
+
+def is_compiled_template(text: str) -> bool:
+    """Check whether the text is a serialized compiled template."""
+    return text.startswith(COMPILED_TEMPLATE_HEADER)
+
+
+def loads_compiled_template(text: str) -> CompiledTemplate:
+    """Deserialize a compiled template that was created with `dumps`.
+
+    Raises:
+        ValueError: If the text is not a serialized compiled template.
+
+    """
+    if not is_compiled_template(text):
+        msg = "Input is not a compiled template."
+        raise ValueError(msg)
+
+    data = json.loads(text[len(COMPILED_TEMPLATE_HEADER):])
+
+    return CompiledTemplate(
+        literals=data["literals"],
+        placeholders=[
+            Placeholder(*fields) for fields in data["placeholders"]
+        ],
+    )
+
+
+def load_template(text: str) -> CompiledTemplate:
+    """Compile a plain template or deserialize a compiled one.
+
+    Examples:
+        >>> compiled = compile_template("%(1::nobs)d obs.")
+        >>> load_template(compiled.dumps()) == compiled
+        True
+        >>> load_template("%(1::nobs)d obs.") == compiled
+        True
+
+    """
+    if is_compiled_template(text):
+        return loads_compiled_template(text)
+
+    return compile_template(text)
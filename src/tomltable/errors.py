@@ -6,3 +6,7 @@ class TableJsonMismatchError(ValueError):
 
 class TableSpecificationError(ValueError):
     """Raised if TOML table spec has a validation error."""
+
+
+class BatchSpecificationError(ValueError):
+    """Raised if TOML batch job list has a validation error."""
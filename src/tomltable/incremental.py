@@ -0,0 +1,269 @@
+import contextlib
+import filecmp
+import json
+import os
+import tempfile
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from tomltable.cache import get_code_version, hash_bytes
+
+
+def make_fingerprint(
+    text: str,
+    json_filenames: list[str],
+    options: dict[str, Any],
+) -> str:
+    """Fingerprint every input that determines the output of a run.
+
+    The fingerprint covers the table specification or the template, the
+    options that affect the output, the code of tomltable (see
+    `tomltable.cache.get_code_version`), and the resolved path, size,
+    and modification time of each JSON file.  Like `make`, it relies on
+    the modification time to detect changes in the JSON files, so they
+    are not read.
+
+    Args:
+        text: The table specification or the template.
+        json_filenames: Paths to the JSON files.
+        options: The options that affect the output.  Values have to be
+            JSON serializable.
+
+    Returns:
+        str: A hex digest.
+
+    """
+    json_stats = []
+
+    for filename in json_filenames:
+        path = Path(filename).resolve()
+        stat = path.stat()
+
+        json_stats.append([str(path), stat.st_size, stat.st_mtime_ns])
+
+    data = {
+        "version": get_code_version(),
+        "text": text,
+        "json_files": json_stats,
+        "options": options,
+    }
+
+    return hash_bytes(json.dumps(data, sort_keys=True).encode())
+
+
+def get_fingerprint_path(output: str) -> Path:
+    """Return the path of the file that records the fingerprint.
+
+    Examples:
+        >>> get_fingerprint_path("tables/example_mag.tex").as_posix()
+        'tables/.example_mag.tex.tomltable'
+
+    """
+    path = Path(output)
+
+    return path.with_name(f".{path.name}.tomltable")
+
+
+def read_fingerprint_record(output: str) -> dict | None:
+    """Return what was recorded about an output, or None if nothing was."""
+    try:
+        recorded = json.loads(get_fingerprint_path(output).read_text())
+    except (OSError, ValueError):
+        return None
+
+    return recorded if isinstance(recorded, dict) else None
+
+
+def is_up_to_date(output: str, fingerprint: str) -> bool:
+    """Check whether the output was generated from the same inputs.
+
+    The output is up to date if the recorded fingerprint matches and
+    the output file has not changed since it was recorded.
+
+    """
+    recorded = read_fingerprint_record(output)
+
+    try:
+        stat = Path(output).stat()
+    except OSError:
+        return False
+
+    return (
+        recorded is not None
+        and recorded.get("fingerprint") == fingerprint
+        and recorded.get("output_size") == stat.st_size
+        and recorded.get("output_mtime_ns") == stat.st_mtime_ns
+    )
+
+
+def get_chunk_count(output: str) -> int | None:
+    """Return the recorded number of chunks of the table of an output.
+
+    This is only recorded for the outputs that hold one chunk of a table
+    that was split into several files.
+
+    """
+    recorded = read_fingerprint_record(output)
+    chunk_count = None if recorded is None else recorded.get("chunk_count")
+
+    return chunk_count if isinstance(chunk_count, int) else None
+
+
+def remove_output(output: str) -> bool:
+    """Remove an output and its fingerprint if tomltable generated it.
+
+    Returns:
+        bool: True if the output was generated by tomltable and removed.
+
+    """
+    fingerprint_path = get_fingerprint_path(output)
+
+    if not fingerprint_path.exists():
+        return False
+
+    Path(output).unlink(missing_ok=True)
+    fingerprint_path.unlink(missing_ok=True)
+
+    return True
+
+
+def get_file_mode(path: Path) -> int:
+    """Return the mode that a file written to the path should have.
+
+    This is the mode of the existing file if there is one, or the
+    default mode for new files given the umask otherwise.
+
+    """
+    try:
+        return path.stat().st_mode & 0o777
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+
+        return 0o666 & ~umask
+
+
+def write_atomically(path: Path, data: bytes) -> None:
+    """Write to a temporary file and rename it to the path."""
+    mode = get_file_mode(path)
+    file_descriptor, temp_name = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.",
+    )
+
+    try:
+        with os.fdopen(file_descriptor, "wb") as temp_file:
+            temp_file.write(data)
+
+        Path(temp_name).chmod(mode)
+        Path(temp_name).replace(path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            Path(temp_name).unlink()
+        raise
+
+
+def write_output(
+    output: str,
+    text: str,
+    fingerprint: str,
+    chunk_count: int | None = None,
+) -> bool:
+    """Write the output if it changed and record its fingerprint.
+
+    The output file is replaced atomically, and only if its content
+    differs from `text`.  Otherwise its modification time is left
+    alone, so tools like latexmk don't consider it changed.  If the
+    output holds one chunk of a table that was split into several files,
+    `chunk_count` is the number of chunks, and it is recorded with the
+    fingerprint.
+
+    Returns:
+        bool: True if the output file was written.
+
+    """
+    path = Path(output)
+    data = text.encode()
+
+    try:
+        changed = path.read_bytes() != data
+    except OSError:
+        changed = True
+
+    if changed:
+        write_atomically(path, data)
+
+    record_fingerprint(output, fingerprint, chunk_count)
+
+    return changed
+
+
+def write_output_lines(
+    output: str,
+    lines: Iterable[str],
+    fingerprint: str,
+    chunk_count: int | None = None,
+) -> bool:
+    """Write the output line by line like `write_output`.
+
+    The lines are written to a temporary file as they come, so the
+    output is never held in memory as a whole.  The temporary file then
+    replaces the output file, but only if their contents differ.
+
+    Returns:
+        bool: True if the output file was written.
+
+    """
+    from tomltable.template import write_lines
+
+    path = Path(output)
+    mode = get_file_mode(path)
+    file_descriptor, temp_name = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.",
+    )
+
+    try:
+        with os.fdopen(
+            file_descriptor, "w", encoding="utf-8", newline="",
+        ) as temp_file:
+            write_lines(temp_file, lines)
+
+        try:
+            changed = not filecmp.cmp(temp_name, path, shallow=False)
+        except OSError:
+            changed = True
+
+        if changed:
+            Path(temp_name).chmod(mode)
+            Path(temp_name).replace(path)
+        else:
+            Path(temp_name).unlink()
+    except BaseException:
+        with contextlib.suppress(OSError):
+            Path(temp_name).unlink()
+        raise
+
+    record_fingerprint(output, fingerprint, chunk_count)
+
+    return changed
+
+
+def record_fingerprint(
+    output: str,
+    fingerprint: str,
+    chunk_count: int | None = None,
+) -> None:
+    """Record the fingerprint of an output file that was just written."""
+    stat = Path(output).stat()
+    recorded: dict[str, Any] = {
+        "fingerprint": fingerprint,
+        "output_size": stat.st_size,
+        "output_mtime_ns": stat.st_mtime_ns,
+    }
+
+    if chunk_count is not None:
+        recorded["chunk_count"] = chunk_count
+
+    write_atomically(
+        get_fingerprint_path(output), json.dumps(recorded).encode(),
+    )
@@ -0,0 +1,183 @@
+import functools
+import json
+import mmap
+import os
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+# Files at least this large are memory-mapped instead of read into a
+# bytes object.
+#
+MMAP_THRESHOLD = 1 << 20
+
+# NOTE The faster decoders are tried in this order when the backend is
+# 'auto'.
+#
+FAST_BACKENDS = ("orjson", "msgspec")
+
+
+def make_orjson_decoder() -> Callable[[Any], Any]:
+    import orjson
+
+    return orjson.loads
+
+
+def make_msgspec_decoder() -> Callable[[Any], Any]:
+    import msgspec
+
+    decoder = msgspec.json.Decoder()
+
+    def decode(data: Any) -> Any:  # noqa: ANN401
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as error:
+            # NOTE msgspec's errors are not ValueErrors, unlike those of
+            # json and orjson.
+            #
+            raise ValueError(str(error)) from error
+
+    return decode
+
+
+DECODER_MAKERS = {
+    "orjson": make_orjson_decoder,
+    "msgspec": make_msgspec_decoder,
+}
+
+
+def decode_with_json(data: Any) -> Any:  # noqa: ANN401
+    """Decode JSON with the standard library from a str or a buffer."""
+    if not isinstance(data, (str, bytes, bytearray)):
+        data = bytes(data)
+
+    return json.loads(data)
+
+
+@functools.cache
+def get_backend_decoder(name: str) -> Callable[[Any], Any]:
+    """Return the decoder of a backend other than 'auto'.
+
+    Raises:
+        ValueError: If the backend is unknown or not installed.
+
+    """
+    if name == "json":
+        return decode_with_json
+
+    if name not in DECODER_MAKERS:
+        msg = (
+            f"JSON backend '{name}' is not one of auto, json, "
+            f"{', '.join(DECODER_MAKERS)}."
+        )
+        raise ValueError(msg)
+
+    try:
+        return DECODER_MAKERS[name]()
+    except ImportError as error:
+        msg = (
+            f"JSON backend '{name}' requires the {name} package, which "
+            "is not installed."
+        )
+        raise ValueError(msg) from error
+
+
+@functools.cache
+def resolve_backend(backend: str) -> str:
+    """Return the backend that is used for the given choice.
+
+    'auto' is the first of the faster backends that is installed, or
+    'json' if none is.
+
+    Raises:
+        ValueError: If the backend is unknown or not installed.
+
+    Examples:
+        >>> resolve_backend("json")
+        'json'
+        >>> resolve_backend("auto") in ("orjson", "msgspec", "json")
+        True
+
+    """
+    if backend != "auto":
+        get_backend_decoder(backend)
+        return backend
+
+    for name in FAST_BACKENDS:
+        try:
+            get_backend_decoder(name)
+        except ValueError:
+            continue
+
+        return name
+
+    return "json"
+
+
+@functools.cache
+def get_decoder(backend: str) -> Callable[[Any], Any]:
+    """Return a function that decodes JSON from a str or a buffer.
+
+    The decoder for 'auto' falls back on the standard library if the
+    faster decoder rejects the input, so it accepts the same documents
+    as `json.loads`, e.g., with NaN or with integers of any size, and
+    raises the same errors.
+
+    Raises:
+        ValueError: If the backend is unknown or not installed.
+
+    """
+    name = resolve_backend(backend)
+    fast_decode = get_backend_decoder(name)
+
+    if backend != "auto" or name == "json":
+        return fast_decode
+
+    def decode(data: Any) -> Any:  # noqa: ANN401
+        try:
+            return fast_decode(data)
+        except ValueError:
+            return decode_with_json(data)
+
+    return decode
+
+
+def load_json(filename: str, backend: str = "auto") -> Any:  # noqa: ANN401
+    """Read and decode a JSON file with the given backend.
+
+    With the standard library, the file is read as text, as `json`
+    decodes a str anyway.  With a faster backend, which decodes bytes
+    directly, the file is read as bytes, and a large file is
+    memory-mapped, so that its content is never copied into a Python
+    object.
+
+    Raises:
+        ValueError: If the file is not valid JSON, or if the backend is
+            unknown or not installed.
+
+    Examples:
+        >>> import tempfile
+        >>> with tempfile.NamedTemporaryFile("w", suffix=".json") as f:
+        ...     _ = f.write('{"nobs": 1000}')
+        ...     f.flush()
+        ...     load_json(f.name, "json")
+        {'nobs': 1000}
+
+    """
+    if resolve_backend(backend) == "json":
+        with Path(filename).open() as json_file:
+            return json.load(json_file)
+
+    decode = get_decoder(backend)
+
+    with Path(filename).open("rb") as json_file:
+        if os.fstat(json_file.fileno()).st_size < MMAP_THRESHOLD:
+            return decode(json_file.read())
+
+        with (
+            mmap.mmap(
+                json_file.fileno(), 0, access=mmap.ACCESS_READ,
+            ) as buffer,
+            memoryview(buffer) as view,
+        ):
+            return decode(view)
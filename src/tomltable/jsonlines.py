@@ -0,0 +1,309 @@
+import contextlib
+import io
+import json
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from tomltable import MISSING, lookup_path
+from tomltable.jsondecode import get_decoder
+from tomltable.jsonstream import JsonStreamReader, group_keys_by_column
+
+
+def parse_line_ranges(value: str) -> list[tuple[int, int | None]]:
+    """Parse a comma-separated list of line numbers and line ranges.
+
+    Lines are numbered from 1.  A range without an end extends to the
+    end of the file, and a range without a start begins at line 1.
+
+    Raises:
+        ValueError: If a line number is not a positive integer, or if a
+            range ends before it starts.
+
+    Examples:
+        >>> parse_line_ranges("1-3,7,10-")
+        [(1, 3), (7, 7), (10, None)]
+        >>> parse_line_ranges("-2")
+        [(1, 2)]
+
+    """
+    ranges = []
+
+    for part in value.split(","):
+        start, separator, end = part.strip().partition("-")
+
+        try:
+            first = int(start) if start != "" else 1
+            last = int(end) if end != "" else None
+
+            if separator == "":
+                last = first
+        except ValueError:
+            first = last = 0
+
+        if first < 1 or (last is not None and last < first):
+            msg = f"Invalid line range '{part}' in '{value}'."
+            raise ValueError(msg)
+
+        ranges.append((first, last))
+
+    return ranges
+
+
+def parse_condition(value: str) -> tuple[str, bool, Any]:
+    """Parse a filter condition of the form 'PATH=VALUE' or 'PATH!=VALUE'.
+
+    The value is decoded as JSON if possible, so that 'nobs=1000'
+    compares numbers, and it is taken as a string otherwise.
+
+    Returns:
+        tuple[str, bool, Any]: The path, whether the condition is
+            negated, and the value.
+
+    Raises:
+        ValueError: If the condition has no '=' or no path.
+
+    Examples:
+        >>> parse_condition("model=ols")
+        ('model', False, 'ols')
+        >>> parse_condition("sample::n!=1000")
+        ('sample::n', True, 1000)
+
+    """
+    path, separator, text = value.partition("=")
+    negate = path.endswith("!")
+
+    if negate:
+        path = path[:-1]
+
+    if separator == "" or path == "":
+        msg = f"Invalid condition '{value}': expecting PATH=VALUE."
+        raise ValueError(msg)
+
+    try:
+        expected = json.loads(text)
+    except ValueError:
+        expected = text
+
+    return path, negate, expected
+
+
+class JsonLinesReader:
+    """Columns of a table from the lines of a JSON Lines file.
+
+    Each non-empty line of the file is a JSON document that becomes one
+    column of the table, in the order of the lines.  The lines can be
+    restricted to ranges of line numbers and to the lines that satisfy
+    every condition.
+
+    The file is read twice: `select_lines` finds the lines that make up
+    the columns, which the template needs to know their number, and
+    `make_json_dict` extracts the values that the template refers to.
+    Neither keeps more than one decoded line in memory.  Stdin cannot
+    be read twice, so the text of the selected lines is kept instead.
+
+    Attributes:
+        filename: Path to the file, or '-' for stdin.
+        line_ranges: The ranges of line numbers to use, as returned by
+            `parse_line_ranges`, or None for every line.
+        conditions: The conditions that a line has to satisfy, as
+            returned by `parse_condition`.
+        streaming: Whether to decode the lines with `JsonStreamReader`,
+            which doesn't create Python objects for the values that are
+            not used, instead of decoding them in full.
+        json_backend: The JSON decoder to use if not `streaming`, one of
+            `JSON_BACKENDS`.
+        line_numbers: The numbers of the selected lines.
+
+    Examples:
+        >>> import tempfile
+        >>> with tempfile.NamedTemporaryFile("w", suffix=".jsonl") as f:
+        ...     _ = f.write('{"model": "ols", "nobs": 10}\\n')
+        ...     _ = f.write('{"model": "iv", "nobs": 20}\\n')
+        ...     _ = f.write('{"model": "ols", "nobs": 30}\\n')
+        ...     f.flush()
+        ...     reader = JsonLinesReader(
+        ...         f.name, conditions=[parse_condition("model=ols")],
+        ...     )
+        ...     reader.select_lines()
+        ...     reader.make_json_dict({"1::nobs", "2::nobs"})
+        [1, 3]
+        {'1::nobs': 10, '2::nobs': 30}
+
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        line_ranges: list[tuple[int, int | None]] | None = None,
+        conditions: list[tuple[str, bool, Any]] | None = None,
+        *,
+        streaming: bool = False,
+        json_backend: str = "auto",
+    ) -> None:
+        self.filename = filename
+        self.line_ranges = line_ranges
+        self.conditions = conditions or []
+        self.streaming = streaming
+        self.json_backend = json_backend
+
+        self.line_numbers: list[int] = []
+        self.stdin_lines: dict[int, str] = {}
+
+    @property
+    def name(self) -> str:
+        return "stdin" if self.filename == "-" else self.filename
+
+    @contextlib.contextmanager
+    def open(self) -> Iterator[Iterator[tuple[int, str]]]:
+        """Open the file and iterate over the numbered lines."""
+        if self.filename == "-":
+            yield enumerate(sys.stdin, 1)
+        else:
+            with Path(self.filename).open() as file:
+                yield enumerate(file, 1)
+
+    def last_line_number(self) -> int | None:
+        """Return the last line number in the ranges, if there is one."""
+        if self.line_ranges is None:
+            return None
+
+        ends = [end for _, end in self.line_ranges]
+
+        return None if None in ends else max(ends)
+
+    def is_in_ranges(self, number: int) -> bool:
+        if self.line_ranges is None:
+            return True
+
+        return any(
+            start <= number and (end is None or number <= end)
+            for start, end in self.line_ranges
+        )
+
+    def read_paths(
+        self,
+        number: int,
+        line: str,
+        keys: set[str],
+        root: str,
+    ) -> dict[str, Any]:
+        """Read the given paths from a line whose top-level path is `root`.
+
+        Raises:
+            ValueError: If the line is not valid JSON.
+
+        """
+        decode = get_decoder(self.json_backend)
+
+        try:
+            if self.streaming:
+                return JsonStreamReader(io.StringIO(line), keys).read(root)
+
+            obj = decode(line)
+        except ValueError as error:
+            msg = f"Line {number} of {self.name} is not valid JSON: {error}"
+            raise ValueError(msg) from error
+
+        result = {}
+
+        # NOTE Wrapping the line in a list lets `lookup_path` resolve the
+        # top-level path as the first column.
+        #
+        for key in keys:
+            value = lookup_path([obj], "1" + key[len(root):])
+
+            if value is not MISSING:
+                result[key] = value
+
+        return result
+
+    def satisfies_conditions(self, number: int, line: str) -> bool:
+        root = str(number)
+        values = self.read_paths(
+            number,
+            line,
+            {f"{root}::{path}" for path, _, _ in self.conditions},
+            root,
+        )
+
+        for path, negate, expected in self.conditions:
+            value = values.get(f"{root}::{path}", MISSING)
+
+            if (value is not MISSING and value == expected) == negate:
+                return False
+
+        return True
+
+    def select_lines(self) -> list[int]:
+        """Find the lines that make up the columns of the table.
+
+        Returns:
+            list[int]: The numbers of the selected lines, which are also
+                stored in `line_numbers`.
+
+        """
+        last = self.last_line_number()
+        self.line_numbers = []
+        self.stdin_lines = {}
+
+        with self.open() as lines:
+            for number, line in lines:
+                if last is not None and number > last:
+                    break
+
+                if (line.strip() == ""
+                    or not self.is_in_ranges(number)
+                    or (len(self.conditions) > 0
+                        and not self.satisfies_conditions(number, line))):
+                    continue
+
+                self.line_numbers.append(number)
+
+                if self.filename == "-":
+                    self.stdin_lines[number] = line
+
+        return self.line_numbers
+
+    def iter_selected_lines(self) -> Iterator[tuple[int, str]]:
+        if self.filename == "-":
+            yield from self.stdin_lines.items()
+            return
+
+        remaining = set(self.line_numbers)
+
+        with self.open() as lines:
+            for number, line in lines:
+                if len(remaining) == 0:
+                    break
+
+                if number in remaining:
+                    remaining.remove(number)
+                    yield number, line
+
+    def make_json_dict(self, keys: set[str]) -> dict:
+        """Build a dict with only the given paths from the selected lines.
+
+        This is the counterpart of `make_json_dict_for_keys` for the
+        JSON files of a table, with the selected lines as the columns.
+        `select_lines` has to be called first.
+
+        Raises:
+            ValueError: If a selected line is not valid JSON.
+
+        """
+        keys_by_column = group_keys_by_column(keys)
+        result = {}
+
+        for column, (number, line) in enumerate(
+            self.iter_selected_lines(), 1,
+        ):
+            column_keys = keys_by_column.get(str(column))
+
+            if column_keys is not None:
+                result.update(
+                    self.read_paths(number, line, column_keys, str(column)),
+                )
+
+        return result
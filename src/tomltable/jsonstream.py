@@ -0,0 +1,422 @@
+import json
+import re
+from pathlib import Path
+from typing import Any, NoReturn, TextIO
+
+CHUNK_SIZE = 1 << 16
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+SCALAR = re.compile(r"[^ \t\n\r,\]}]*")
+STRING_SPECIAL = re.compile(r'["\\]')
+CONTAINER_SPECIAL = re.compile(r'["\[\]{}]')
+
+
+class JsonStreamReader:
+    """Incremental JSON reader that only decodes the requested paths.
+
+    The reader consumes the file in chunks and keeps only the unread
+    part of the current chunk in memory.  Subtrees whose paths are
+    neither requested nor lead to a requested path are skipped by
+    scanning for brackets and quotes, without creating Python objects
+    for the values inside them.  Peak memory use is therefore close to
+    the chunk size plus the size of the extracted values.
+
+    Paths follow the conventions of `traverse`: keys are combined with
+    '::', list indices start at 1, and only values that are neither
+    dicts nor lists are extracted.
+
+    NOTE Skipped subtrees are only checked for balanced brackets and
+    strings, so invalid JSON inside them is not reported.
+
+    Attributes:
+        keys: The paths to extract.
+        prefixes: The paths of the containers that have to be entered to
+            reach the paths in `keys`.
+        result: A dict mapping the extracted paths to their values.
+
+    """
+
+    def __init__(
+        self,
+        file: TextIO,
+        keys: set[str],
+        chunk_size: int = CHUNK_SIZE,
+    ) -> None:
+        self.file = file
+        self.keys = keys
+        self.prefixes = {
+            key[:position]
+            for key in keys
+            for position in find_separators(key)
+        }
+        self.result: dict[str, Any] = {}
+
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.position = 0
+        self.offset = 0
+        self.eof = False
+
+    def read(self, root: str) -> dict[str, Any]:
+        """Read the whole document whose top-level value is at `root`."""
+        self.read_value(root)
+        self.skip_whitespace()
+
+        if self.peek() != "":
+            self.fail("Extra data")
+
+        return self.result
+
+    def fail(self, problem: str) -> NoReturn:
+        msg = (
+            f"{problem} at character {self.offset + self.position} "
+            "of the JSON document."
+        )
+        raise ValueError(msg)
+
+    def fill(self) -> bool:
+        """Drop the consumed part of the buffer and read another chunk.
+
+        Returns:
+            bool: False if the end of the file has been reached.
+
+        """
+        if self.eof:
+            return False
+
+        chunk = self.file.read(self.chunk_size)
+
+        self.offset += self.position
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+
+        if chunk == "":
+            self.eof = True
+
+        return chunk != ""
+
+    def peek(self) -> str:
+        if self.position >= len(self.buffer) and not self.fill():
+            return ""
+
+        return self.buffer[self.position]
+
+    def expect(self, character: str) -> None:
+        self.skip_whitespace()
+
+        if self.peek() != character:
+            self.fail(f"Expecting '{character}'")
+
+        self.position += 1
+
+    def skip_whitespace(self) -> None:
+        while True:
+            self.position = (
+                WHITESPACE.match(self.buffer, self.position).end()
+            )
+
+            if self.position < len(self.buffer) or not self.fill():
+                return
+
+    def find_string_end(self) -> int:
+        """Find the end of the string that starts at the current position.
+
+        The buffer is extended until it contains the closing quote.
+
+        Returns:
+            int: The index in the buffer right after the closing quote.
+
+        """
+        scanned = 1
+
+        while True:
+            match = STRING_SPECIAL.search(
+                self.buffer, self.position + scanned,
+            )
+
+            if match is None:
+                scanned = len(self.buffer) - self.position
+            elif match.group() == '"':
+                return match.end()
+            elif match.end() < len(self.buffer):
+                scanned = match.end() + 1 - self.position
+                continue
+            else:
+                scanned = match.start() - self.position
+
+            if not self.fill():
+                self.fail("Unterminated string")
+
+    def read_string(self) -> str:
+        end = self.find_string_end()
+        value, _ = json.decoder.scanstring(
+            self.buffer, self.position + 1,
+        )
+        self.position = end
+
+        return value
+
+    def find_scalar_end(self) -> int:
+        while True:
+            end = SCALAR.match(self.buffer, self.position).end()
+
+            if end < len(self.buffer) or not self.fill():
+                return end
+
+    def read_scalar(self) -> Any:  # noqa: ANN401
+        if self.peek() == '"':
+            return self.read_string()
+
+        end = self.find_scalar_end()
+
+        try:
+            value = json.loads(self.buffer[self.position:end])
+        except ValueError:
+            self.fail("Expecting value")
+
+        self.position = end
+
+        return value
+
+    def skip_string(self) -> None:
+        # Skip the opening quote.
+        #
+        self.position += 1
+
+        while True:
+            match = STRING_SPECIAL.search(self.buffer, self.position)
+
+            if match is None:
+                self.position = len(self.buffer)
+            elif match.group() == '"':
+                self.position = match.end()
+                return
+            elif match.end() < len(self.buffer):
+                self.position = match.end() + 1
+                continue
+            else:
+                self.position = match.start()
+
+            if not self.fill():
+                self.fail("Unterminated string")
+
+    def skip_container(self) -> None:
+        depth = 0
+
+        while True:
+            match = CONTAINER_SPECIAL.search(self.buffer, self.position)
+
+            if match is None:
+                self.position = len(self.buffer)
+
+                if not self.fill():
+                    self.fail("Unterminated array or object")
+
+                continue
+
+            character = match.group()
+            self.position = match.start()
+
+            if character == '"':
+                self.skip_string()
+                continue
+
+            self.position += 1
+
+            if character in "[{":
+                depth += 1
+            else:
+                depth -= 1
+
+                if depth == 0:
+                    return
+
+    def skip_value(self) -> None:
+        character = self.peek()
+
+        if character in ("[", "{"):
+            self.skip_container()
+        elif character == '"':
+            self.skip_string()
+        else:
+            end = self.find_scalar_end()
+
+            if end == self.position:
+                self.fail("Expecting value")
+
+            self.position = end
+
+    def read_value(self, path: str) -> None:
+        self.skip_whitespace()
+        character = self.peek()
+
+        if character == "":
+            self.fail("Expecting value")
+
+        if character == "{" and path in self.prefixes:
+            self.read_object(path)
+        elif character == "[" and path in self.prefixes:
+            self.read_array(path)
+        elif character not in ("[", "{") and path in self.keys:
+            self.result[path] = self.read_scalar()
+        else:
+            self.skip_value()
+
+    def read_object(self, path: str) -> None:
+        self.position += 1
+        self.skip_whitespace()
+
+        if self.peek() == "}":
+            self.position += 1
+            return
+
+        while True:
+            self.skip_whitespace()
+
+            if self.peek() != '"':
+                self.fail(
+                    "Expecting property name enclosed in double quotes",
+                )
+
+            key = self.read_string()
+            self.expect(":")
+            self.read_value(f"{path}::{key}")
+            self.skip_whitespace()
+
+            character = self.peek()
+            self.position += 1
+
+            if character == "}":
+                return
+
+            if character != ",":
+                self.position -= 1
+                self.fail("Expecting ',' delimiter")
+
+    def read_array(self, path: str) -> None:
+        self.position += 1
+        self.skip_whitespace()
+
+        if self.peek() == "]":
+            self.position += 1
+            return
+
+        index = 1
+
+        while True:
+            self.read_value(f"{path}::{index}")
+            self.skip_whitespace()
+
+            character = self.peek()
+            self.position += 1
+
+            if character == "]":
+                return
+
+            if character != ",":
+                self.position -= 1
+                self.fail("Expecting ',' delimiter")
+
+            index += 1
+
+
+def find_separators(key: str) -> list[int]:
+    """Find the positions of the '::' separators in a path.
+
+    Examples:
+        >>> find_separators("1::coef::x")
+        [1, 7]
+        >>> find_separators("1")
+        []
+
+    """
+    positions = []
+    position = key.find("::")
+
+    while position >= 0:
+        positions.append(position)
+        position = key.find("::", position + 2)
+
+    return positions
+
+
+def group_keys_by_column(keys: set[str]) -> dict[str, set[str]]:
+    """Group paths by their first part, i.e., the column of the table.
+
+    Examples:
+        >>> keys_by_column = group_keys_by_column({"1::a", "1::b", "2"})
+        >>> sorted(keys_by_column["1"]), sorted(keys_by_column["2"])
+        (['1::a', '1::b'], ['2'])
+
+    """
+    keys_by_column: dict[str, set[str]] = {}
+
+    for key in keys:
+        column = key.split("::", 1)[0]
+        keys_by_column.setdefault(column, set()).add(key)
+
+    return keys_by_column
+
+
+def load_json_file_paths(
+    filename: str,
+    keys: set[str],
+    root: str,
+) -> dict[str, Any]:
+    """Read only the requested paths from a JSON file.
+
+    This function is the streaming counterpart of calling
+    `load_json_file` and then looking up each path.  The file is never
+    loaded as a whole.
+
+    Args:
+        filename: Path to the JSON file.
+        keys: The paths to extract, including the root.
+        root: The path of the top-level value in the file (e.g., '2'
+            for the second JSON file of the table).
+
+    Returns:
+        dict[str, Any]: A dict mapping the paths in `keys` that are
+            present in the file to their values.
+
+    Raises:
+        ValueError: If the file is not valid JSON.
+
+    """
+    with Path(filename).open() as json_file:
+        return JsonStreamReader(json_file, keys).read(root)
+
+
+def make_json_dict_streaming(
+    json_filenames: list[str],
+    keys: set[str],
+) -> dict:
+    """Build a dict with only the given paths by streaming JSON files.
+
+    This is a drop-in replacement for loading every file and calling
+    `make_json_dict_for_keys`.  Each file is read once, and only the
+    paths in `keys` that start with its column index are decoded.
+
+    Examples:
+        >>> import tempfile
+        >>> with tempfile.NamedTemporaryFile("w", suffix=".json") as f:
+        ...     _ = f.write('{"nobs": 1000, "residuals": [0.1, 0.2]}')
+        ...     f.flush()
+        ...     make_json_dict_streaming([f.name], {"1::nobs", "2::nobs"})
+        {'1::nobs': 1000}
+
+    """
+    keys_by_column = group_keys_by_column(keys)
+    result = {}
+
+    for index, filename in enumerate(json_filenames, 1):
+        column_keys = keys_by_column.get(str(index))
+
+        if column_keys is None:
+            continue
+
+        result.update(
+            load_json_file_paths(filename, column_keys, str(index)),
+        )
+
+    return result
@@ -0,0 +1,210 @@
+import csv
+from pathlib import Path
+from typing import Any
+
+# The default names of the model, term, statistic, and value columns.
+#
+DEFAULT_COLUMNS = ("model", "term", "statistic", "value")
+
+# The characters that a number can end with.  `float` also accepts
+# 'nan' and 'inf', which shouldn't be converted.
+#
+NUMBER_ENDINGS = frozenset("0123456789.")
+
+
+def parse_value(text: str) -> Any:  # noqa: ANN401
+    """Convert a value from a CSV file to a number if it is one.
+
+    Strings that `float` accepts but that are not written like numbers,
+    e.g., 'NaN', 'inf', or '1_000', are left as they are.
+
+    Examples:
+        >>> parse_value("1000"), parse_value("-0.25"), parse_value("1e-5")
+        (1000, -0.25, 1e-05)
+        >>> parse_value("***"), parse_value("NA"), parse_value("Inf")
+        ('***', 'NA', 'Inf')
+
+    """
+    # NOTE Most values are floats, so `float` is tried first.  This is
+    # twice as fast as matching a regular expression.
+    #
+    if text[-1:] not in NUMBER_ENDINGS or "_" in text:
+        return text
+
+    try:
+        value = float(text)
+    except ValueError:
+        return text
+
+    if "." in text or "e" in text or "E" in text:
+        return value
+
+    return int(text)
+
+
+def get_delimiter(filename: str) -> str:
+    """Return the delimiter of a results file based on its extension.
+
+    Examples:
+        >>> get_delimiter("results.tsv"), get_delimiter("results.csv")
+        ('\\t', ',')
+
+    """
+    return "\t" if Path(filename).suffix.lower() in (".tsv", ".tab") else ","
+
+
+def get_target(
+    results: dict[str, dict],
+    model: str,
+    term: str,
+    wanted: set[str] | None,
+) -> dict | None:
+    """Return the dict that the statistics of a model and a term go to.
+
+    Returns:
+        dict | None: The dict, or None if the model is not wanted.
+
+    """
+    if wanted is not None and model not in wanted:
+        return None
+
+    result = results.get(model)
+
+    if result is None:
+        result = results[model] = {}
+
+    if term == "":
+        return result
+
+    coef = result.get("coef")
+
+    if coef is None:
+        coef = result["coef"] = {}
+
+    statistics = coef.get(term)
+
+    if statistics is None:
+        statistics = coef[term] = {}
+
+    return statistics
+
+
+def load_long_results(
+    filename: str,
+    columns: tuple[str, str, str, str] = DEFAULT_COLUMNS,
+    models: list[str] | None = None,
+) -> list[tuple[str, dict]]:
+    """Index a long-format results file by model, term, and statistic.
+
+    Each row of the file holds one value of one statistic (e.g., 'est')
+    of one term (e.g., 'mag') of one model.  The file is scanned once,
+    and the values of each model are arranged like in a result file of
+    jsonwriter: the statistics of the terms go under 'coef', and those
+    of rows with an empty term, like 'nobs', go to the top level.  A
+    table can therefore use the same paths as with JSON files, e.g.,
+    '1::coef::mag::est' and '1::nobs'.
+
+    Values that look like numbers are converted to numbers, and rows
+    with an empty value are skipped.  Files with the extension '.tsv' or
+    '.tab' are tab-separated, and other files are comma-separated.
+
+    Args:
+        filename: Path to the results file.
+        columns: The names of the model, term, statistic, and value
+            columns.
+        models: Only keep the values of these models.  Defaults to every
+            model in the file.
+
+    Returns:
+        list[tuple[str, dict]]: Pairs of a model and its values, one for
+            each of `models`, including repeated ones, in the given
+            order, or one for each model in the file, in the order in
+            which the models first appear.
+
+    Raises:
+        ValueError: If a column is missing from the header, or if one of
+            `models` is not in the file.
+
+    Examples:
+        >>> import tempfile
+        >>> with tempfile.NamedTemporaryFile("w", suffix=".csv") as f:
+        ...     _ = f.write("model,term,statistic,value\\n")
+        ...     _ = f.write("ols,mag,est,1.5\\n")
+        ...     _ = f.write("ols,,nobs,1000\\n")
+        ...     f.flush()
+        ...     load_long_results(f.name)
+        [('ols', {'coef': {'mag': {'est': 1.5}}, 'nobs': 1000})]
+
+    """
+    wanted = None if models is None else set(models)
+    results: dict[str, dict] = {}
+
+    with Path(filename).open(newline="") as csv_file:
+        reader = csv.reader(csv_file, delimiter=get_delimiter(filename))
+        header = next(reader, [])
+
+        indices = []
+
+        for column in columns:
+            if column not in header:
+                msg = f"Column '{column}' is not in the header of {filename}."
+                raise ValueError(msg)
+
+            indices.append(header.index(column))
+
+        model_index, term_index, statistic_index, value_index = indices
+        width = max(indices) + 1
+
+        # NOTE The rows of a model and a term are usually next to each
+        # other, so the dict that the previous row went to is reused.
+        #
+        last_model = last_term = None
+        target = None
+
+        for row in reader:
+            if len(row) < width or row[value_index] == "":
+                continue
+
+            model = row[model_index]
+            term = row[term_index]
+
+            if model != last_model or term != last_term:
+                last_model = model
+                last_term = term
+                target = get_target(results, model, term, wanted)
+
+            if target is not None:
+                target[row[statistic_index]] = parse_value(row[value_index])
+
+    if models is not None:
+        for model in models:
+            if model not in results:
+                msg = f"Model '{model}' is not in {filename}."
+                raise ValueError(msg)
+
+        return [(model, results[model]) for model in models]
+
+    return list(results.items())
+
+
+def parse_columns(value: str) -> tuple[str, str, str, str]:
+    """Parse the comma-separated names of the four columns.
+
+    Raises:
+        ValueError: If there are not exactly four names.
+
+    Examples:
+        >>> parse_columns("spec,variable,stat,value")
+        ('spec', 'variable', 'stat', 'value')
+
+    """
+    names = tuple(name.strip() for name in value.split(","))
+
+    if len(names) != len(DEFAULT_COLUMNS) or "" in names:
+        msg = (
+            f"Invalid column names '{value}': expecting four names for "
+            "the model, term, statistic, and value columns."
+        )
+        raise ValueError(msg)
+
+    return names
@@ -0,0 +1,259 @@
+import contextlib
+import mmap
+import multiprocessing
+import os
+import pickle
+import tempfile
+from collections.abc import Callable, Iterator, Mapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class SharedJsonFiles(Mapping):
+    """Read-only mapping from filenames to JSON data in a shared file.
+
+    The JSON data of every file is pickled once into a single store file
+    by `write_shared_json_files`.  Each process that opens the store
+    maps it into memory read-only, so the operating system keeps one
+    copy of it in the page cache no matter how many processes use it.
+    A JSON file is unpickled only when a process first accesses it, and
+    the result is cached for the lifetime of the mapping.
+
+    This is the fallback of `map_with_shared_json_files` on platforms
+    that cannot fork.  Every process still unpickles each file that it
+    uses, which is cheaper than decoding the JSON again but not free.
+
+    Attributes:
+        index: A dict mapping each filename to the offset and the length
+            of its pickled data in the store.
+
+    """
+
+    def __init__(
+        self,
+        store_filename: str,
+        index: dict[str, tuple[int, int]],
+    ) -> None:
+        self.index = index
+        self.cache: dict[str, Any] = {}
+
+        with Path(store_filename).open("rb") as store_file:
+            self.buffer = mmap.mmap(
+                store_file.fileno(), 0, access=mmap.ACCESS_READ,
+            )
+
+    def __getitem__(self, filename: str) -> Any:  # noqa: ANN401
+        if filename not in self.cache:
+            offset, length = self.index[filename]
+            self.cache[filename] = pickle.loads(
+                memoryview(self.buffer)[offset:offset + length],
+            )
+
+        return self.cache[filename]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.index)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+
+def write_shared_json_files(
+    json_files: Mapping[str, Any],
+    store_filename: str,
+) -> dict[str, tuple[int, int]]:
+    """Pickle loaded JSON files into a store for `SharedJsonFiles`.
+
+    Returns:
+        dict[str, tuple[int, int]]: The index of the store.
+
+    """
+    index = {}
+    offset = 0
+
+    with Path(store_filename).open("wb") as store_file:
+        for filename, json_file in json_files.items():
+            data = pickle.dumps(
+                json_file, protocol=pickle.HIGHEST_PROTOCOL,
+            )
+            store_file.write(data)
+
+            index[filename] = (offset, len(data))
+            offset += len(data)
+
+        # NOTE An empty file cannot be memory-mapped.
+        #
+        if offset == 0:
+            store_file.write(b"\0")
+
+    return index
+
+
+_worker_json_files: Mapping[str, Any] = {}
+
+
+def _initialize_worker(
+    store_filename: str,
+    index: dict[str, tuple[int, int]],
+) -> None:
+    global _worker_json_files  # noqa: PLW0603
+
+    _worker_json_files = SharedJsonFiles(store_filename, index)
+
+
+def _call_in_worker(
+    function: Callable[[T, Mapping[str, Any]], R],
+    item: T,
+) -> R:
+    return function(item, _worker_json_files)
+
+
+def map_with_shared_json_files(
+    function: Callable[[T, Mapping[str, Any]], R],
+    items: list[T],
+    json_files: Mapping[str, Any],
+    max_workers: int | None = None,
+) -> list[R]:
+    """Call a function for each item in a pool of processes.
+
+    Where processes can be forked, the worker processes inherit the
+    loaded JSON files from this process, so they neither decode nor
+    unpickle them.  Elsewhere, the files are shared through
+    `SharedJsonFiles`, and each worker unpickles the files that it uses.
+    The function is called as `function(item, json_files)` and has to be
+    picklable, i.e., defined at the top level of a module.
+
+    Args:
+        function: The function to call.
+        items: The items to call the function for.
+        json_files: A mapping from filenames to loaded JSON files.
+        max_workers: The number of worker processes.  If None, one
+            process is used for each CPU.
+
+    Returns:
+        list[R]: The results in the same order as `items`.
+
+    """
+    global _worker_json_files  # noqa: PLW0603
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        # NOTE A pool with the fork start method starts every worker
+        # when the first item is submitted, so the workers get the
+        # files that are set here.
+        #
+        previous_json_files = _worker_json_files
+        _worker_json_files = json_files
+
+        try:
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("fork"),
+            ) as executor:
+                return list(
+                    executor.map(
+                        _call_in_worker,
+                        [function] * len(items),
+                        items,
+                    ),
+                )
+        finally:
+            _worker_json_files = previous_json_files
+
+    with tempfile.TemporaryDirectory(prefix="tomltable-") as directory:
+        store_filename = str(Path(directory) / "json-files.pickle")
+        index = write_shared_json_files(json_files, store_filename)
+
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_initialize_worker,
+            initargs=(store_filename, index),
+        ) as executor:
+            return list(
+                executor.map(
+                    _call_in_worker,
+                    [function] * len(items),
+                    items,
+                ),
+            )
+
+
+def get_file_id(filename: str) -> tuple:
+    """Return an identifier that is the same for every name of a file.
+
+    The identifier is the device and the inode of the file, or its
+    resolved path on file systems that don't have inodes.
+
+    Raises:
+        OSError: If the file cannot be accessed.
+
+    """
+    stat = os.stat(filename)
+
+    if stat.st_ino == 0:
+        return (os.path.realpath(filename),)
+
+    return (stat.st_dev, stat.st_ino)
+
+
+def map_distinct_files(
+    function: Callable[[str], R],
+    filenames: list[str],
+    max_workers: int | None = 1,
+) -> list[R]:
+    """Call a function once for each distinct file in a pool of threads.
+
+    Files are the same if `get_file_id` returns the same identifier for
+    them, so a file that is given several times, or under several names,
+    e.g., through a symbolic link, is processed only once, and every
+    occurrence gets the same result.  Threads suit loading files, whose
+    time is mostly spent waiting for the storage, and the results don't
+    have to be pickled like with a pool of processes.
+
+    Args:
+        function: The function to call with a filename.
+        filenames: The filenames.
+        max_workers: The number of threads.  If None, the default of
+            `ThreadPoolExecutor` is used.  If 1, the function is called
+            in the current thread.
+
+    Returns:
+        list[R]: The results in the same order as `filenames`.
+
+    """
+    names = list(dict.fromkeys(filenames))
+
+    with contextlib.ExitStack() as stack:
+        if max_workers == 1:
+            mapper = map
+        else:
+            mapper = stack.enter_context(
+                ThreadPoolExecutor(max_workers=max_workers),
+            ).map
+
+        file_ids = dict(
+            zip(names, mapper(get_file_id, names), strict=True),
+        )
+
+        # NOTE The first name of each file is the one that is processed.
+        #
+        first_names = {}
+
+        for name, file_id in file_ids.items():
+            first_names.setdefault(file_id, name)
+
+        results = dict(
+            zip(
+                first_names.values(),
+                mapper(function, first_names.values()),
+                strict=True,
+            ),
+        )
+
+    return [
+        results[first_names[file_ids[filename]]]
+        for filename in filenames
+    ]
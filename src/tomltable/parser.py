@@ -1,5 +1,13 @@
+import sys
 from typing import Any, Literal
 
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    # NOTE The toml package has the same `loads` function as tomllib.
+    #
+    import toml as tomllib
+
 from tomltable.errors import (
     TableJsonMismatchError,
     TableSpecificationError,
@@ -14,6 +22,20 @@ from tomltable.types import (
 )
 
 
+def load_toml(text: str) -> dict:
+    """Parse a TOML document into a dict.
+
+    The standard library's `tomllib` is used on Python 3.11 and newer,
+    and the `toml` package on older versions.
+
+    Examples:
+        >>> load_toml('header = {add-column-numbers = true}')
+        {'header': {'add-column-numbers': True}}
+
+    """
+    return tomllib.loads(text)
+
+
 def parse_toml_string_field(
     value: Any,  # noqa: ANN401
     field_name: str,
@@ -0,0 +1,230 @@
+import contextlib
+import sys
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+# NOTE tracemalloc, cProfile, and json are imported only if the profiler
+# is enabled, because importing tracemalloc takes longer than a whole
+# run of tomltable on a small table.
+#
+
+
+class Profiler:
+    """Wall time and peak memory of the stages of rendering a table.
+
+    A disabled profiler records nothing, so the command-line interface
+    can time its stages unconditionally.  An enabled profiler traces
+    memory allocations with `tracemalloc`, which slows the run down, and
+    it optionally runs `cProfile` as well.
+
+    Attributes:
+        enabled: Whether anything is recorded.
+        stages: The name, wall time in seconds, and peak memory in
+            megabytes of each stage, in the order they ran.  The peak
+            memory is the largest amount of memory that the stage
+            allocated on top of what was in use when it started.
+        json_file_seconds: A dict mapping each JSON file to the time it
+            took to load it.
+        counts: Counters such as the number of JSON keys that were
+            created.
+
+    Examples:
+        >>> profiler = Profiler(enabled=True)
+        >>> profiler.start()
+        >>> with profiler.stage("fill template"):
+        ...     table = "x" * 1000
+        >>> profiler.count("placeholders", 3)
+        >>> profiler.stop()
+        >>> [stage["name"] for stage in profiler.to_dict()["stages"]]
+        ['fill template']
+        >>> profiler.to_dict()["counts"]
+        {'placeholders': 3}
+
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = False,
+        report_text: bool = False,
+        json_filename: str | None = None,
+        cprofile_filename: str | None = None,
+    ) -> None:
+        self.enabled = enabled
+        self.report_text = report_text
+        self.json_filename = json_filename
+        self.cprofile_filename = cprofile_filename
+
+        self.stages: list[dict[str, Any]] = []
+        self.json_file_seconds: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+
+        self.cprofile = None
+        self.started_tracemalloc = False
+        self.running = False
+
+    def start(self) -> None:
+        """Start tracing memory and, if requested, `cProfile`."""
+        if not self.enabled or self.running:
+            return
+
+        self.running = True
+
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracemalloc = True
+
+        if self.cprofile_filename is not None:
+            import cProfile
+
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+    def stop(self) -> None:
+        """Stop tracing and write the reports that were requested.
+
+        Calling this method more than once has no further effect.
+
+        """
+        if not self.running:
+            return
+
+        self.running = False
+
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            self.cprofile.dump_stats(self.cprofile_filename)
+            self.cprofile = None
+
+        if self.started_tracemalloc:
+            import tracemalloc
+
+            tracemalloc.stop()
+            self.started_tracemalloc = False
+
+        if self.report_text:
+            print(self.format_report(), end="", file=sys.stderr)
+
+        if self.json_filename is not None:
+            import json
+
+            Path(self.json_filename).write_text(
+                json.dumps(self.to_dict(), indent=2) + "\n",
+            )
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Record the wall time and peak memory of the enclosed code."""
+        if not self.running:
+            yield
+            return
+
+        import tracemalloc
+
+        tracemalloc.reset_peak()
+        memory_before, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+
+            self.stages.append({
+                "name": name,
+                "seconds": seconds,
+                "peak_memory_mb": (peak - memory_before) / 1024 / 1024,
+            })
+
+    @contextlib.contextmanager
+    def json_file(self, filename: str) -> Iterator[None]:
+        """Record the time it takes to load a JSON file."""
+        if not self.running:
+            yield
+            return
+
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.json_file_seconds[filename] = (
+                self.json_file_seconds.get(filename, 0.0)
+                + time.perf_counter()
+                - start
+            )
+
+    def count(self, name: str, value: int) -> None:
+        """Set a counter, e.g., the number of placeholders."""
+        if self.running:
+            self.counts[name] = value
+
+    def slowest_json_file(self) -> tuple[str, float] | None:
+        """Return the JSON file that took the longest to load."""
+        if len(self.json_file_seconds) == 0:
+            return None
+
+        return max(self.json_file_seconds.items(), key=lambda x: x[1])
+
+    def to_dict(self) -> dict[str, Any]:
+        slowest = self.slowest_json_file()
+
+        return {
+            "stages": self.stages,
+            "total_seconds": sum(stage["seconds"] for stage in self.stages),
+            "counts": self.counts,
+            "json_file_seconds": self.json_file_seconds,
+            "slowest_json_file": (
+                None
+                if slowest is None
+                else {"filename": slowest[0], "seconds": slowest[1]}
+            ),
+        }
+
+    def format_report(self) -> str:
+        """Format the profile as a human-readable table.
+
+        Examples:
+            >>> profiler = Profiler(enabled=True)
+            >>> profiler.stages.append({
+            ...     "name": "parse TOML",
+            ...     "seconds": 0.25,
+            ...     "peak_memory_mb": 1.5,
+            ... })
+            >>> profiler.json_file_seconds["a.json"] = 0.125
+            >>> profiler.counts["json_keys"] = 15
+            >>> print(profiler.format_report(), end="")
+            stage                     seconds    peak MB
+            parse TOML                 0.2500        1.5
+            total                      0.2500
+            json keys: 15
+            slowest JSON file: a.json (0.1250 s)
+
+        """
+        lines = [f"{'stage':<20} {'seconds':>12} {'peak MB':>10}"]
+
+        for stage in self.stages:
+            lines.append(
+                f"{stage['name']:<20} {stage['seconds']:12.4f} "
+                f"{stage['peak_memory_mb']:10.1f}",
+            )
+
+        total = sum(stage["seconds"] for stage in self.stages)
+        lines.append(f"{'total':<20} {total:12.4f}")
+
+        for name, value in self.counts.items():
+            lines.append(f"{name.replace('_', ' ')}: {value}")
+
+        slowest = self.slowest_json_file()
+
+        if slowest is not None:
+            lines.append(
+                f"slowest JSON file: {slowest[0]} ({slowest[1]:.4f} s)",
+            )
+
+        return "\n".join(lines) + "\n"
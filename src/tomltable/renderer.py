@@ -0,0 +1,466 @@
+import asyncio
+import functools
+import os
+import threading
+from collections.abc import AsyncIterator, Iterable
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import Any
+
+from tomltable import (
+    TABLE_FORMATS,
+    THOUSANDS_SEPARATORS,
+    get_thousands_separator,
+    load_json_file,
+    make_json_dict_for_keys,
+)
+from tomltable.compiled import (
+    VALUE_ESCAPES,
+    CompiledTemplate,
+    RenderWarning,
+    load_template,
+)
+from tomltable.parser import (
+    confirm_consistent_column_count,
+    load_toml,
+    parse_toml,
+)
+from tomltable.template import make_template
+from tomltable.types import TableSpec
+
+
+@dataclass
+class RenderResult:
+    """A rendered table and the warnings that rendering it produced.
+
+    Attributes:
+        table: The final table.
+        warnings: The warnings, in the order of the placeholders.
+
+    """
+
+    table: str
+    warnings: list[RenderWarning] = field(default_factory=list)
+
+
+class AsyncJsonLoader:
+    """Load JSON files in an executor without blocking the event loop.
+
+    Every file is read and decoded in `executor`, and at most
+    `max_concurrency` files are loaded at the same time.  A file is
+    loaded only once per loader: renders that ask for a file that is
+    already being loaded wait for the same load.  Use one loader for a
+    group of renders that should share the loaded files, e.g., for one
+    request, because the loader keeps the files for its lifetime.
+
+    Cancelling a render cancels its wait for the files but not their
+    loads, which other renders may share.  A load that fails is not
+    kept, so a later render tries again.
+
+    Attributes:
+        max_concurrency: The number of files that are loaded at the
+            same time.
+        executor: The executor to load the files in, or None for the
+            default executor of the event loop.
+        json_backend: The JSON decoder to use, one of `JSON_BACKENDS`.
+        loads: A dict mapping absolute paths to their loads.
+
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        executor: Executor | None = None,
+        json_backend: str = "auto",
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.executor = executor
+        self.json_backend = json_backend
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.loads: dict[str, asyncio.Future] = {}
+
+    async def load(self, filename: str | os.PathLike) -> Any:  # noqa: ANN401
+        """Return the content of a JSON file.
+
+        Raises:
+            ValueError: If the file is not valid JSON.
+
+        """
+        # NOTE Resolving symbolic links would block on slow storage, so
+        # only the absolute path is used as the key.
+        #
+        path = os.path.abspath(filename)
+        load = self.loads.get(path)
+
+        if load is None:
+            load = self.loads[path] = asyncio.ensure_future(
+                self.load_in_executor(path),
+            )
+
+        return await asyncio.shield(load)
+
+    async def load_in_executor(self, path: str) -> Any:  # noqa: ANN401
+        """Load a JSON file in the executor once a slot is free."""
+        try:
+            async with self.semaphore:
+                return await asyncio.get_running_loop().run_in_executor(
+                    self.executor, load_json_file, path, self.json_backend,
+                )
+        except BaseException:
+            del self.loads[path]
+            raise
+
+
+class Renderer:
+    """Render tables from one specification or template in-process.
+
+    A renderer is built from a table specification, given as TOML text
+    or as a parsed `TableSpec`, or from a plain or compiled template.
+    The specification is parsed and validated once, and the compiled
+    template for each number of columns is generated on first use and
+    kept, so rendering many tables from the same renderer is cheap.
+
+    Unlike the command-line interface, a renderer neither reads stdin
+    nor prints anything nor changes global settings: errors are raised,
+    and warnings are returned with the table.  A renderer can be shared
+    by several threads.
+
+    Attributes:
+        table_spec: The validated specification, or None if the renderer
+            was built from a template.
+        title: Optional caption text for the table.
+        label: Optional LaTeX label for referencing the table.
+        table_format: The output format, one of `TABLE_FORMATS`.
+        json_backend: The JSON decoder for data sources that are paths,
+            one of `JSON_BACKENDS`.
+
+    Examples:
+        >>> renderer = Renderer(template="%(1::nobs)d and %(2::nobs)d obs.")
+        >>> renderer.render([{"nobs": 1000}, {"nobs": 500}]).table
+        '1000 and 500 obs.'
+        >>> result = renderer.render(
+        ...     [{}, {"nobs": 500}], ignore_missing_keys=True,
+        ... )
+        >>> result.table
+        ' and 500 obs.'
+        >>> result.warnings[0].key
+        '1::nobs'
+
+    """
+
+    def __init__(
+        self,
+        spec: str | TableSpec | None = None,
+        *,
+        template: str | None = None,
+        title: str | None = None,
+        label: str | None = None,
+        table_format: str = "tex",
+        json_backend: str = "auto",
+    ) -> None:
+        """Parse the specification or compile the template.
+
+        Raises:
+            TableSpecificationError: If the specification fails
+                validation checks.
+            ValueError: If not exactly one of `spec` and `template` is
+                given, if `title` or `label` is given with a template,
+                or if `table_format` is unknown.
+
+        """
+        if (spec is None) == (template is None):
+            msg = "Exactly one of spec and template is required."
+            raise ValueError(msg)
+
+        if template is not None and (title is not None or label is not None):
+            msg = "A title or a label cannot be used with a template."
+            raise ValueError(msg)
+
+        if table_format not in TABLE_FORMATS:
+            msg = (
+                f"Invalid table format '{table_format}': expecting one of "
+                f"{', '.join(TABLE_FORMATS)}."
+            )
+            raise ValueError(msg)
+
+        self.table_spec = (
+            parse_toml(load_toml(spec)) if isinstance(spec, str) else spec
+        )
+        self.title = title
+        self.label = label
+        self.table_format = table_format
+        self.json_backend = json_backend
+
+        # NOTE A template doesn't depend on the number of columns, so it
+        # is kept under None.
+        #
+        self.templates: dict[int | None, CompiledTemplate] = {}
+        self.lock = threading.Lock()
+
+        if template is not None:
+            self.templates[None] = load_template(template)
+
+    def get_template(self, column_count: int) -> CompiledTemplate:
+        """Return the compiled template for a number of columns.
+
+        Raises:
+            TableJsonMismatchError: If the specification doesn't match
+                the number of columns.
+            TableSpecificationError: If the specification fails
+                validation checks.
+
+        """
+        if self.table_spec is None:
+            return self.templates[None]
+
+        compiled_template = self.templates.get(column_count)
+
+        if compiled_template is not None:
+            return compiled_template
+
+        # NOTE Only the number of columns matters, not the names.
+        #
+        json_filenames = [""] * column_count
+
+        confirm_consistent_column_count(self.table_spec, json_filenames)
+
+        compiled_template = load_template(
+            make_template(
+                self.table_spec,
+                json_filenames,
+                self.title,
+                self.label,
+                self.table_format,
+            ),
+        )
+
+        # NOTE Two threads may have generated the same template, so the
+        # first one to finish wins.
+        #
+        with self.lock:
+            return self.templates.setdefault(column_count, compiled_template)
+
+    def render(
+        self,
+        data_sources: list[Any],
+        *,
+        ignore_missing_keys: bool = False,
+        human_readable_numbers: bool = False,
+        thousands_separator: str | None = None,
+    ) -> RenderResult:
+        """Render a table with one column for each data source.
+
+        Args:
+            data_sources: The data of the columns.  A `str` or a path-like
+                object is the path to a JSON file, and anything else is
+                used as loaded JSON data, e.g., a dict.
+            ignore_missing_keys: Whether to ignore keys that are not
+                present in the corresponding data, and to return a
+                warning for each.
+            human_readable_numbers: Whether to add thousands separators
+                to numbers in the table.
+            thousands_separator: The name of the thousands separator in
+                `THOUSANDS_SEPARATORS` (e.g., 'thin-space').  Setting it
+                implies `human_readable_numbers`.
+
+        Returns:
+            RenderResult: The table and the warnings.
+
+        Raises:
+            TableJsonMismatchError: If the specification doesn't match
+                the number of data sources.
+            ValueError: If a path in the template is not found in the
+                data and `ignore_missing_keys` is False, or if the
+                thousands separator is unknown.
+
+        """
+        if (thousands_separator is not None
+            and thousands_separator not in THOUSANDS_SEPARATORS):
+            msg = (
+                f"Invalid thousands separator '{thousands_separator}': "
+                f"expecting one of {', '.join(THOUSANDS_SEPARATORS)}."
+            )
+            raise ValueError(msg)
+
+        compiled_template = self.get_template(len(data_sources))
+
+        json_files = [
+            load_json_file(os.fspath(source), self.json_backend)
+            if isinstance(source, (str, os.PathLike))
+            else source
+            for source in data_sources
+        ]
+
+        json_dict = make_json_dict_for_keys(
+            json_files, compiled_template.keys,
+        )
+
+        separator = get_thousands_separator(
+            human_readable_numbers, thousands_separator,
+        )
+
+        warnings: list[RenderWarning] = []
+        table = compiled_template.fill(
+            json_dict,
+            ignore_missing_keys=ignore_missing_keys,
+            thousands_separator=separator,
+            escape=VALUE_ESCAPES.get(self.table_format),
+            warnings=warnings,
+        )
+
+        return RenderResult(table, warnings)
+
+    async def render_async(
+        self,
+        data_sources: list[Any],
+        *,
+        loader: AsyncJsonLoader | None = None,
+        **options: Any,  # noqa: ANN401
+    ) -> RenderResult:
+        """Render a table like `render` without blocking the event loop.
+
+        The JSON files are loaded concurrently by `loader`, and the table
+        is rendered in the executor of the loader.
+
+        Args:
+            data_sources: The data of the columns, as in `render`.
+            loader: The loader for data sources that are paths.  Defaults
+                to a new loader, which only shares files within this
+                table.
+            **options: The keyword arguments of `render`.
+
+        Returns:
+            RenderResult: The table and the warnings.
+
+        """
+        if loader is None:
+            loader = AsyncJsonLoader(json_backend=self.json_backend)
+
+        async def load(source: Any) -> Any:  # noqa: ANN401
+            if isinstance(source, (str, os.PathLike)):
+                return await loader.load(source)
+
+            return source
+
+        json_files = await asyncio.gather(
+            *(load(source) for source in data_sources),
+        )
+
+        return await asyncio.get_running_loop().run_in_executor(
+            loader.executor,
+            functools.partial(self.render, list(json_files), **options),
+        )
+
+
+async def render_async(
+    renderer: Renderer,
+    data_sources: list[Any],
+    *,
+    loader: AsyncJsonLoader | None = None,
+    **options: Any,  # noqa: ANN401
+) -> RenderResult:
+    """Render one table without blocking the event loop.
+
+    This is `Renderer.render_async` as a function, for symmetry with
+    `render_batch_async`.
+
+    Args:
+        renderer: The renderer of the table.
+        data_sources: The data of the columns, as in `Renderer.render`.
+        loader: The loader for data sources that are paths.  Defaults to
+            a new loader that decodes with the JSON backend of
+            `renderer`.
+        **options: The keyword arguments of `Renderer.render`.
+
+    Returns:
+        RenderResult: The table and the warnings.
+
+    Examples:
+        >>> renderer = Renderer(template="%(1::nobs)d obs.")
+        >>> asyncio.run(render_async(renderer, [{"nobs": 10}])).table
+        '10 obs.'
+
+    """
+    return await renderer.render_async(
+        data_sources, loader=loader, **options,
+    )
+
+
+async def render_batch_async(
+    tables: Iterable[tuple[Renderer, list[Any]]],
+    *,
+    loader: AsyncJsonLoader | None = None,
+    **options: Any,  # noqa: ANN401
+) -> AsyncIterator[tuple[int, RenderResult]]:
+    """Render several tables concurrently and yield them as they finish.
+
+    The tables share `loader`, so a JSON file that several tables use is
+    loaded once.  If a table fails to render, or if the iteration stops
+    early, the tables that are still rendering are cancelled.
+
+    Args:
+        tables: Pairs of a renderer and the data sources of a table.
+        loader: The loader for data sources that are paths.  Defaults to
+            a new loader for each JSON backend of the renderers, which
+            decodes the files with that backend.
+        **options: The keyword arguments of `Renderer.render`.
+
+    Yields:
+        tuple[int, RenderResult]: The index of a table in `tables` and
+            its result, in the order in which the tables finish.
+
+    Examples:
+        >>> async def main():
+        ...     renderer = Renderer(template="%(1::nobs)d obs.")
+        ...     tables = [(renderer, [{"nobs": n}]) for n in (10, 20)]
+        ...     return sorted([
+        ...         (index, result.table)
+        ...         async for index, result in render_batch_async(tables)
+        ...     ])
+        >>> asyncio.run(main())
+        [(0, '10 obs.'), (1, '20 obs.')]
+
+    """
+    loaders: dict[str, AsyncJsonLoader] = {}
+
+    def get_loader(renderer: Renderer) -> AsyncJsonLoader:
+        if loader is not None:
+            return loader
+
+        if renderer.json_backend not in loaders:
+            loaders[renderer.json_backend] = AsyncJsonLoader(
+                json_backend=renderer.json_backend,
+            )
+
+        return loaders[renderer.json_backend]
+
+    async def render(
+        index: int,
+        renderer: Renderer,
+        data_sources: list[Any],
+    ) -> tuple[int, RenderResult]:
+        result = await renderer.render_async(
+            data_sources, loader=get_loader(renderer), **options,
+        )
+
+        return index, result
+
+    pending = {
+        asyncio.ensure_future(render(index, renderer, data_sources))
+        for index, (renderer, data_sources) in enumerate(tables)
+    }
+
+    try:
+        while len(pending) > 0:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED,
+            )
+
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+        if len(pending) > 0:
+            await asyncio.gather(*pending, return_exceptions=True)
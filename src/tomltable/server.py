@@ -0,0 +1,346 @@
+import contextlib
+import io
+import json
+import os
+import socket
+import sys
+import traceback
+from pathlib import Path
+from typing import Any
+
+import click
+
+from tomltable import load_json_file
+from tomltable.cli import main as tomltable_main
+from tomltable.client import (
+    ENVIRONMENT_PREFIX,
+    EXIT,
+    REQUEST,
+    STDERR,
+    STDIN_DATA,
+    STDIN_REQUEST,
+    STDOUT,
+    get_socket_path,
+    receive_frame,
+    send_frame,
+)
+from tomltable.compiled import CompiledTemplate, load_template
+
+DEFAULT_IDLE_TIMEOUT_SECONDS = 600
+MAX_CACHED_TEMPLATES = 256
+
+
+class WarmInputs:
+    """JSON files and templates that the render server keeps in memory.
+
+    A JSON file is loaded again if its modification time, its size, or
+    its inode changed since it was loaded.  Compiled templates are keyed
+    by the text of the template, so they never become stale, but only
+    the most recently used ones are kept.
+
+    Attributes:
+        json_files: A dict mapping resolved paths to the signature of
+            the file and its content.
+        templates: A dict mapping template texts to compiled templates,
+            from the least to the most recently used.
+
+    """
+
+    def __init__(self) -> None:
+        self.json_files: dict[str, tuple[tuple[int, int, int], Any]] = {}
+        self.templates: dict[str, CompiledTemplate] = {}
+
+    def load_json_file(
+        self,
+        filename: str,
+        backend: str = "auto",
+    ) -> Any:  # noqa: ANN401
+        """Return the content of a JSON file, reading it if it changed."""
+        path = Path(filename).resolve()
+        stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+        cached = self.json_files.get(str(path))
+
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        json_file = load_json_file(str(path), backend)
+        self.json_files[str(path)] = (signature, json_file)
+
+        return json_file
+
+    def load_template(self, text: str) -> CompiledTemplate:
+        """Return a template compiled from a plain or compiled template."""
+        compiled_template = self.templates.pop(text, None)
+
+        if compiled_template is None:
+            compiled_template = load_template(text)
+
+        self.templates[text] = compiled_template
+
+        if len(self.templates) > MAX_CACHED_TEMPLATES:
+            del self.templates[next(iter(self.templates))]
+
+        return compiled_template
+
+
+class RemoteStdin(io.TextIOBase):
+    """Stdin of a client, which is only transferred when it is read.
+
+    The whole of stdin is transferred on the first read, and it is read
+    from memory afterwards, so it can be read in any way that a text
+    stream supports, e.g., line by line with `--jsonl -`.
+
+    """
+
+    def __init__(self, connection: socket.socket) -> None:
+        self.connection = connection
+        self.stream: io.StringIO | None = None
+
+    def readable(self) -> bool:
+        return True
+
+    def get_stream(self) -> io.StringIO:
+        if self.stream is None:
+            send_frame(self.connection, STDIN_REQUEST)
+            frame_type, payload = receive_frame(self.connection)
+
+            if frame_type != STDIN_DATA:
+                msg = f"Unexpected frame type {frame_type!r} from client."
+                raise ConnectionError(msg)
+
+            self.stream = io.StringIO(payload.decode())
+
+        return self.stream
+
+    def read(self, size: int | None = -1) -> str:
+        return self.get_stream().read(size)
+
+    def readline(self, size: int | None = -1) -> str:
+        return self.get_stream().readline(size)
+
+
+class RemoteOutput(io.TextIOBase):
+    """Stdout or stderr of a client, which is sent as it is written."""
+
+    def __init__(self, connection: socket.socket, frame_type: bytes) -> None:
+        self.connection = connection
+        self.frame_type = frame_type
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        # NOTE click checks whether a stream is binary by writing bytes
+        # to it, so that has to fail.
+        #
+        if not isinstance(text, str):
+            msg = f"write() argument must be str, not {type(text).__name__}"
+            raise TypeError(msg)
+
+        if len(text) > 0:
+            send_frame(self.connection, self.frame_type, text.encode())
+
+        return len(text)
+
+
+@contextlib.contextmanager
+def client_environment(
+    request: dict[str, Any],
+    connection: socket.socket,
+) -> Any:  # noqa: ANN401
+    """Make the process look like the client for the duration of a call.
+
+    The working directory, the environment variables that start with
+    TOMLTABLE_, the terminal size, and the standard streams are those of
+    the client.  They are restored afterwards, along with
+    `sys.tracebacklimit`, which `tomltable.main` sets.
+
+    """
+    saved_cwd = Path.cwd()
+    saved_environ = os.environ.copy()
+    saved_streams = (sys.stdin, sys.stdout, sys.stderr)
+    saved_tracebacklimit = getattr(sys, "tracebacklimit", None)
+
+    try:
+        os.chdir(request["cwd"])
+
+        for name in saved_environ:
+            if name.startswith(ENVIRONMENT_PREFIX):
+                del os.environ[name]
+
+        os.environ.update(request["env"])
+
+        sys.stdin = RemoteStdin(connection)
+        sys.stdout = RemoteOutput(connection, STDOUT)
+        sys.stderr = RemoteOutput(connection, STDERR)
+
+        yield
+    finally:
+        sys.stdin, sys.stdout, sys.stderr = saved_streams
+
+        if saved_tracebacklimit is None:
+            with contextlib.suppress(AttributeError):
+                del sys.tracebacklimit
+        else:
+            sys.tracebacklimit = saved_tracebacklimit
+
+        os.environ.clear()
+        os.environ.update(saved_environ)
+        os.chdir(saved_cwd)
+
+
+def run_call(args: list[str], inputs: WarmInputs) -> int:
+    """Run `tomltable.main` like a separate process would.
+
+    Uncaught exceptions are printed like the interpreter prints them.
+
+    Returns:
+        int: The exit code that the process would have.
+
+    """
+    try:
+        tomltable_main.main(args=args, prog_name="tomltable", obj=inputs)
+    except SystemExit as error:
+        if error.code is None:
+            return 0
+
+        if isinstance(error.code, int):
+            return error.code
+
+        print(error.code, file=sys.stderr)
+        return 1
+    except Exception as error:  # noqa: BLE001
+        traceback.print_exception(
+            type(error),
+            error,
+            error.__traceback__,
+            limit=getattr(sys, "tracebacklimit", None),
+        )
+        return 1
+
+    return 0
+
+
+def handle_connection(connection: socket.socket, inputs: WarmInputs) -> None:
+    """Serve one tomltable call from a client."""
+    frame_type, payload = receive_frame(connection)
+
+    if frame_type != REQUEST:
+        msg = f"Unexpected frame type {frame_type!r} from client."
+        raise ConnectionError(msg)
+
+    request = json.loads(payload)
+
+    with client_environment(request, connection):
+        exit_code = run_call(request["args"], inputs)
+
+    send_frame(connection, EXIT, str(exit_code).encode())
+
+
+def bind_socket(socket_path: str) -> socket.socket:
+    """Listen on a Unix domain socket that only the user can connect to.
+
+    A socket file that is left over from a server that no longer runs is
+    replaced.
+
+    Raises:
+        OSError: If another server listens on the socket.
+
+    """
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        probe.connect(socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        with contextlib.suppress(FileNotFoundError):
+            Path(socket_path).unlink()
+    else:
+        msg = f"A server already listens on '{socket_path}'."
+        raise OSError(msg)
+    finally:
+        probe.close()
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    umask = os.umask(0o077)
+
+    try:
+        listener.bind(socket_path)
+    finally:
+        os.umask(umask)
+
+    listener.listen()
+
+    return listener
+
+
+def serve(socket_path: str, idle_timeout: float | None) -> None:
+    """Serve tomltable calls until the server has been idle for too long.
+
+    Calls are served one at a time, because each of them changes the
+    working directory and the standard streams of the process.
+
+    Args:
+        socket_path: The path of the socket to listen on.
+        idle_timeout: The number of seconds without calls after which
+            the server stops, or None to never stop.
+
+    """
+    inputs = WarmInputs()
+    listener = bind_socket(socket_path)
+    listener.settimeout(idle_timeout)
+
+    try:
+        while True:
+            try:
+                connection, _ = listener.accept()
+            except TimeoutError:
+                break
+
+            with connection:
+                connection.settimeout(None)
+
+                try:
+                    handle_connection(connection, inputs)
+                except (OSError, ValueError) as error:
+                    # NOTE The client may have gone away in the middle
+                    # of the call.
+                    #
+                    print(
+                        f"error: {type(error).__name__}: {error}",
+                        file=sys.stderr,
+                    )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.close()
+
+        with contextlib.suppress(FileNotFoundError):
+            Path(socket_path).unlink()
+
+
+@click.command(help=(
+    "Serve tomltable calls from tomltable-client on a Unix domain "
+    "socket. The server keeps its modules, JSON files, and templates "
+    "in memory between calls."
+))
+@click.option("--socket", "socket_path", type=str,
+              help=(
+                  "Path of the socket. Defaults to the value of the "
+                  "TOMLTABLE_SOCKET environment variable, or to "
+                  "tomltable-UID.sock in the runtime directory."
+              ))
+@click.option("--idle-timeout", type=click.FloatRange(min=0),
+              default=DEFAULT_IDLE_TIMEOUT_SECONDS, show_default=True,
+              help=(
+                  "Stop after this many seconds without calls. Use 0 "
+                  "to never stop."
+              ))
+def main(socket_path: str | None, idle_timeout: float) -> None:
+    """Start the render server."""
+    serve(socket_path or get_socket_path(), idle_timeout or None)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,25 @@
-import sys
-
-import regex
-
+import dataclasses as dcls
+import tempfile
+from collections.abc import Callable, Iterable, Iterator
+from typing import TextIO
+
+from tomltable import TABLE_FORMATS
+from tomltable.compiled import (
+    compile_template,
+    escape_csv,
+    escape_html,
+    escape_markdown,
+    iter_placeholders,
+)
 from tomltable.errors import TableSpecificationError
-from tomltable.types import CellSpec, RowSpec, TableSpec, TeXLength
+from tomltable.types import (
+    CellSpec,
+    OtherSectionSpec,
+    RowSpec,
+    TableRow,
+    TableSpec,
+    TeXLength,
+)
 
 
 def get_column_count(table_spec: TableSpec) -> int | None:
@@ -73,41 +89,68 @@ def adapt_cell_value_to_column(value: str, column_number: int) -> str:
             >>> adapt_cell_value_to_column("%(n::nobs)d", 2)
             '%(2::nobs)d'
 
+        Keys may contain parentheses:
+
+            >>> adapt_cell_value_to_column("%(n::coef::I(x^2)::est)s", 2)
+            '%(2::coef::I(x^2)::est)s'
+
         No placeholder, no replacement:
 
             >>> adapt_cell_value_to_column("%(1::nobs)d", 2)
             '%(1::nobs)d'
 
     """
-    return regex.sub(
-        (
-            r"(?V1)(^|[^%])%"
-            r"\(n::"
-            r"(?P<pat>[^()]*|[^()]*\((?&pat)*\)[^()]*)" # Handle nested
-                                                        # parens.
-            r"\)"
-            r"([-# .0-9]*[dfs])"
-        ),
-        fr"\1%({column_number}::\2)\3",
-        value,
-    )
+    parts = []
+    position = 0
+
+    for start, end, placeholder in iter_placeholders(value):
+        if placeholder.key.startswith("n::"):
+            key = f"{column_number}::{placeholder.key.removeprefix('n::')}"
+
+            parts.append(value[position:start])
+            parts.append(dcls.replace(placeholder, key=key).specifier)
+            position = end
+
+    parts.append(value[position:])
+
+    return "".join(parts)
+
+
+def escape_literals(value: str, escape: Callable[[str], str]) -> str:
+    """Escape the text outside of the conversion specifiers in a string.
+
+    Examples:
+        >>> escape_literals("a & %(1::b&c)s", escape_tex)
+        'a \\\\& %(1::b&c)s'
+
+    """
+    parts = []
+    position = 0
+
+    for start, end, _ in iter_placeholders(value):
+        parts.append(escape(value[position:start]))
+        parts.append(value[start:end])
+        position = end
+
+    parts.append(escape(value[position:]))
+
+    return "".join(parts)
 
 
 def make_rows_for_cell_spec_custom(
         spec: CellSpec,
-        column_count: int) -> list[str]:
-    """Generate LaTeX rows for a custom cell spec.
+        column_count: int) -> list[TableRow]:
+    """Generate rows for a custom cell spec.
 
-    This function constructs row strings from literal cell values defined
-    in the spec, handling labels, separators, line breaks, and vertical
-    padding.
+    This function constructs rows from literal cell values defined in
+    the spec, handling labels and vertical padding.
 
     Args:
         spec: The validated CellSpec object containing cell values.
         column_count: The total number of columns in the table.
 
     Returns:
-        list[str]: A list of LaTeX-formatted strings representing rows.
+        list[TableRow]: A list of rows, one for each cell value.
 
     """
     cell_values = spec.cell or []
@@ -117,29 +160,26 @@ def make_rows_for_cell_spec_custom(
     rows = []
 
     for cell_index, cell_value in enumerate(cell_values):
-        row = "" if cell_index > 0 else escape_tex(spec.label or "")
-
-        for column_number in range(1, column_count + 1):
-            value = adapt_cell_value_to_column(
-                cell_value, column_number,
-            )
-
-            row += f" & {escape_tex(value)}"
-
-        row += " \\\\"
-
-        if cell_index == cell_count - 1 and padding_bottom is not None:
-            row += f"[{padding_bottom}]"
-
-        rows.append(row)
+        rows.append(TableRow(
+            label="" if cell_index > 0 else spec.label or "",
+            cells=[
+                adapt_cell_value_to_column(cell_value, column_number)
+                for column_number in range(1, column_count + 1)
+            ],
+            padding_bottom=(
+                padding_bottom if cell_index == cell_count - 1 else None
+            ),
+        ))
 
     return rows
 
 
 def make_rows_for_cell_spec_regression(
         spec: CellSpec,
-        column_count: int) -> list[str]:
-    """Generate LaTeX rows for a regression-style cell spec.
+        column_count: int,
+        *,
+        math_mode: bool = True) -> list[TableRow]:
+    """Generate rows for a regression-style cell spec.
 
     This function creates path patterns with placeholders for the column
     index specifically designed to map regression coefficients and
@@ -150,19 +190,20 @@ def make_rows_for_cell_spec_regression(
         spec: The validated CellSpec object containing coefficient
             config.
         column_count: The total number of columns in the table.
+        math_mode: Whether to typeset the estimate in TeX math mode.
 
     Returns:
-        list[str]: A list of LaTeX-formatted strings representing rows
-            configured for regression data placeholders.
+        list[TableRow]: A list of rows configured for regression data
+            placeholders.
 
     """
     coef = spec.coef
+    estimate = f"%(n::coef::{coef}::est).03f"
 
     cell_values = [
         (
-            f"$%(n::coef::{coef}::est).03f$"
-            f"%(n::coef::{coef}::stars)s"
-        ),
+            f"${estimate}$" if math_mode else estimate
+        ) + f"%(n::coef::{coef}::stars)s",
         f"(%(n::coef::{coef}::se).04f)"
     ]
 
@@ -176,8 +217,10 @@ def make_rows_for_cell_spec_regression(
 
 def make_rows_for_cell_spec(
         spec: CellSpec,
-        column_count: int) -> list[str]:
-    """Generate LaTeX rows based on a cell specification type.
+        column_count: int,
+        *,
+        math_mode: bool = True) -> list[TableRow]:
+    """Generate rows based on a cell specification type.
 
     This function acts as a dispatcher that determines whether to use
     regression-style placeholders or custom literal values based on the
@@ -186,9 +229,11 @@ def make_rows_for_cell_spec(
     Args:
         spec: The validated CellSpec object to process.
         column_count: The total number of columns in the table.
+        math_mode: Whether to typeset regression estimates in TeX math
+            mode.
 
     Returns:
-        list[str]: A list of LaTeX-formatted strings representing rows.
+        list[TableRow]: A list of rows.
 
     Raises:
         TableSpecificationError: If neither 'cell' nor 'coef' is
@@ -197,7 +242,9 @@ def make_rows_for_cell_spec(
 
     """
     if spec.coef is not None:
-        return make_rows_for_cell_spec_regression(spec, column_count)
+        return make_rows_for_cell_spec_regression(
+            spec, column_count, math_mode=math_mode,
+        )
 
     if spec.cell is not None:
         return make_rows_for_cell_spec_custom(spec, column_count)
@@ -212,19 +259,19 @@ def make_rows_for_cell_spec(
 
 def make_rows_for_row_spec(
         spec: RowSpec,
-        column_count: int) -> list[str]:
-    """Generate LaTeX rows for a simple row spec.
+        column_count: int) -> list[TableRow]:
+    """Generate rows for a simple row spec.
 
-    This function constructs row strings from a row label and a fixed
-    list of cell values, validating that the number of cells matches the
-    table width.
+    This function constructs a row from a row label and a fixed list of
+    cell values, validating that the number of cells matches the table
+    width.
 
     Args:
         spec: The validated RowSpec object containing rows to format.
         column_count: The total number of columns in the table.
 
     Returns:
-        list[str]: A list of LaTeX-formatted strings representing rows.
+        list[TableRow]: A list with a single row.
 
     Raises:
         TableSpecificationError: If the number of cells does not match
@@ -232,7 +279,6 @@ def make_rows_for_row_spec(
 
     """
     cell_values = spec.cell
-    padding_bottom = spec.padding_bottom
 
     cell_count = len(cell_values)
 
@@ -247,21 +293,17 @@ def make_rows_for_row_spec(
         )
         raise TableSpecificationError(msg)
 
-    row = r"{} & {} \\".format(
-        escape_tex(spec.label or ""),
-        " & ".join(
-            escape_tex(value) for value in cell_values
+    return [
+        TableRow(
+            label=spec.label or "",
+            cells=list(cell_values),
+            padding_bottom=spec.padding_bottom,
         ),
-    )
-
-    if padding_bottom is not None:
-        row += f"[{padding_bottom}]"
-
-    return [row]
+    ]
 
 
-def make_row_for_column_numbers(column_count: int) -> str:
-    r"""Create a LaTeX row that displays column numbers.
+def make_row_for_column_numbers(column_count: int) -> TableRow:
+    """Create a row that displays column numbers.
 
     This function generates a row with column numbers, typically used in
     regression tables.
@@ -270,122 +312,538 @@ def make_row_for_column_numbers(column_count: int) -> str:
         column_count: The total number of columns to label.
 
     Returns:
-        str: A single string representing the formatted LaTeX row.
+        TableRow: A single row with an empty label.
 
     Examples:
-        >>> make_row_for_column_numbers(3)
-        ' & (1) & (2) & (3) \\\\'
+        >>> make_row_for_column_numbers(3).cells
+        ['(1)', '(2)', '(3)']
 
     """
-    return (
-        r" & {} \\"
-        .format(" & ".join(f"({number})"
-                           for number in range(1, column_count + 1))))
+    return TableRow(
+        label="",
+        cells=[f"({number})" for number in range(1, column_count + 1)],
+    )
 
 
-def make_template(
+def iter_section_rows(
+        section_spec: OtherSectionSpec,
+        column_count: int,
+        *,
+        math_mode: bool = True,
+        columns: range | None = None,
+) -> Iterator[TableRow]:
+    """Generate the rows of a section one at a time.
+
+    Args:
+        section_spec: The validated section spec of the header, the
+            body, or the footer.
+        column_count: The total number of columns in the table.
+        math_mode: Whether to typeset regression estimates in TeX math
+            mode.
+        columns: The numbers of the columns to include, starting at 1.
+            Defaults to every column.  The other columns are dropped
+            from every row, but the included columns keep their numbers
+            in the paths.
+
+    Yields:
+        TableRow: The rows of the cell specs, then those of the row
+            specs.
+
+    """
+    for cell in section_spec.cell_specs:
+        for row in make_rows_for_cell_spec(
+            cell, column_count, math_mode=math_mode,
+        ):
+            yield select_columns(row, columns)
+
+    for row_spec in section_spec.row_specs:
+        for row in make_rows_for_row_spec(row_spec, column_count):
+            yield select_columns(row, columns)
+
+
+def select_columns(row: TableRow, columns: range | None) -> TableRow:
+    """Drop the cells of a row that are not in `columns`.
+
+    Examples:
+        >>> select_columns(TableRow("", ["a", "b", "c"]), range(2, 4)).cells
+        ['b', 'c']
+
+    """
+    if columns is None:
+        return row
+
+    return dcls.replace(
+        row, cells=row.cells[columns.start - 1:columns.stop - 1],
+    )
+
+
+def iter_table_sections(
         table_spec: TableSpec,
-        json_filenames: list[str],
-        title: str | None,
-        label: str | None) -> str:
-    """Assemble the complete LaTeX table structure from a spec.
+        column_count: int,
+        *,
+        math_mode: bool = True,
+        columns: range | None = None,
+) -> tuple[list[TableRow], Iterator[TableRow], list[TableRow]]:
+    """Generate the rows of the sections, with those of the body lazily.
+
+    The header and the footer are short, but the body may have tens of
+    thousands of rows, so its rows are generated as they are used.
 
     Args:
         table_spec: The validated TableSpec object that describes the
             layout.
-        json_filenames: List of paths to JSON files used for getting the
-            column count.
-        title: Optional caption text for the table.
-        label: Optional LaTeX label for referencing the table.
+        column_count: The total number of columns in the table.
+        math_mode: Whether to typeset regression estimates in TeX math
+            mode.
+        columns: The numbers of the columns to include, starting at 1.
+            Defaults to every column.  The other columns are dropped
+            from every row, but the included columns keep their numbers
+            in the paths and in the row of column numbers.
 
     Returns:
-        str: A complete LaTeX string representing the configured table,
-            including surrounding environments if applicable.
+        tuple[list[TableRow], Iterator[TableRow], list[TableRow]]: The
+            rows of the header, the body, and the footer.
 
     """
-    column_count = get_column_count(table_spec) or len(json_filenames)
-    add_table_env = title is not None or label is not None
+    header_rows, footer_rows = (
+        list(iter_section_rows(
+            section_spec,
+            column_count,
+            math_mode=math_mode,
+            columns=columns,
+        ))
+        for section_spec in (table_spec.header_spec, table_spec.footer_spec)
+    )
+
+    if table_spec.header_spec.add_column_numbers:
+        header_rows.append(
+            select_columns(make_row_for_column_numbers(column_count), columns),
+        )
+
+    body_rows = iter_section_rows(
+        table_spec.body_spec,
+        column_count,
+        math_mode=math_mode,
+        columns=columns,
+    )
+
+    return header_rows, body_rows, footer_rows
 
-    lines = []
+
+def make_table_sections(
+        table_spec: TableSpec,
+        column_count: int,
+        *,
+        math_mode: bool = True,
+        columns: range | None = None,
+) -> tuple[list[TableRow], list[TableRow], list[TableRow]]:
+    """Generate the rows of the header, the body, and the footer.
+
+    This is `iter_table_sections` with the rows of the body in a list.
+
+    Returns:
+        tuple[list[TableRow], list[TableRow], list[TableRow]]: The rows
+            of the header, the body, and the footer.
+
+    """
+    header_rows, body_rows, footer_rows = iter_table_sections(
+        table_spec, column_count, math_mode=math_mode, columns=columns,
+    )
+
+    return header_rows, list(body_rows), footer_rows
+
+
+def format_tex_row(row: TableRow) -> str:
+    r"""Format a row of a LaTeX table.
+
+    Examples:
+        >>> format_tex_row(TableRow("", ["(1)", "(2)"]))
+        ' & (1) & (2) \\\\'
+        >>> format_tex_row(TableRow("A & B", ["a"], TeXLength("1em")))
+        'A \\& B & a \\\\[1em]'
+
+    """
+    line = " & ".join(
+        escape_literals(value, escape_tex)
+        for value in [row.label, *row.cells]
+    ) + r" \\"
+
+    if row.padding_bottom is not None:
+        line += f"[{row.padding_bottom}]"
+
+    return line
+
+
+def iter_tex_template_lines(
+        table_spec: TableSpec,
+        column_count: int,
+        title: str | None,
+        label: str | None,
+        columns: range | None = None) -> Iterator[str]:
+    """Generate the lines of a LaTeX table from a spec.
+
+    A title or a label puts the tabular environment inside the table
+    and threeparttable environments.
+
+    """
+    header_rows, body_rows, footer_rows = iter_table_sections(
+        table_spec, column_count, columns=columns,
+    )
+    width = column_count if columns is None else len(columns)
+    add_table_env = title is not None or label is not None
 
     # Add \begin{table} etc. if a title or a label was specified on the
     # command line.
     #
     if add_table_env:
-        lines.append(r"\begin{table}[!htb]")
-        lines.append(
+        yield r"\begin{table}[!htb]"
+        yield (
             r"\begin{adjustbox}{"
             r"max width=\textwidth, "
             r"max height=\textheight, "
             "center"
             "}"
         )
-        lines.append(r"\begin{threeparttable}")
-        lines.append(r"\centering")
-        lines.append(r"\caption{%s}" % (title or ""))
+        yield r"\begin{threeparttable}"
+        yield r"\centering"
+        yield r"\caption{%s}" % (title or "")
 
-    lines.append(r"\begin{tabular}{l%s}" % ("c" * column_count))
-    lines.append(r"\toprule")
+    yield r"\begin{tabular}{l%s}" % ("c" * width)
+    yield r"\toprule"
 
-    # Add header.
-    #
+    yield from (format_tex_row(row) for row in header_rows)
 
-    for cell in table_spec.header_spec.cell_specs:
-        lines.extend(
-            make_rows_for_cell_spec(cell, column_count))
+    yield r"\midrule"
 
-    for row in table_spec.header_spec.row_specs:
-        lines.extend(
-            make_rows_for_row_spec(row, column_count))
+    yield from (format_tex_row(row) for row in body_rows)
 
-    if table_spec.header_spec.add_column_numbers:
-        lines.append(
-            make_row_for_column_numbers(column_count))
+    if len(footer_rows) > 0:
+        yield r"\midrule"
+
+    yield from (format_tex_row(row) for row in footer_rows)
 
-    lines.append(r"\midrule")
+    yield r"\bottomrule"
+    yield r"\end{tabular}"
 
-    # Add body.
+    # Add \end{table} etc. if a title or a label was specified on the
+    # command line.
     #
+    if add_table_env:
+        yield r"\label{%s}" % (label or "")
+        yield r"\begin{tablenotes}"
+        yield r"\item {\em Notes:}"
+        yield r"\end{tablenotes}"
+        yield r"\end{threeparttable}"
+        yield r"\end{adjustbox}"
+        yield r"\end{table}"
+
 
-    for cell in table_spec.body_spec.cell_specs:
-        lines.extend(
-            make_rows_for_cell_spec(cell, column_count))
+def iter_longtable_template_lines(
+        table_spec: TableSpec,
+        column_count: int,
+        title: str | None,
+        label: str | None,
+        columns: range | None = None) -> Iterator[str]:
+    r"""Generate the lines of a LaTeX longtable from a spec.
 
-    for row in table_spec.body_spec.row_specs:
-        lines.extend(
-            make_rows_for_row_spec(row, column_count))
+    A longtable breaks across pages, and the header is repeated at the
+    top of every page.  The title and the label go into the caption of
+    the longtable, which can't be inside a table environment, so there
+    is no table, adjustbox, or threeparttable environment around it.
+    The longtable package must be loaded in the preamble.
 
-    # Add footer.
-    #
+    Examples:
+        >>> spec = TableSpec()
+        >>> spec.body_spec.row_specs.append(RowSpec(cell=["a"]))
+        >>> print("\n".join(
+        ...     iter_longtable_template_lines(spec, 1, "Results", "tab:a"),
+        ... ))
+        \begin{longtable}{lc}
+        \caption{Results}\label{tab:a} \\
+        \toprule
+        \midrule
+        \endfirsthead
+        \toprule
+        \midrule
+        \endhead
+        \bottomrule
+        \endfoot
+         & a \\
+        \end{longtable}
 
-    if (len(table_spec.footer_spec.cell_specs) > 0
-        or len(table_spec.footer_spec.row_specs) > 0):
-        lines.append(r"\midrule")
+    """
+    header_rows, body_rows, footer_rows = iter_table_sections(
+        table_spec, column_count, columns=columns,
+    )
+    width = column_count if columns is None else len(columns)
 
-    for cell in table_spec.footer_spec.cell_specs:
-        lines.extend(
-            make_rows_for_cell_spec(cell, column_count))
+    yield r"\begin{longtable}{l%s}" % ("c" * width)
 
-    for row in table_spec.footer_spec.row_specs:
-        lines.extend(
-            make_rows_for_row_spec(row, column_count))
+    if title is not None or label is not None:
+        caption = r"\caption{%s}" % (title or "")
 
-    lines.append(r"\bottomrule")
-    lines.append(r"\end{tabular}")
+        if label is not None:
+            caption += r"\label{%s}" % label
 
-    # Add \end{table} etc. if a title or a label was specified on the
-    # command line.
+        yield caption + r" \\"
+
+    # NOTE The header is given twice: once for the first page, and once
+    # for the pages after it.  The rule at the bottom is added on every
+    # page, including the last one.
     #
-    if add_table_env:
-        lines.append(r"\label{%s}" % (label or ""))
-        lines.append(r"\begin{tablenotes}")
-        lines.append(r"\item {\em Notes:}")
-        lines.append(r"\end{tablenotes}")
-        lines.append(r"\end{threeparttable}")
-        lines.append(r"\end{adjustbox}")
-        lines.append(r"\end{table}")
+    for end_of_header in (r"\endfirsthead", r"\endhead"):
+        yield r"\toprule"
+        yield from (format_tex_row(row) for row in header_rows)
+        yield r"\midrule"
+        yield end_of_header
+
+    yield r"\bottomrule"
+    yield r"\endfoot"
+
+    yield from (format_tex_row(row) for row in body_rows)
+
+    if len(footer_rows) > 0:
+        yield r"\midrule"
+
+    yield from (format_tex_row(row) for row in footer_rows)
+
+    yield r"\end{longtable}"
+
+
+def format_markdown_row(row: TableRow) -> str:
+    """Format a row of a Markdown table.
+
+    Examples:
+        >>> format_markdown_row(TableRow("N", ["%(1::nobs)d", "a|b"]))
+        '| N | %(1::nobs)d | a\\\\|b |'
+
+    """
+    return "| {} |".format(" | ".join(
+        escape_literals(value, escape_markdown)
+        for value in [row.label, *row.cells]
+    ))
+
+
+def iter_markdown_template_lines(
+        table_spec: TableSpec,
+        column_count: int,
+        title: str | None,
+        label: str | None,  # noqa: ARG001
+        columns: range | None = None) -> Iterator[str]:
+    """Generate the lines of a Markdown table from a spec.
+
+    The first row of the header becomes the header of the Markdown
+    table, and the other rows follow it.  Markdown tables have no
+    horizontal rules, so the sections are not separated.  The title is
+    added above the table in bold, and the label is not used.
+
+    """
+    header_rows, body_rows, footer_rows = iter_table_sections(
+        table_spec, column_count, math_mode=False, columns=columns,
+    )
+    width = column_count if columns is None else len(columns)
+
+    if len(header_rows) == 0:
+        header_rows = [TableRow(label="", cells=[""] * width)]
+
+    if title is not None:
+        yield f"**{escape_literals(title, escape_markdown)}**"
+        yield ""
+
+    yield format_markdown_row(header_rows[0])
+    yield "|:--" + "|:-:" * width + "|"
 
-    return "\n".join(lines)
+    for rows in (header_rows[1:], body_rows, footer_rows):
+        yield from (format_markdown_row(row) for row in rows)
+
+
+def format_html_row(row: TableRow, cell_tag: str) -> str:
+    """Format a row of an HTML table.
+
+    Examples:
+        >>> format_html_row(TableRow("N", ["%(1::nobs)d"]), "td")
+        '<tr><td>N</td><td>%(1::nobs)d</td></tr>'
+
+    """
+    return "<tr>{}</tr>".format("".join(
+        f"<{cell_tag}>{escape_literals(value, escape_html)}</{cell_tag}>"
+        for value in [row.label, *row.cells]
+    ))
+
+
+def iter_html_template_lines(
+        table_spec: TableSpec,
+        column_count: int,
+        title: str | None,
+        label: str | None,
+        columns: range | None = None) -> Iterator[str]:
+    """Generate the lines of an HTML table from a spec.
+
+    The header, the body, and the footer go into the thead, tbody, and
+    tfoot elements.  The title becomes the caption of the table, and
+    the label becomes its id.
+
+    """
+    header_rows, body_rows, footer_rows = iter_table_sections(
+        table_spec, column_count, math_mode=False, columns=columns,
+    )
+
+    if label is None:
+        yield "<table>"
+    else:
+        yield f'<table id="{escape_literals(label, escape_html)}">'
+
+    if title is not None:
+        yield f"<caption>{escape_literals(title, escape_html)}</caption>"
+
+    for element, rows, cell_tag in (("thead", header_rows, "th"),
+                                    ("tbody", body_rows, "td"),
+                                    ("tfoot", footer_rows, "td")):
+        # NOTE The rows of the body are generated lazily, so an empty
+        # section is only known once its first row is missing.
+        #
+        rows = iter(rows)
+        first_row = next(rows, None)
+
+        if first_row is not None:
+            yield f"<{element}>"
+            yield format_html_row(first_row, cell_tag)
+            yield from (format_html_row(row, cell_tag) for row in rows)
+            yield f"</{element}>"
+
+    yield "</table>"
+
+
+def format_csv_row(row: TableRow) -> str:
+    """Format a row of a CSV table.
+
+    Every field is quoted, so numbers with commas as thousands
+    separators stay in a single field.
+
+    Examples:
+        >>> format_csv_row(TableRow("N", ["%(1::nobs)d"]))
+        '"N","%(1::nobs)d"'
+
+    """
+    return ",".join(
+        f'"{escape_literals(value, escape_csv)}"'
+        for value in [row.label, *row.cells]
+    )
+
+
+def iter_csv_template_lines(
+        table_spec: TableSpec,
+        column_count: int,
+        title: str | None,  # noqa: ARG001
+        label: str | None,  # noqa: ARG001
+        columns: range | None = None) -> Iterator[str]:
+    """Generate the lines of a CSV table from a spec.
+
+    The rows of the header, the body, and the footer follow each other.
+    The title and the label are not used.
+
+    """
+    header_rows, body_rows, footer_rows = iter_table_sections(
+        table_spec, column_count, math_mode=False, columns=columns,
+    )
+
+    for rows in (header_rows, body_rows, footer_rows):
+        yield from (format_csv_row(row) for row in rows)
+
+
+TEMPLATE_LINE_MAKERS = {
+    "tex": iter_tex_template_lines,
+    "longtable": iter_longtable_template_lines,
+    "markdown": iter_markdown_template_lines,
+    "html": iter_html_template_lines,
+    "csv": iter_csv_template_lines,
+}
+
+
+def iter_template_lines(
+        table_spec: TableSpec,
+        json_filenames: list[str],
+        title: str | None,
+        label: str | None,
+        table_format: str = "tex",
+        columns: range | None = None) -> Iterator[str]:
+    """Generate the lines of the complete table structure from a spec.
+
+    The arguments are checked right away, but the lines are generated
+    as they are consumed, so a table with many rows is never held in
+    memory as a whole.  A line is a complete row, so no conversion
+    specifier is split across lines.
+
+    Args:
+        table_spec: The validated TableSpec object that describes the
+            layout.
+        json_filenames: List of paths to JSON files used for getting the
+            column count.
+        title: Optional caption text for the table.
+        label: Optional label for referencing the table.
+        table_format: The output format, one of `TABLE_FORMATS`.
+        columns: The numbers of the columns to include, starting at 1.
+            Defaults to every column.
+
+    Returns:
+        Iterator[str]: The lines of a complete table in the requested
+            format, without line breaks.
+
+    Raises:
+        ValueError: If the output format is not supported, or if
+            `columns` is empty or not within the columns of the table.
+
+    """
+    if table_format not in TEMPLATE_LINE_MAKERS:
+        msg = (
+            f"Output format '{table_format}' is not one of "
+            f"{', '.join(TABLE_FORMATS)}."
+        )
+        raise ValueError(msg)
+
+    column_count = get_column_count(table_spec) or len(json_filenames)
+
+    if columns is not None and (
+        len(columns) == 0
+        or columns.step != 1
+        or columns.start < 1
+        or columns.stop > column_count + 1
+    ):
+        msg = (
+            f"Columns {columns.start} to {columns.stop - 1} are not "
+            f"within the {column_count} columns of the table."
+        )
+        raise ValueError(msg)
+
+    return TEMPLATE_LINE_MAKERS[table_format](
+        table_spec, column_count, title, label, columns,
+    )
+
+
+def make_template(
+        table_spec: TableSpec,
+        json_filenames: list[str],
+        title: str | None,
+        label: str | None,
+        table_format: str = "tex",
+        columns: range | None = None) -> str:
+    """Assemble the complete table structure from a spec.
+
+    This joins the lines from `iter_template_lines`, which takes the
+    same arguments.
+
+    Returns:
+        str: A complete table in the requested format, including
+            surrounding environments if applicable.
+
+    Raises:
+        ValueError: If the output format is not supported, or if
+            `columns` is empty or not within the columns of the table.
+
+    """
+    return "\n".join(iter_template_lines(
+        table_spec, json_filenames, title, label, table_format, columns,
+    ))
 
 
 def fill_template(
@@ -393,14 +851,24 @@ def fill_template(
     json_dict: dict,
     *,
     ignore_missing_keys: bool = False,
+    thousands_separator: str | None = None,
+    escape: Callable[[str], str] | None = None,
 ) -> str:
     """Substitute paths in the template with data from the JSON files.
 
+    The template is compiled with `compile_template` first.  Use
+    `compile_template` directly to fill the same template many times.
+
     Args:
         template: The LaTeX template string.
         json_dict: A dict mapping paths to values.
         ignore_missing_keys: When encountering missing paths, print
             warnings if True, and raise ValueError if False.
+        thousands_separator: If not None, insert this separator between
+            groups of thousands in numbers from `json_dict`.
+        escape: If not None, a function that escapes each filled value
+            for the output format, e.g., one of `VALUE_ESCAPES` in
+            `tomltable.compiled`.
 
     Returns:
         str: The input template with all paths replaced by values from
@@ -420,48 +888,149 @@ def fill_template(
         >>> json_dict["2::age"] = 39
         >>> fill_template(template, json_dict)
         'Alice is 42 years old. Bob is 39.'
+        >>> fill_template(
+        ...     "%(n)d obs. in 2019", {"n": 31556926}, thousands_separator=",",
+        ... )
+        '31,556,926 obs. in 2019'
 
     """
-    def replace(
-        match: regex.Match, # ty: ignore[invalid-type-form]
-    ) -> str:
-        specifier = match.group(0)[len(match.group(1)):]
+    return compile_template(template).fill(
+        json_dict,
+        ignore_missing_keys=ignore_missing_keys,
+        thousands_separator=thousands_separator,
+        escape=escape,
+    )
 
-        # Drop surrounding parentheses.
-        #
-        key = match.group(2)[1:-1]
-
-        if key not in json_dict:
-            msg = (
-                f"Specifier '{specifier}' refers to key '{key}' but "
-                "this key is not in the JSON object."
-            )
-
-            if ignore_missing_keys:
-                print(f"warning: {msg}", file=sys.stderr)
-                return match.group(1)
-            else:
-                raise ValueError(msg)
-
-        try:
-            replacement = specifier % json_dict
-        except TypeError:
-            print(
-                f"warning: '{json_dict[key]}' has the wrong type "
-                f"for specifier '{specifier}'.",
-                file=sys.stderr,
-            )
-            return match.group(1)
-
-        return match.group(1) + replacement
-
-    return regex.sub(
-        (
-            r"(?V1)(^|[^%])%"
-            r"(?P<pat>\([^()]*(?&pat)*[^()]*\))" # Handle nested parens
-                                                 # recursively.
-            r"[-# .0-9]*[dfs]"
-        ),
-        replace,
-        template,
+
+def fill_template_lines(
+    lines: Iterable[str],
+    json_dict: dict,
+    *,
+    ignore_missing_keys: bool = False,
+    thousands_separator: str | None = None,
+    escape: Callable[[str], str] | None = None,
+) -> Iterator[str]:
+    """Fill the lines of a template one at a time.
+
+    Each line is compiled and filled as it passes through, like with
+    `fill_template`, so the filled table is never held in memory as a
+    whole.  No conversion specifier may be split across lines.
+
+    Raises:
+        ValueError: If a path in a line is not found in `json_dict` and
+            `ignore_missing_keys` is False.
+
+    Examples:
+        >>> list(fill_template_lines(
+        ...     ["N | %(1::nobs)d", "R2 | %(1::r2).02f"],
+        ...     {"1::nobs": 1000, "1::r2": 0.5},
+        ...     thousands_separator=",",
+        ... ))
+        ['N | 1,000', 'R2 | 0.50']
+
+    """
+    for line in lines:
+        yield compile_template(line).fill(
+            json_dict,
+            ignore_missing_keys=ignore_missing_keys,
+            thousands_separator=thousands_separator,
+            escape=escape,
+        )
+
+
+def spool_template_lines(lines: Iterable[str]) -> tuple[TextIO, set[str]]:
+    """Write the lines of a template to a temporary file and find the keys.
+
+    This lets the keys be known before the template is filled, without
+    generating the lines twice or keeping them in memory.  Read the
+    lines back with `read_spooled_lines`.
+
+    Returns:
+        tuple[TextIO, set[str]]: The temporary file, at its start, and
+            the paths inside the conversion specifiers.
+
+    Examples:
+        >>> spool, keys = spool_template_lines(["%(1::nobs)d", "", "b"])
+        >>> keys
+        {'1::nobs'}
+        >>> list(read_spooled_lines(spool))
+        ['%(1::nobs)d', '', 'b']
+        >>> spool.close()
+
+    """
+    # NOTE Every line ends with a line break, so that an empty last line
+    # is kept, and only '\n' ends a line when the file is read back.
+    #
+    spool = tempfile.TemporaryFile(
+        "w+", encoding="utf-8", newline="\n",
     )
+    keys = set()
+
+    try:
+        for line in lines:
+            keys.update(find_template_keys(line))
+            spool.write(line)
+            spool.write("\n")
+
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+
+    return spool, keys
+
+
+def read_spooled_lines(spool: TextIO) -> Iterator[str]:
+    """Read back the lines that `spool_template_lines` wrote."""
+    for line in spool:
+        yield line[:-1]
+
+
+def write_lines(file: TextIO, lines: Iterable[str]) -> None:
+    """Write lines to a file as they come, with line breaks between them.
+
+    There is no line break after the last line, so the file gets the
+    same text as from joining the lines.
+
+    Examples:
+        >>> import io
+        >>> file = io.StringIO()
+        >>> write_lines(file, iter(["a", "", "b"]))
+        >>> file.getvalue()
+        'a\\n\\nb'
+
+    """
+    separator = ""
+
+    for line in lines:
+        file.write(separator)
+        file.write(line)
+        separator = "\n"
+
+
+def find_template_keys(template: str) -> set[str]:
+    """Collect the set of paths that are referenced in the template.
+
+    The paths are found in the same way as in `fill_template`, so the
+    result contains exactly the keys that `fill_template` will look up
+    in the dict that it receives.
+
+    Args:
+        template: The LaTeX template string.
+
+    Returns:
+        set[str]: The paths inside the conversion specifiers.
+
+    Examples:
+        >>> template = "%(1::name)s is %(1::age)d years old."
+        >>> template += " %(2::name)s is %(2::age)d."
+        >>> sorted(find_template_keys(template))
+        ['1::age', '1::name', '2::age', '2::name']
+        >>> find_template_keys("%%(1::name)s is escaped.")
+        set()
+
+    """
+    return {
+        placeholder.key
+        for _, _, placeholder in iter_placeholders(template)
+    }
@@ -162,3 +162,70 @@ class TableSpec:
     header_spec: HeaderSpec       = dcls.field(default_factory=HeaderSpec)
     body_spec: OtherSectionSpec   = dcls.field(default_factory=OtherSectionSpec)
     footer_spec: OtherSectionSpec = dcls.field(default_factory=OtherSectionSpec)
+
+
+@dataclass
+class TableRow:
+    """A row of a table, independent of the output format.
+
+    The label and the cells may contain conversion specifiers.  They
+    are not escaped yet: each output format escapes them in its own
+    way.
+
+    Attributes:
+        label: The text in the first column.
+        cells: The text in the remaining columns, one for each column.
+        padding_bottom: Optional vertical spacing below the row (e.g.,
+            "0.5em").  Only LaTeX tables use it.
+
+    """
+
+    label: str
+    cells: list[str]
+    padding_bottom: TeXLength | None = None
+
+
+@dataclass
+class TableJob:
+    """Specification for one table in a batch of tables.
+
+    Exactly one of `spec` and `template` is set.  The remaining fields
+    correspond to the command-line options of `tomltable`.
+
+    Attributes:
+        spec: Path to the TOML table specification.
+        template: Path to a plain or compiled template.
+        json_filenames: Paths to the JSON files, one for each column.
+        csv: Path to a long-format results file to use instead of JSON
+            files.
+        csv_models: The models in `csv` to use as columns, or None for
+            every model.
+        csv_columns: The names of the model, term, statistic, and value
+            columns of `csv`.
+        output: Path to the file that the table is written to.
+        title: Optional caption text for the table.
+        label: Optional LaTeX label for referencing the table.
+        ignore_missing_keys: Whether to ignore keys that are not present
+            in the corresponding JSON file.
+        human_readable_numbers: Whether to add thousands separators to
+            numbers in the table.
+        thousands_separator: The name of the thousands separator in
+            `THOUSANDS_SEPARATORS` (e.g., 'thin-space').  Setting it
+            implies `human_readable_numbers`.
+        table_format: The output format, one of `TABLE_FORMATS`.
+
+    """
+
+    spec: str | None                = None
+    template: str | None            = None
+    json_filenames: list[str]       = dcls.field(default_factory=lambda: [])  # noqa: PIE807
+    csv: str | None                 = None
+    csv_models: list[str] | None    = None
+    csv_columns: tuple[str, ...]    = ("model", "term", "statistic", "value")
+    output: str | None              = None
+    title: str | None               = None
+    label: str | None               = None
+    ignore_missing_keys: bool       = False
+    human_readable_numbers: bool    = False
+    thousands_separator: str | None = None
+    table_format: str               = "tex"
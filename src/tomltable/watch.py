@@ -0,0 +1,349 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from tomltable import (
+    load_json_file,
+    make_json_dict_for_keys,
+)
+from tomltable.compiled import VALUE_ESCAPES, CompiledTemplate, load_template
+from tomltable.incremental import make_fingerprint, write_output
+from tomltable.parser import (
+    confirm_consistent_column_count,
+    load_toml,
+    parse_toml,
+)
+from tomltable.template import make_template
+from tomltable.types import TableSpec
+
+# Constants from <sys/inotify.h>.
+#
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_CLOEXEC = os.O_CLOEXEC if hasattr(os, "O_CLOEXEC") else 0
+
+INOTIFY_EVENT = struct.Struct("iIII")
+
+DEBOUNCE_SECONDS = 0.02
+POLL_INTERVAL_SECONDS = 0.1
+
+
+class PollingMonitor:
+    """Detect changes to files by polling their status.
+
+    A file is considered changed if its modification time, its size, or
+    its inode changes, or if it is created or removed.
+
+    Attributes:
+        paths: The resolved paths of the files to watch.
+        interval: The number of seconds between polls.
+
+    """
+
+    def __init__(
+        self,
+        paths: list[str],
+        interval: float = POLL_INTERVAL_SECONDS,
+    ) -> None:
+        self.paths = {str(Path(path).resolve()) for path in paths}
+        self.interval = interval
+        self.signatures = {
+            path: self.signature(path) for path in self.paths
+        }
+
+    @staticmethod
+    def signature(path: str) -> tuple[int, int, int] | None:
+        try:
+            stat = Path(path).stat()
+        except OSError:
+            return None
+
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def wait(self) -> set[str]:
+        """Block until at least one file changes.
+
+        Returns:
+            set[str]: The resolved paths of the changed files.
+
+        """
+        while True:
+            changed = set()
+
+            for path in self.paths:
+                signature = self.signature(path)
+
+                if signature != self.signatures[path]:
+                    self.signatures[path] = signature
+                    changed.add(path)
+
+            if len(changed) > 0:
+                return changed
+
+            time.sleep(self.interval)
+
+
+class InotifyMonitor:
+    """Detect changes to files with the Linux inotify API.
+
+    The directories that contain the files are watched rather than the
+    files themselves, so files that editors replace by renaming a new
+    file over them are still detected.
+
+    Attributes:
+        paths: The resolved paths of the files to watch.
+
+    """
+
+    def __init__(self, paths: list[str]) -> None:
+        self.paths = {str(Path(path).resolve()) for path in paths}
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+
+        self.file_descriptor = libc.inotify_init1(IN_CLOEXEC)
+
+        if self.file_descriptor < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.directories = {}
+
+        for directory in {str(Path(path).parent) for path in self.paths}:
+            watch_descriptor = libc.inotify_add_watch(
+                self.file_descriptor,
+                os.fsencode(directory),
+                IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE,
+            )
+
+            if watch_descriptor < 0:
+                os.close(self.file_descriptor)
+                raise OSError(
+                    ctypes.get_errno(), "inotify_add_watch failed",
+                )
+
+            self.directories[watch_descriptor] = directory
+
+    def read_events(self) -> set[str]:
+        data = os.read(self.file_descriptor, 64 * 1024)
+        changed = set()
+        offset = 0
+
+        while offset < len(data):
+            watch_descriptor, _, _, length = (
+                INOTIFY_EVENT.unpack_from(data, offset)
+            )
+            offset += INOTIFY_EVENT.size
+
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            path = str(
+                Path(self.directories.get(watch_descriptor, "")) / name,
+            )
+
+            if path in self.paths:
+                changed.add(path)
+
+        return changed
+
+    def wait(self) -> set[str]:
+        """Block until at least one file changes.
+
+        Events that arrive shortly after the first one are collected
+        too, so that a save that touches a file several times triggers
+        only one update.
+
+        Returns:
+            set[str]: The resolved paths of the changed files.
+
+        """
+        changed = set()
+
+        while len(changed) == 0:
+            changed |= self.read_events()
+
+        while select.select(
+            [self.file_descriptor], [], [], DEBOUNCE_SECONDS,
+        )[0]:
+            changed |= self.read_events()
+
+        return changed
+
+
+def make_monitor(paths: list[str]) -> InotifyMonitor | PollingMonitor:
+    """Create an inotify monitor if possible, or a polling one otherwise."""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyMonitor(paths)
+        except (OSError, AttributeError, TypeError):
+            pass
+
+    return PollingMonitor(paths)
+
+
+class WatchedTable:
+    """A table whose inputs are kept in memory between updates.
+
+    When the table specification changes, only the specification is
+    parsed again and the template is regenerated.  When a JSON file
+    changes, only that file is loaded again.
+
+    Attributes:
+        spec_filename: Path to the table specification or template.
+        json_filenames: Paths to the JSON files.
+        output: Path to the output file.
+        options: The options of `tomltable.main` that affect the output.
+        spec_text: The content of the specification file.
+        table_spec: The parsed table specification, or None if the
+            specification file is a template.
+        compiled_template: The compiled template.
+        json_files: A dict mapping filenames to loaded JSON files.
+
+    """
+
+    def __init__(
+        self,
+        spec_filename: str,
+        json_filenames: list[str],
+        output: str,
+        options: dict[str, Any],
+    ) -> None:
+        self.spec_filename = spec_filename
+        self.json_filenames = json_filenames
+        self.output = output
+        self.options = options
+
+        self.spec_text = ""
+        self.table_spec: TableSpec | None = None
+        self.compiled_template: CompiledTemplate | None = None
+        self.json_files: dict[str, Any] = {}
+
+    def reload_spec(self) -> None:
+        self.spec_text = Path(self.spec_filename).read_text()
+
+        if self.options["from_template"]:
+            self.table_spec = None
+            self.compiled_template = load_template(self.spec_text)
+            return
+
+        self.table_spec = parse_toml(load_toml(self.spec_text))
+
+        confirm_consistent_column_count(
+            self.table_spec, self.json_filenames,
+        )
+
+        self.compiled_template = load_template(
+            make_template(
+                self.table_spec,
+                self.json_filenames,
+                self.options["title"],
+                self.options["label"],
+                self.options["table_format"],
+            ),
+        )
+
+    def reload_json_file(self, filename: str) -> None:
+        self.json_files[filename] = load_json_file(filename)
+
+    def render(self) -> bool:
+        """Fill the template and write the output if it changed.
+
+        Returns:
+            bool: True if the output file was written.
+
+        """
+        json_dict = make_json_dict_for_keys(
+            [self.json_files[filename]
+             for filename in self.json_filenames],
+            self.compiled_template.keys,
+        )
+
+        result = self.compiled_template.fill(
+            json_dict,
+            ignore_missing_keys=self.options["ignore_missing_keys"],
+            thousands_separator=self.options["thousands_separator"],
+            escape=VALUE_ESCAPES.get(self.options["table_format"]),
+        )
+
+        fingerprint = make_fingerprint(
+            self.spec_text, self.json_filenames, self.options,
+        )
+
+        return write_output(self.output, result, fingerprint)
+
+    def update(self, changed: set[str] | None = None) -> bool:
+        """Reload the changed inputs and render the table.
+
+        Args:
+            changed: The resolved paths of the changed files, or None
+                to reload everything.
+
+        Returns:
+            bool: True if the output file was written.
+
+        """
+        def is_changed(filename: str) -> bool:
+            return (
+                changed is None
+                or str(Path(filename).resolve()) in changed
+            )
+
+        if is_changed(self.spec_filename):
+            self.reload_spec()
+
+        for filename in set(self.json_filenames):
+            if is_changed(filename):
+                self.reload_json_file(filename)
+
+        return self.render()
+
+
+def watch_table(table: WatchedTable) -> None:
+    """Render a table and render it again whenever its inputs change.
+
+    Errors are reported on stderr without stopping the watch, so that
+    saving an incomplete specification doesn't end it.  The function
+    returns on a keyboard interrupt.
+
+    """
+    monitor = make_monitor([table.spec_filename, *table.json_filenames])
+    changed = None
+
+    try:
+        while True:
+            start = time.perf_counter()
+
+            try:
+                written = table.update(changed)
+            except Exception as error:  # noqa: BLE001
+                print(
+                    f"error: {type(error).__name__}: {error}",
+                    file=sys.stderr,
+                )
+                reload_all = True
+            else:
+                elapsed = (time.perf_counter() - start) * 1000
+                status = "updated" if written else "unchanged"
+
+                print(
+                    f"{table.output}: {status} in {elapsed:.0f} ms",
+                    file=sys.stderr,
+                )
+                reload_all = False
+
+            changed = monitor.wait()
+
+            if reload_all:
+                # The failed update may have left some inputs out of
+                # date, so reload everything.
+                #
+                changed = None
+    except KeyboardInterrupt:
+        pass
@@ -1,12 +1,59 @@
+import asyncio
 import contextlib
+import csv
 import io
+import json
+import marshal
+import math
+import multiprocessing
+import os
 import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
 
-import toml
+from click.testing import CliRunner
 
 import tomltable as m
+import tomltable.batch
+import tomltable.jsondecode
+from tomltable.cache import JsonCache, TemplateCache
+from tomltable.client import is_private_socket, render_remotely
+from tomltable.compiled import (
+    RenderWarning,
+    compile_template,
+    load_template,
+    loads_compiled_template,
+)
+from tomltable.jsonlines import (
+    JsonLinesReader,
+    parse_condition,
+    parse_line_ranges,
+)
+from tomltable.jsonstream import (
+    JsonStreamReader,
+    make_json_dict_streaming,
+)
+from tomltable.longformat import load_long_results
+from tomltable.errors import TableJsonMismatchError
+from tomltable.parallel import map_distinct_files
+from tomltable.parser import load_toml, parse_toml
+from tomltable.renderer import (
+    AsyncJsonLoader,
+    Renderer,
+    render_async,
+    render_batch_async,
+)
+from tomltable.server import WarmInputs, bind_socket, handle_connection
 from tomltable.types import TableSpec
+from tomltable.watch import InotifyMonitor, PollingMonitor, WatchedTable
 
 
 class TestAddThousandsSeparator(unittest.TestCase):
@@ -32,7 +79,7 @@ class TestAddThousandsSeparator(unittest.TestCase):
 
 class TestMakeTemplate(unittest.TestCase):
     def setUp(self):
-        self.spec_only_body = toml.loads(
+        self.spec_only_body = load_toml(
             """
 [[body.cell]]
 label = "Foo"
@@ -44,7 +91,7 @@ coef = "bar"
 """
         )
 
-        self.spec_body_and_footer_cell = toml.loads(
+        self.spec_body_and_footer_cell = load_toml(
             """
 [[body.cell]]
 label = "Foo"
@@ -60,7 +107,7 @@ cell = ["%(n::obs)d"]
 """
         )
 
-        self.spec_body_and_footer_row = toml.loads(
+        self.spec_body_and_footer_row = load_toml(
             """
 [[body.cell]]
 label = "Foo"
@@ -76,7 +123,7 @@ cell = ["", "YES", "YES"]
 """
         )
 
-        self.spec_without_column_numbers = toml.loads(
+        self.spec_without_column_numbers = load_toml(
             """
 [[body.cell]]
 label = "Foo"
@@ -84,7 +131,7 @@ coef = "foo"
 """
         )
 
-        self.spec_with_column_numbers = toml.loads(
+        self.spec_with_column_numbers = load_toml(
             """
 [header]
 add-column-numbers = true
@@ -95,7 +142,7 @@ coef = "foo"
 """
         )
 
-        self.spec_full = toml.loads(
+        self.spec_full = load_toml(
             """
 [[header.row]]
 cell = ["Lorem", "Ipsum", "Dolor"]
@@ -122,7 +169,7 @@ cell = ["", "YES", "YES"]
 """
         )
 
-        self.spec_full_with_single_column = toml.loads(
+        self.spec_full_with_single_column = load_toml(
             """
 [[header.row]]
 cell = "Lorem"
@@ -248,6 +295,30 @@ cell = "YES"
                 ),
             )
 
+    def test_columns_keep_their_numbers(self):
+        template = m.make_template(
+            table_spec=m.parse_toml(self.spec_full),
+            json_filenames=["a", "b", "c"],
+            title=None,
+            label=None,
+            columns=range(2, 4),
+        )
+
+        self.assertIn(r"\begin{tabular}{lcc}", template)
+        self.assertIn(" & Ipsum & Dolor \\\\", template)
+        self.assertIn(" & YES & YES \\\\", template)
+        self.assertIn("%(2::obs)d & %(3::obs)d", template)
+        self.assertNotIn("%(1::", template)
+
+        with self.assertRaises(ValueError):
+            m.make_template(
+                table_spec=m.parse_toml(self.spec_full),
+                json_filenames=["a", "b", "c"],
+                title=None,
+                label=None,
+                columns=range(3, 5),
+            )
+
     def test_every_row_has_as_many_cells_as_there_are_columns(self):
         def get_column_count(template):
             match = re.search(r"\\begin{tabular}{l(c+)}", template)
@@ -326,6 +397,116 @@ cell = "YES"
             all(re.match(r"^ *& *\(1\)", line) is None
                 for line in template.splitlines()))
 
+    def test_other_formats_have_the_same_cells(self):
+        table_spec = m.parse_toml(self.spec_full)
+        expected_cells = [
+            ["", "Lorem", "Ipsum", "Dolor"],
+            ["", "", "", "Sit Amet"],
+            ["Foo"] + [
+                f"%({n}::coef::foo::est).03f%({n}::coef::foo::stars)s"
+                for n in (1, 2, 3)
+            ],
+            [""] + [f"(%({n}::coef::foo::se).04f)" for n in (1, 2, 3)],
+            ["Bar"] + [
+                f"%({n}::coef::bar::est).03f%({n}::coef::bar::stars)s"
+                for n in (1, 2, 3)
+            ],
+            [""] + [f"(%({n}::coef::bar::se).04f)" for n in (1, 2, 3)],
+            ["$N$", "%(1::obs)d", "%(2::obs)d", "%(3::obs)d"],
+            ["unit FE", "", "YES", "YES"],
+        ]
+
+        markdown = m.make_template(
+            table_spec, ["a", "b", "c"], None, None, "markdown",
+        ).splitlines()
+        html_rows = re.findall(
+            "<tr>(.*)</tr>",
+            m.make_template(table_spec, ["a", "b", "c"], None, None, "html"),
+        )
+        csv_rows = m.make_template(
+            table_spec, ["a", "b", "c"], None, None, "csv",
+        ).splitlines()
+
+        self.assertEqual(
+            expected_cells,
+            [
+                line[2:-2].split(" | ")
+                for line in [markdown[0], *markdown[2:]]
+            ],
+        )
+        self.assertEqual(
+            expected_cells,
+            [re.findall("<t[hd]>(.*?)</t[hd]>", row) for row in html_rows],
+        )
+        self.assertEqual(
+            expected_cells,
+            [row[1:-1].split('","') for row in csv_rows],
+        )
+
+    def test_literals_are_escaped_but_specifiers_are_not(self):
+        table_spec = m.parse_toml(load_toml(
+            """
+[[body.row]]
+label = 'a | "b" & <c>'
+cell = ["%(1::x<y)s"]
+"""
+        ))
+
+        for table_format, expected in (
+            ("tex", 'a | "b" \\& <c> & %(1::x<y)s \\\\'),
+            ("markdown", '| a \\| "b" & <c> | %(1::x<y)s |'),
+            ("html",
+             "<tr><td>a | &quot;b&quot; &amp; &lt;c&gt;</td>"
+             "<td>%(1::x<y)s</td></tr>"),
+            ("csv", '"a | ""b"" & <c>","%(1::x<y)s"'),
+        ):
+            self.assertIn(
+                expected,
+                m.make_template(table_spec, ["a"], None, None, table_format),
+            )
+
+    def test_longtable_repeats_the_header_on_every_page(self):
+        lines = m.make_template(
+            m.parse_toml(self.spec_full),
+            ["a", "b", "c"],
+            "Results",
+            "tab:results",
+            "longtable",
+        ).splitlines()
+        header = [" & Lorem & Ipsum & Dolor \\\\", r"\midrule"]
+
+        self.assertEqual(r"\begin{longtable}{lccc}", lines[0])
+        self.assertEqual(
+            r"\caption{Results}\label{tab:results} \\", lines[1],
+        )
+        self.assertEqual(2, lines.count(header[0]))
+        self.assertEqual(
+            [r"\endfirsthead", r"\endhead", r"\endfoot"],
+            [line for line in lines if line.startswith(r"\end") and
+             line != r"\end{longtable}"],
+        )
+        self.assertNotIn(r"\begin{table}[!htb]", lines)
+        self.assertEqual(r"\end{longtable}", lines[-1])
+
+    def test_template_lines_are_generated_lazily(self):
+        table_spec = m.parse_toml(self.spec_full)
+
+        with patch(
+            "tomltable.template.make_rows_for_cell_spec",
+            wraps=tomltable.template.make_rows_for_cell_spec,
+        ) as make_rows:
+            lines = tomltable.template.iter_template_lines(
+                table_spec, ["a", "b", "c"], None, None,
+            )
+
+            self.assertEqual(r"\begin{tabular}{lccc}", next(lines))
+            self.assertEqual(1, make_rows.call_count)
+
+            self.assertEqual(
+                m.make_template(table_spec, ["a", "b", "c"], None, None),
+                "\n".join([r"\begin{tabular}{lccc}", *lines]),
+            )
+
 
 class TestFillTemplate(unittest.TestCase):
     def setUp(self):
@@ -442,3 +623,1942 @@ class TestFillTemplate(unittest.TestCase):
 
         with self.assertRaises(ValueError):
             m.fill_template(template, self.json_dict)
+
+    def test_thousands_separator_only_for_numbers_from_json(self):
+        template = r"\label{tab:2019} %(nobs)d %(mean).02f %(id)s"
+        json_dict = {"nobs": 31556926, "mean": 6350.2932, "id": "12345"}
+        expected = r"\label{tab:2019} 31{,}556{,}926 6{,}350.29 12345"
+
+        self.assertEqual(
+            expected,
+            m.fill_template(template, json_dict, thousands_separator="{,}"),
+        )
+
+
+class TestCompiledTemplate(unittest.TestCase):
+    def setUp(self):
+        self.json_dict = {
+            "foo": "bar",
+            "bar::baz": 3.14,
+            "foo::(bar)::baz": 2.72,
+            "baz": None,
+        }
+        self.template = (
+            "%(foo)s %%(foo)s (%(foo::(bar)::baz).03f) %(bar::baz)-8.2f"
+            " %(bar::baz)d %(baz)s"
+        )
+
+    def test_same_result_as_fill_template(self):
+        self.assertEqual(
+            m.fill_template(self.template, self.json_dict),
+            compile_template(self.template).fill(self.json_dict),
+        )
+
+    def test_compiling_is_lossless(self):
+        compiled = compile_template(self.template)
+        parts = [compiled.literals[0]]
+
+        for placeholder, literal in zip(
+            compiled.placeholders, compiled.literals[1:], strict=True,
+        ):
+            parts.extend([placeholder.specifier, literal])
+
+        self.assertEqual(self.template, "".join(parts))
+
+    def test_one_formatter_per_distinct_specifier(self):
+        compiled = compile_template(
+            "%(1::a).03f %(2::a).03f %(1::b)d %(2::b)d",
+        )
+
+        self.assertEqual({"%.03f", "%d"}, set(compiled.formatters))
+
+    def test_serialization_round_trip(self):
+        compiled = compile_template(self.template)
+
+        self.assertEqual(
+            compiled, loads_compiled_template(compiled.dumps()),
+        )
+        self.assertEqual(compiled, load_template(compiled.dumps()))
+        self.assertEqual(compiled, load_template(self.template))
+
+    def test_raises_exception_for_plain_template(self):
+        with self.assertRaises(ValueError):
+            loads_compiled_template(self.template)
+
+    def test_adjacent_specifiers(self):
+        self.assertEqual(
+            "bar3.14",
+            m.fill_template("%(foo)s%(bar::baz).02f", self.json_dict),
+        )
+
+    def test_key_with_several_parenthesized_groups(self):
+        compiled = compile_template("%(1::coef::log(x):log(y)::est).03f")
+
+        self.assertEqual({"1::coef::log(x):log(y)::est"}, compiled.keys)
+
+    def test_unbalanced_parentheses(self):
+        template = "x%(" * 100_000 + "%(foo)s"
+
+        self.assertEqual(
+            "x%(" * 100_000 + "bar",
+            m.fill_template(template, self.json_dict),
+        )
+
+
+class TestTraverse(unittest.TestCase):
+    def test_order_of_paths(self):
+        data = {
+            "a": [1, {"b": 2, "c": []}, [3, [4]]],
+            "d::e": {},
+            "f": {"g": None},
+        }
+
+        self.assertEqual(
+            [
+                ("a::1", 1),
+                ("a::2::b", 2),
+                ("a::3::1", 3),
+                ("a::3::2::1", 4),
+                ("f::g", None),
+            ],
+            list(m.traverse(data)),
+        )
+
+    def test_nesting_deeper_than_recursion_limit(self):
+        depth = sys.getrecursionlimit() * 2
+        data = 42
+
+        for _ in range(depth):
+            data = {"x": data}
+
+        self.assertEqual(
+            [("::".join(["x"] * depth), 42)], list(m.traverse(data)),
+        )
+
+
+class TestMakeJsonDictForKeys(unittest.TestCase):
+    def setUp(self):
+        self.json_files = [
+            {
+                "coef": {
+                    "x": {"est": 1.5, "se": 0.25, "stars": "*"},
+                    "I(x^2)": {"est": -0.5, "se": 0.125, "stars": ""},
+                },
+                "nobs": 1000,
+                "residuals": [0.1, -0.2, 0.3],
+                "empty": {},
+                "missing": None,
+            },
+            {
+                "a::b": {"c": 1},
+                "a": {"b::c": 2},
+            },
+            42,
+        ]
+
+    def test_same_values_as_make_json_dict(self):
+        json_dict = m.make_json_dict(self.json_files)
+
+        self.assertEqual(
+            json_dict,
+            m.make_json_dict_for_keys(self.json_files, set(json_dict)),
+        )
+
+    def test_only_requested_keys(self):
+        self.assertEqual(
+            {"1::nobs": 1000, "1::residuals::2": -0.2, "3": 42},
+            m.make_json_dict_for_keys(
+                self.json_files, {"1::nobs", "1::residuals::2", "3"},
+            ),
+        )
+
+    def test_missing_keys_are_left_out(self):
+        self.assertEqual(
+            {"1::missing": None},
+            m.make_json_dict_for_keys(
+                self.json_files,
+                {
+                    "1::missing",
+                    "1::coef",
+                    "1::empty",
+                    "1::residuals::0",
+                    "1::residuals::01",
+                    "1::residuals::4",
+                    "4::nobs",
+                },
+            ),
+        )
+
+
+class TestMakeJsonDictStreaming(unittest.TestCase):
+    def setUp(self):
+        self.json_files = [
+            {
+                "coef": {
+                    "x": {"est": 1.5, "se": 0.25, "stars": "*\\\""},
+                    "I(x^2)": {"est": -0.5, "se": 0.125, "stars": ""},
+                },
+                "nobs": 1000,
+                "residuals": [[0.1, "]"], {"}": -0.2}, 0.3],
+                "empty": {},
+                "missing": None,
+            },
+            ["a", {"b": [True, False]}],
+            42,
+        ]
+        self.directory = tempfile.TemporaryDirectory()
+        self.json_filenames = []
+
+        for index, json_file in enumerate(self.json_files):
+            filename = Path(self.directory.name) / f"{index}.json"
+            filename.write_text(json.dumps(json_file, indent=2))
+            self.json_filenames.append(str(filename))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_same_values_as_make_json_dict(self):
+        json_dict = m.make_json_dict(self.json_files)
+        keys = set(json_dict) | {"1::coef", "1::residuals::4", "4::x"}
+
+        self.assertEqual(
+            json_dict,
+            make_json_dict_streaming(self.json_filenames, keys),
+        )
+
+    def test_same_values_with_small_chunks(self):
+        json_dict = m.make_json_dict(self.json_files)
+        text = json.dumps(self.json_files[0])
+
+        for chunk_size in range(1, 8):
+            reader = JsonStreamReader(
+                io.StringIO(text), set(json_dict), chunk_size,
+            )
+
+            self.assertEqual(
+                {key: value
+                 for key, value in json_dict.items()
+                 if key.startswith("1::")},
+                reader.read("1"),
+            )
+
+    def test_raises_exception_for_invalid_json(self):
+        for text in ('{"a": 1', '{"a": [1, 2}', '{"a": 1} x', '[1,]'):
+            reader = JsonStreamReader(io.StringIO(text), {"1::a"})
+
+            with self.assertRaises(ValueError):
+                reader.read("1")
+
+
+class TestJsonDecode(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = str(Path(self.directory.name) / "result.json")
+        self.json_file = {
+            "coef": {"x": {"est": 1.5, "se": 0.25, "stars": "*"}},
+            "nobs": 1000,
+            "residuals": [0.1, -0.2, 0.3],
+        }
+        self.decoded_types = []
+
+        Path(self.filename).write_text(json.dumps(self.json_file))
+        self.clear_caches()
+
+    def tearDown(self):
+        self.directory.cleanup()
+        self.clear_caches()
+
+    def clear_caches(self):
+        tomltable.jsondecode.get_backend_decoder.cache_clear()
+        tomltable.jsondecode.resolve_backend.cache_clear()
+        tomltable.jsondecode.get_decoder.cache_clear()
+
+    def make_fake_decoder(self):
+        # A stand-in for orjson that decodes buffers and rejects NaN.
+        #
+        def reject(constant):
+            raise ValueError(constant)
+
+        def decode(data):
+            self.decoded_types.append(type(data))
+
+            return json.loads(bytes(data), parse_constant=reject)
+
+        return decode
+
+    def test_same_content_with_every_backend(self):
+        with patch.dict(
+            tomltable.jsondecode.DECODER_MAKERS,
+            {"orjson": self.make_fake_decoder},
+        ):
+            for backend in ("json", "auto", "orjson"):
+                self.assertEqual(
+                    self.json_file, m.load_json_file(self.filename, backend),
+                )
+
+    def test_large_files_are_memory_mapped(self):
+        with (
+            patch.dict(
+                tomltable.jsondecode.DECODER_MAKERS,
+                {"orjson": self.make_fake_decoder},
+            ),
+            patch.object(tomltable.jsondecode, "MMAP_THRESHOLD", 1),
+        ):
+            self.assertEqual(
+                self.json_file, m.load_json_file(self.filename, "orjson"),
+            )
+
+        self.assertEqual([memoryview], self.decoded_types)
+
+    def test_auto_falls_back_on_rejected_input(self):
+        Path(self.filename).write_text('{"se": NaN}')
+
+        with patch.dict(
+            tomltable.jsondecode.DECODER_MAKERS,
+            {"orjson": self.make_fake_decoder},
+        ):
+            self.assertTrue(
+                math.isnan(m.load_json_file(self.filename, "auto")["se"]),
+            )
+
+            with self.assertRaises(ValueError):
+                m.load_json_file(self.filename, "orjson")
+
+    def test_missing_backend_is_reported(self):
+        def make_missing_decoder():
+            raise ImportError
+
+        with (
+            patch.dict(
+                tomltable.jsondecode.DECODER_MAKERS,
+                {"orjson": make_missing_decoder},
+            ),
+            self.assertRaisesRegex(ValueError, "not installed"),
+        ):
+            m.load_json_file(self.filename, "orjson")
+
+
+class TestJsonLinesReader(unittest.TestCase):
+    def setUp(self):
+        self.lines = [
+            {"model": "ols", "coef": {"x": {"est": 1.5}}, "nobs": 1000},
+            {"model": "iv", "coef": {"x": {"est": 2.5}}, "nobs": 2000},
+            {"model": "ols", "coef": {"x": {"est": 3.5}}, "nobs": 3000},
+            {"model": "ols", "coef": {"x": {"est": 4.5}}},
+        ]
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = str(Path(self.directory.name) / "models.jsonl")
+
+        Path(self.filename).write_text(
+            "\n".join(json.dumps(line) for line in self.lines) + "\n\n",
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_selected_lines(self):
+        for line_ranges, conditions, line_numbers in [
+            (None, [], [1, 2, 3, 4]),
+            ("2-", [], [2, 3, 4]),
+            ("1,3-3", [], [1, 3]),
+            (None, ["model=ols"], [1, 3, 4]),
+            (None, ["model=ols", "nobs!=1000"], [3, 4]),
+            ("-3", ["model!=iv"], [1, 3]),
+        ]:
+            reader = JsonLinesReader(
+                self.filename,
+                None if line_ranges is None else parse_line_ranges(
+                    line_ranges,
+                ),
+                [parse_condition(condition) for condition in conditions],
+            )
+
+            self.assertEqual(line_numbers, reader.select_lines())
+
+    def test_same_values_as_make_json_dict(self):
+        keys = {"1::nobs", "2::coef::x::est", "4::nobs", "5::nobs"}
+
+        for streaming in (False, True):
+            reader = JsonLinesReader(self.filename, streaming=streaming)
+            reader.select_lines()
+
+            self.assertEqual(
+                m.make_json_dict_for_keys(self.lines, keys),
+                reader.make_json_dict(keys),
+            )
+
+    def test_invalid_line_is_reported_with_its_number(self):
+        with Path(self.filename).open("a") as file:
+            file.write('{"model": "ols"\n')
+
+        reader = JsonLinesReader(
+            self.filename, conditions=[parse_condition("model=ols")],
+        )
+
+        with self.assertRaisesRegex(ValueError, "Line 6 of"):
+            reader.select_lines()
+
+
+class TestLongFormat(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    @staticmethod
+    def write_long_results(
+        filename,
+        json_files,
+        columns=("model", "term", "statistic", "value"),
+    ):
+        """Write jsonwriter-shaped results in long format."""
+        delimiter = "\t" if filename.suffix == ".tsv" else ","
+
+        with filename.open("w", newline="") as csv_file:
+            writer = csv.writer(csv_file, delimiter=delimiter)
+            writer.writerow(columns)
+
+            for model, json_file in json_files.items():
+                for term, statistics in json_file.get("coef", {}).items():
+                    for statistic, value in statistics.items():
+                        writer.writerow([model, term, statistic, value])
+
+                for statistic, value in json_file.items():
+                    if not isinstance(value, (dict, list)):
+                        writer.writerow([model, "", statistic, value])
+
+    def test_same_values_as_json_files(self):
+        json_files = {
+            "ols": {
+                "coef": {"x": {"est": 1.5, "se": 0.25, "stars": "**"}},
+                "nobs": 1000,
+            },
+            "iv": {"coef": {"x": {"est": -2.5, "p": 1e-05}}, "nobs": 900},
+        }
+        filename = Path(self.directory.name) / "results.tsv"
+        columns = ("spec", "variable", "stat", "val")
+
+        self.write_long_results(filename, json_files, columns)
+
+        self.assertEqual(
+            list(json_files.items()),
+            load_long_results(str(filename), columns),
+        )
+        self.assertEqual(
+            [("iv", json_files["iv"]), ("ols", json_files["ols"])] * 2,
+            load_long_results(
+                str(filename), columns, ["iv", "ols", "iv", "ols"],
+            ),
+        )
+
+        with self.assertRaisesRegex(ValueError, "Column 'model'"):
+            load_long_results(str(filename))
+
+        with self.assertRaisesRegex(ValueError, "Model 'probit'"):
+            load_long_results(str(filename), columns, ["ols", "probit"])
+
+
+class TestJsonCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self.directory.name) / "cache"
+        self.json_filename = Path(self.directory.name) / "model.json"
+        self.json_filename.write_text(
+            json.dumps({"coef": {"x": {"est": 1.5}}, "nobs": 10}),
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_same_values_as_make_json_dict_for_keys(self):
+        json_files = [m.load_json_file(str(self.json_filename)), 42]
+        keys = {"1::coef::x::est", "1::nobs", "1::coef", "2", "3::nobs"}
+        self.json_filename.with_name("scalar.json").write_text("42")
+
+        cache = JsonCache(str(self.cache_dir))
+
+        for _ in range(2):
+            flattened_files = [
+                cache.load(str(self.json_filename)),
+                cache.load(str(self.json_filename.with_name("scalar.json"))),
+            ]
+
+            self.assertEqual(
+                m.make_json_dict_for_keys(json_files, keys),
+                m.make_json_dict_from_flattened(flattened_files, keys),
+            )
+
+    def test_warm_load_does_not_decode_json_file(self):
+        JsonCache(str(self.cache_dir)).load(str(self.json_filename))
+
+        # Make the file invalid without changing its size or its
+        # modification time.
+        #
+        stat = self.json_filename.stat()
+        self.json_filename.write_text("x" * stat.st_size)
+        os.utime(
+            self.json_filename, ns=(stat.st_atime_ns, stat.st_mtime_ns),
+        )
+
+        self.assertEqual(
+            10,
+            JsonCache(str(self.cache_dir))
+            .load(str(self.json_filename))["nobs"],
+        )
+
+    def test_changed_file_is_decoded_again(self):
+        cache = JsonCache(str(self.cache_dir))
+        cache.load(str(self.json_filename))
+
+        self.json_filename.write_text(json.dumps({"nobs": 20, "x": 1}))
+
+        self.assertEqual(
+            {"nobs": 20, "x": 1},
+            JsonCache(str(self.cache_dir)).load(str(self.json_filename)),
+        )
+
+    def test_eviction_keeps_cache_within_size_limit(self):
+        cache = JsonCache(str(self.cache_dir), max_size=0)
+        cache.load(str(self.json_filename))
+        cache.evict()
+
+        self.assertEqual([], list(cache.directory.iterdir()))
+
+
+class TestTemplateCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self.directory.name) / "cache"
+        self.example_dir = Path(__file__).parent.parent / "example"
+        self.text = (self.example_dir / "example_mag.toml").read_text()
+        self.json_filenames = [
+            "example_model_1.json",
+            "example_model_2.json",
+            "example_model_3.json",
+        ]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def get_template(self, title=None, version="1.0"):
+        with patch(
+            "tomltable.cache.get_code_version", return_value=version,
+        ):
+            return TemplateCache(str(self.cache_dir)).get_template(
+                self.text, self.json_filenames, title, None, "tex",
+            )
+
+    def test_same_template_as_make_template(self):
+        template = m.make_template(
+            parse_toml(load_toml(self.text)),
+            self.json_filenames,
+            "Depth",
+            None,
+            "tex",
+        )
+
+        for _ in range(2):
+            self.assertEqual(template, self.get_template("Depth"))
+
+    def test_warm_lookup_does_not_parse_specification(self):
+        self.get_template()
+
+        with (
+            patch("tomltable.parser.load_toml") as load,
+            patch("tomltable.parser.parse_toml") as parse,
+        ):
+            self.get_template()
+
+        load.assert_not_called()
+        parse.assert_not_called()
+
+        with patch("tomltable.parser.load_toml") as load:
+            self.get_template("Depth")
+
+        load.assert_not_called()
+
+    def test_entries_are_plain_data(self):
+        self.get_template()
+
+        for path in self.cache_dir.rglob("*"):
+            if path.is_file():
+                self.assertIsInstance(
+                    marshal.loads(path.read_bytes()), (str, dict),
+                )
+
+    def test_entries_of_other_versions_are_not_used(self):
+        self.get_template()
+
+        with patch(
+            "tomltable.parser.parse_toml", wraps=parse_toml,
+        ) as parse:
+            self.get_template(version="2.0")
+
+        parse.assert_called_once()
+
+
+class TestRenderer(unittest.TestCase):
+    def setUp(self):
+        self.example_dir = Path(__file__).parent.parent / "example"
+        self.renderer = Renderer(
+            (self.example_dir / "example_mag.toml").read_text(),
+            title="Earthquake depth and magnitude",
+            label="tab:quakes",
+        )
+        self.json_filenames = [
+            self.example_dir / "example_model_1.json",
+            self.example_dir / "example_model_2.json",
+            self.example_dir / "example_model_3.json",
+        ]
+
+    def test_same_table_as_main(self):
+        result = self.renderer.render(
+            self.json_filenames, human_readable_numbers=True,
+        )
+
+        self.assertEqual(
+            (self.example_dir / "example_mag.tex").read_text(),
+            result.table + "\n",
+        )
+        self.assertEqual([], result.warnings)
+
+    def test_warnings_are_returned_instead_of_printed(self):
+        renderer = Renderer(template="%(1::nobs)d, %(1::name)d")
+        stderr = io.StringIO()
+
+        with contextlib.redirect_stderr(stderr):
+            result = renderer.render(
+                [{"name": "Alice"}], ignore_missing_keys=True,
+            )
+
+        self.assertEqual("", stderr.getvalue())
+        self.assertEqual(", ", result.table)
+        self.assertEqual(
+            ["1::nobs", "1::name"],
+            [warning.key for warning in result.warnings],
+        )
+        self.assertIsInstance(result.warnings[0], RenderWarning)
+
+    def test_column_count_must_match_specification(self):
+        with self.assertRaises(TableJsonMismatchError):
+            self.renderer.render(self.json_filenames[:2])
+
+    def test_renderer_can_be_shared_by_threads(self):
+        json_files = [
+            m.load_json_file(str(filename))
+            for filename in self.json_filenames
+        ]
+        expected = Renderer(
+            self.renderer.table_spec,
+            title=self.renderer.title,
+            label=self.renderer.label,
+        ).render(json_files).table
+
+        # NOTE The template is generated by the threads on first use.
+        #
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            tables = list(executor.map(
+                lambda _: self.renderer.render(json_files).table,
+                range(64),
+            ))
+
+        self.assertEqual([expected] * 64, tables)
+
+    def test_values_are_escaped_for_the_output_format(self):
+        renderer = Renderer(
+            template="<td>%(1::name)s</td>", table_format="html",
+        )
+
+        self.assertEqual(
+            "<td>&lt;i&gt;A&amp;B&lt;/i&gt;</td>",
+            renderer.render([{"name": "<i>A&B</i>"}]).table,
+        )
+
+
+class TestRenderAsync(unittest.TestCase):
+    def setUp(self):
+        self.renderer = Renderer(template="%(1::nobs)d, %(2::nobs)d")
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.loaded = []
+        self.backends = []
+
+    def slow_load_json_file(self, filename, backend="auto"):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.loaded.append(filename)
+            self.backends.append(backend)
+
+        time.sleep(0.05)
+
+        with self.lock:
+            self.active -= 1
+
+        return {"nobs": len(Path(filename).name)}
+
+    def render_batch(self, tables, loader):
+        async def main():
+            return sorted([
+                (index, result.table)
+                async for index, result in render_batch_async(
+                    tables, loader=loader,
+                )
+            ])
+
+        with patch(
+            "tomltable.renderer.load_json_file", self.slow_load_json_file,
+        ):
+            return asyncio.run(main())
+
+    def test_same_table_as_render(self):
+        data_sources = [{"nobs": 10}, {"nobs": 1000}]
+
+        self.assertEqual(
+            self.renderer.render(
+                data_sources, human_readable_numbers=True,
+            ),
+            asyncio.run(
+                self.renderer.render_async(
+                    data_sources, human_readable_numbers=True,
+                ),
+            ),
+        )
+
+    def test_render_async_function(self):
+        data_sources = [{"nobs": 10}, {"nobs": 1000}]
+
+        self.assertEqual(
+            self.renderer.render(data_sources),
+            asyncio.run(render_async(self.renderer, data_sources)),
+        )
+
+    def test_default_loader_uses_the_json_backend_of_the_renderer(self):
+        renderers = [
+            Renderer(template="%(1::nobs)d", json_backend=backend)
+            for backend in ("json", "auto")
+        ]
+        tables = [
+            (renderer, [name])
+            for renderer, name in zip(renderers, ["a", "bb"])
+        ]
+
+        self.assertEqual([(0, "1"), (1, "2")], self.render_batch(tables, None))
+        self.assertEqual(
+            {"a": "json", "bb": "auto"},
+            {
+                Path(filename).name: backend
+                for filename, backend in zip(self.loaded, self.backends)
+            },
+        )
+
+    def test_shared_files_are_loaded_once(self):
+        tables = [(self.renderer, ["a", "bb"]) for _ in range(5)]
+
+        self.assertEqual(
+            [(index, "1, 2") for index in range(5)],
+            self.render_batch(tables, AsyncJsonLoader()),
+        )
+        self.assertEqual(2, len(self.loaded))
+
+    def test_concurrency_is_bounded(self):
+        tables = [
+            (self.renderer, [f"{index}a", f"{index}b"])
+            for index in range(4)
+        ]
+
+        self.render_batch(tables, AsyncJsonLoader(max_concurrency=3))
+
+        self.assertEqual(8, len(self.loaded))
+        self.assertEqual(3, self.max_active)
+
+    def test_cancelled_render_does_not_cancel_shared_load(self):
+        async def main():
+            loader = AsyncJsonLoader()
+            first = asyncio.ensure_future(
+                self.renderer.render_async(["a", "bb"], loader=loader),
+            )
+            second = asyncio.ensure_future(
+                self.renderer.render_async(["a", "bb"], loader=loader),
+            )
+
+            await asyncio.sleep(0.01)
+            first.cancel()
+
+            with self.assertRaises(asyncio.CancelledError):
+                await first
+
+            return (await second).table
+
+        with patch(
+            "tomltable.renderer.load_json_file", self.slow_load_json_file,
+        ):
+            self.assertEqual("1, 2", asyncio.run(main()))
+
+        self.assertEqual(2, len(self.loaded))
+
+
+class TestMapDistinctFiles(unittest.TestCase):
+    def test_each_file_is_processed_once_in_order(self):
+        with tempfile.TemporaryDirectory() as directory:
+            first = Path(directory) / "first.json"
+            second = Path(directory) / "second.json"
+            link = Path(directory) / "link.json"
+            first.write_text("1")
+            second.write_text("2")
+            link.symlink_to(first)
+
+            filenames = [str(path) for path in (first, second, link, first)]
+
+            for max_workers in (1, 4):
+                calls = []
+
+                def read(filename, calls=calls):
+                    calls.append(filename)
+                    return [Path(filename).read_text()]
+
+                results = map_distinct_files(read, filenames, max_workers)
+
+                self.assertEqual(
+                    [["1"], ["2"], ["1"], ["1"]], results,
+                )
+                self.assertEqual(sorted(filenames[:2]), sorted(calls))
+                self.assertIs(results[0], results[2])
+
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.spec_filename = Path(self.directory.name) / "spec.toml"
+        self.spec_filename.write_text(
+            '[[footer.cell]]\nlabel = "$N$"\ncell = "%(n::nobs)d"\n',
+        )
+        self.json_filename = Path(self.directory.name) / "model.json"
+        self.json_filename.write_text('{"nobs": 1000}')
+        self.output = Path(self.directory.name) / "table.tex"
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_only_changed_inputs_are_reloaded(self):
+        table = WatchedTable(
+            str(self.spec_filename),
+            [str(self.json_filename)],
+            str(self.output),
+            {
+                "title": None,
+                "label": None,
+                "ignore_missing_keys": False,
+                "from_template": False,
+                "only_template": False,
+                "compile_template": False,
+                "human_readable_numbers": True,
+                "thousands_separator": ",",
+                "table_format": "tex",
+            },
+        )
+
+        self.assertTrue(table.update())
+        self.assertIn("$N$ & 1,000 \\\\", self.output.read_text())
+
+        self.json_filename.write_text('{"nobs": 2000}')
+
+        with patch("tomltable.watch.parse_toml", side_effect=ValueError):
+            self.assertTrue(
+                table.update({str(self.json_filename.resolve())}),
+            )
+
+        self.assertIn("$N$ & 2,000 \\\\", self.output.read_text())
+
+    def test_monitors_detect_changes(self):
+        monitors = [PollingMonitor([str(self.json_filename)], 0.001)]
+
+        with contextlib.suppress(OSError, AttributeError, TypeError):
+            monitors.append(InotifyMonitor([str(self.json_filename)]))
+
+        self.json_filename.write_text('{"nobs": 20000}')
+
+        for monitor in monitors:
+            self.assertEqual(
+                {str(self.json_filename.resolve())}, monitor.wait(),
+            )
+
+
+class TestServer(unittest.TestCase):
+    def setUp(self):
+        self.example_dir = Path(__file__).parent.parent / "example"
+        self.inputs = WarmInputs()
+
+    def render_remotely(self, args, stdin=b""):
+        client, server = socket.socketpair()
+        thread = threading.Thread(
+            target=handle_connection, args=(server, self.inputs),
+        )
+        thread.start()
+
+        stdout = io.BytesIO()
+        stderr = io.BytesIO()
+
+        with client, server:
+            exit_code = render_remotely(
+                client, args, io.BytesIO(stdin), stdout, stderr,
+            )
+            thread.join()
+
+        return exit_code, stdout.getvalue().decode(), stderr.getvalue()
+
+    def test_client_only_uses_private_sockets(self):
+        with tempfile.TemporaryDirectory() as directory:
+            socket_path = str(Path(directory) / "tomltable.sock")
+            other_path = Path(directory) / "other.sock"
+
+            self.assertFalse(is_private_socket(socket_path))
+
+            with bind_socket(socket_path):
+                self.assertTrue(is_private_socket(socket_path))
+
+                Path(socket_path).chmod(0o777)
+
+                self.assertFalse(is_private_socket(socket_path))
+
+            other_path.write_text("")
+            other_path.chmod(0o600)
+
+            self.assertFalse(is_private_socket(str(other_path)))
+
+    def test_result_is_identical_to_direct_call(self):
+        spec = (self.example_dir / "example_mag.toml").read_text()
+        args = [
+            "-j", str(self.example_dir / "example_model_1.json"),
+            "-j", str(self.example_dir / "example_model_2.json"),
+            "-j", str(self.example_dir / "example_model_3.json"),
+            "--title", "Earthquake depth and magnitude",
+            "--label", "tab:quakes",
+            "--human-readable-numbers",
+        ]
+
+        direct = CliRunner().invoke(m.main, args, input=spec)
+
+        for _ in range(2):
+            exit_code, stdout, _ = self.render_remotely(
+                args, spec.encode(),
+            )
+
+            self.assertEqual(0, exit_code)
+            self.assertEqual(direct.output, stdout)
+
+    def test_jsonl_from_stdin_is_identical_to_direct_call(self):
+        stdin = "".join(
+            (self.example_dir / filename).read_text().replace("\n", "")
+            + "\n"
+            for filename in [
+                "example_model_1.json",
+                "example_model_2.json",
+                "example_model_3.json",
+            ]
+        )
+        args = [
+            "--jsonl", "-",
+            "-s", str(self.example_dir / "example_mag.toml"),
+        ]
+
+        direct = CliRunner().invoke(m.main, args, input=stdin)
+        exit_code, stdout, _ = self.render_remotely(args, stdin.encode())
+
+        self.assertEqual(0, direct.exit_code)
+        self.assertEqual(0, exit_code)
+        self.assertEqual(direct.output, stdout)
+
+    def test_errors_are_reported_like_direct_call(self):
+        exit_code, stdout, stderr = self.render_remotely(["--bogus"])
+
+        self.assertEqual(2, exit_code)
+        self.assertEqual("", stdout)
+        self.assertIn(b"No such option '--bogus'", stderr)
+
+        exit_code, _, stderr = self.render_remotely(
+            ["-j", "x.json", "--from-template", "--title", "x"],
+        )
+
+        self.assertEqual(1, exit_code)
+        self.assertEqual(
+            b"ValueError: --from-template and --title cannot be used "
+            b"together.\n",
+            stderr,
+        )
+
+    def test_changed_json_files_are_reloaded(self):
+        with tempfile.TemporaryDirectory() as directory:
+            json_filename = Path(directory) / "model.json"
+            json_filename.write_text('{"nobs": 1000}')
+
+            self.assertEqual(
+                {"nobs": 1000},
+                self.inputs.load_json_file(str(json_filename)),
+            )
+
+            json_filename.write_text('{"nobs": 20000}')
+
+            self.assertEqual(
+                {"nobs": 20000},
+                self.inputs.load_json_file(str(json_filename)),
+            )
+
+
+class TestStartup(unittest.TestCase):
+    # The budget for the modules of tomltable that importing the
+    # command-line interface runs, in microseconds, as reported by
+    # `python -X importtime`.  It covers their own code only, not click
+    # or the standard library, which depend on the Python version, and
+    # leaves about three times the time that they take as headroom.
+    #
+    IMPORT_TIME_BUDGET = 30_000
+
+    def import_cli(self):
+        return subprocess.run(
+            [
+                sys.executable,
+                "-X", "importtime",
+                "-c", "import sys, tomltable.cli; print(*sys.modules)",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+    def test_cli_does_not_import_modules_for_other_code_paths(self):
+        modules = set(self.import_cli().stdout.split())
+
+        for module in [
+            "regex",
+            "toml",
+            "tomllib",
+            "tomltable.cache",
+            "tomltable.compiled",
+            "tomltable.incremental",
+            "tomltable.jsondecode",
+            "tomltable.jsonlines",
+            "tomltable.jsonstream",
+            "tomltable.parser",
+            "tomltable.template",
+            "tomltable.watch",
+            "tracemalloc",
+        ]:
+            self.assertNotIn(module, modules)
+
+    def test_cli_import_time_is_within_budget(self):
+        import_times = []
+
+        # NOTE The fastest of several runs is the least affected by other
+        # processes.
+        #
+        for _ in range(3):
+            import_time = 0
+
+            # NOTE The self time of a module excludes the modules that
+            # it imports, so each module is counted once.
+            #
+            for line in self.import_cli().stderr.splitlines():
+                self_time, _, name = line.split("|")
+                name = name.strip()
+
+                if name == "tomltable" or name.startswith("tomltable."):
+                    import_time += int(self_time.rpartition(":")[2])
+
+            import_times.append(import_time)
+
+        self.assertLess(min(import_times), self.IMPORT_TIME_BUDGET)
+
+
+class TestMain(unittest.TestCase):
+    def setUp(self):
+        self.example_dir = Path(__file__).parent.parent / "example"
+
+    def run_main(self, spec_filename, json_filenames, *args):
+        arguments = []
+
+        for filename in json_filenames:
+            arguments.extend(["-j", str(self.example_dir / filename)])
+
+        return CliRunner().invoke(
+            m.main,
+            [*arguments, *args],
+            input=(self.example_dir / spec_filename).read_text(),
+        )
+
+    def test_example_mag(self):
+        result = self.run_main(
+            "example_mag.toml",
+            [
+                "example_model_1.json",
+                "example_model_2.json",
+                "example_model_3.json",
+            ],
+            "--title", "Earthquake depth and magnitude",
+            "--label", "tab:quakes",
+            "--human-readable-numbers",
+        )
+
+        self.assertEqual(0, result.exit_code)
+        self.assertEqual(
+            (self.example_dir / "example_mag.tex").read_text(),
+            result.output + "\n",
+        )
+
+    def test_cache_dir_gives_the_same_table(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for _ in range(2):
+                result = self.run_main(
+                    "example_mag.toml",
+                    [
+                        "example_model_1.json",
+                        "example_model_2.json",
+                        "example_model_3.json",
+                    ],
+                    "--title", "Earthquake depth and magnitude",
+                    "--label", "tab:quakes",
+                    "--human-readable-numbers",
+                    "--cache-dir", directory,
+                )
+
+                self.assertEqual(0, result.exit_code)
+                self.assertEqual(
+                    (self.example_dir / "example_mag.tex").read_text(),
+                    result.output + "\n",
+                )
+
+    def test_cache_dir_from_environment_is_ignored_where_unusable(self):
+        json_filenames = [
+            "example_model_1.json",
+            "example_model_2.json",
+            "example_model_3.json",
+        ]
+        arguments = []
+
+        for filename in json_filenames:
+            arguments.extend(["-j", str(self.example_dir / filename)])
+
+        with tempfile.TemporaryDirectory() as directory:
+            for args in (("--streaming-json",), ("--streaming-output",)):
+                results = [
+                    CliRunner(env=env).invoke(
+                        m.main,
+                        [*arguments, *args, *cache_args],
+                        input=(self.example_dir / "example_mag.toml")
+                        .read_text(),
+                    )
+                    for env, cache_args in (
+                        ({"TOMLTABLE_CACHE": directory}, ()),
+                        ({}, ("--cache-dir", directory)),
+                    )
+                ]
+
+                self.assertEqual(0, results[0].exit_code)
+                self.assertIn("Observations & 1000 &", results[0].output)
+                self.assertIsInstance(results[1].exception, ValueError)
+
+    def test_output_is_only_written_if_it_changes(self):
+        json_filenames = [
+            "example_model_1.json",
+            "example_model_2.json",
+            "example_model_3.json",
+        ]
+
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / "example_mag.tex"
+
+            result = self.run_main(
+                "example_mag.toml",
+                json_filenames,
+                "--human-readable-numbers",
+                "--output", str(output),
+            )
+
+            self.assertEqual(0, result.exit_code)
+            self.assertEqual("", result.output)
+
+            os.utime(output, ns=(0, 0))
+
+            # Different options but the same result.
+            #
+            for _ in range(2):
+                result = self.run_main(
+                    "example_mag.toml",
+                    json_filenames,
+                    "--human-readable-numbers",
+                    "--ignore-missing-keys",
+                    "--output", str(output),
+                )
+
+                self.assertEqual(0, result.exit_code)
+                self.assertEqual(0, output.stat().st_mtime_ns)
+
+            # Different result.
+            #
+            result = self.run_main(
+                "example_mag.toml",
+                json_filenames,
+                "--output", str(output),
+            )
+
+            self.assertEqual(0, result.exit_code)
+            self.assertNotEqual(0, output.stat().st_mtime_ns)
+            self.assertIn("Observations & 1000 &", output.read_text())
+
+    def test_up_to_date_output_is_not_regenerated(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / "example_mag.tex"
+            arguments = [
+                "example_mag.toml",
+                [
+                    "example_model_1.json",
+                    "example_model_2.json",
+                    "example_model_3.json",
+                ],
+                "--output", str(output),
+            ]
+
+            self.assertEqual(0, self.run_main(*arguments).exit_code)
+
+            # Make template generation fail so that only runs that skip
+            # it succeed.
+            #
+            with patch(
+                "tomltable.template.make_template",
+                side_effect=ValueError,
+            ):
+                self.assertEqual(0, self.run_main(*arguments).exit_code)
+
+                output.write_text("")
+
+                self.assertNotEqual(0, self.run_main(*arguments).exit_code)
+
+    def test_output_is_regenerated_when_the_code_changes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / "example_mag.tex"
+            arguments = [
+                "example_mag.toml",
+                [
+                    "example_model_1.json",
+                    "example_model_2.json",
+                    "example_model_3.json",
+                ],
+                "--output", str(output),
+            ]
+
+            self.assertEqual(0, self.run_main(*arguments).exit_code)
+
+            with (
+                patch(
+                    "tomltable.incremental.get_code_version",
+                    return_value="other",
+                ),
+                patch(
+                    "tomltable.template.make_template",
+                    side_effect=ValueError,
+                ),
+            ):
+                self.assertNotEqual(0, self.run_main(*arguments).exit_code)
+
+    def test_example_mag_from_compiled_template(self):
+        json_filenames = [
+            "example_model_1.json",
+            "example_model_2.json",
+            "example_model_3.json",
+        ]
+
+        compiled = self.run_main(
+            "example_mag.toml",
+            json_filenames,
+            "--title", "Earthquake depth and magnitude",
+            "--label", "tab:quakes",
+            "--compile-template",
+        )
+
+        self.assertEqual(0, compiled.exit_code)
+
+        arguments = []
+
+        for filename in json_filenames:
+            arguments.extend(["-j", str(self.example_dir / filename)])
+
+        result = CliRunner().invoke(
+            m.main,
+            [*arguments, "--from-template", "--human-readable-numbers"],
+            input=compiled.output,
+        )
+
+        self.assertEqual(0, result.exit_code)
+        self.assertEqual(
+            (self.example_dir / "example_mag.tex").read_text(),
+            result.output + "\n",
+        )
+
+    def test_profile_does_not_change_the_table(self):
+        json_filenames = [
+            "example_model_1.json",
+            "example_model_2.json",
+            "example_model_3.json",
+        ]
+
+        with tempfile.TemporaryDirectory() as directory:
+            profile_json = Path(directory) / "profile.json"
+
+            result = self.run_main(
+                "example_mag.toml",
+                json_filenames,
+                "--human-readable-numbers",
+                "--profile-json", str(profile_json),
+                "--profile-dump", str(Path(directory) / "profile.prof"),
+            )
+            profile = json.loads(profile_json.read_text())
+
+            self.assertTrue((Path(directory) / "profile.prof").exists())
+
+        self.assertEqual(0, result.exit_code)
+        self.assertEqual(
+            self.run_main(
+                "example_mag.toml",
+                json_filenames,
+                "--human-readable-numbers",
+            ).output,
+            result.output,
+        )
+        self.assertEqual(
+            [
+                "read input",
+                "parse TOML",
+                "generate template",
+                "compile template",
+                "load JSON",
+                "flatten JSON",
+                "fill template",
+                "write output",
+            ],
+            [stage["name"] for stage in profile["stages"]],
+        )
+        self.assertEqual(
+            {"placeholders": 15, "distinct_specifiers": 15, "json_keys": 15},
+            profile["counts"],
+        )
+        self.assertIn(
+            Path(profile["slowest_json_file"]["filename"]).name,
+            json_filenames,
+        )
+
+    def test_several_output_formats(self):
+        json_filenames = [
+            "example_model_1.json",
+            "example_model_2.json",
+            "example_model_3.json",
+        ]
+
+        with tempfile.TemporaryDirectory() as directory:
+            tex = Path(directory) / "example_mag.tex"
+            csv = Path(directory) / "example_mag.csv"
+
+            with patch(
+                "tomltable.cli.load_json_file", side_effect=m.load_json_file,
+            ) as load_json_file:
+                result = self.run_main(
+                    "example_mag.toml",
+                    json_filenames,
+                    "--human-readable-numbers",
+                    "--output", str(tex),
+                    "--output", f"csv:{csv}",
+                )
+
+            self.assertEqual(0, result.exit_code)
+            self.assertEqual(3, load_json_file.call_count)
+            self.assertEqual(
+                self.run_main(
+                    "example_mag.toml",
+                    json_filenames,
+                    "--human-readable-numbers",
+                ).output,
+                tex.read_text(),
+            )
+            self.assertIn(
+                '"Observations","1,000","524","476"', csv.read_text(),
+            )
+
+    def test_values_are_escaped_for_the_output_format(self):
+        value = 'US, "all" <b>&</b> | x'
+
+        with tempfile.TemporaryDirectory() as directory:
+            spec_filename = Path(directory) / "spec.toml"
+            spec_filename.write_text(
+                '[[body.row]]\nlabel = "Sample"\ncell = "%(1::sample)s"\n',
+            )
+            json_filename = Path(directory) / "model.json"
+            json_filename.write_text(json.dumps({"sample": value}))
+
+            def run(table_format, *args):
+                result = CliRunner().invoke(
+                    m.main,
+                    [
+                        "-s", str(spec_filename),
+                        "-j", str(json_filename),
+                        "--format", table_format,
+                        *args,
+                    ],
+                )
+
+                self.assertEqual(0, result.exit_code)
+
+                return result.output
+
+            for args in ((), ("--streaming-output",)):
+                rows = list(csv.reader(io.StringIO(run("csv", *args))))
+
+                self.assertEqual(["Sample", value], rows[-1])
+                self.assertIn(
+                    "| Sample | US, \"all\" <b>&</b> \\| x |",
+                    run("markdown", *args),
+                )
+                self.assertIn(
+                    "<td>US, &quot;all&quot; "
+                    "&lt;b&gt;&amp;&lt;/b&gt; | x</td>",
+                    run("html", *args),
+                )
+                self.assertIn(f"Sample & {value}", run("tex", *args))
+
+    def test_max_columns_splits_table_into_chunks(self):
+        json_filenames = [
+            "example_model_1.json",
+            "example_model_2.json",
+            "example_model_3.json",
+        ]
+
+        with tempfile.TemporaryDirectory() as directory, patch(
+            "tomltable.cli.load_json_file", wraps=m.load_json_file,
+        ) as load:
+            output = Path(directory) / "example_mag-{chunk}.tex"
+
+            result = self.run_main(
+                "example_mag.toml",
+                json_filenames,
+                "--max-columns", "2",
+                "--label", "tab:quakes",
+                "--output", str(output),
+            )
+
+            self.assertEqual(0, result.exit_code)
+            self.assertEqual(3, load.call_count)
+
+            first, second = (
+                Path(str(output).replace("{chunk}", str(number)))
+                .read_text()
+                for number in (1, 2)
+            )
+
+        self.assertIn(" & (1) & (2) \\\\", first)
+        self.assertIn(r"\label{tab:quakes}", first)
+        self.assertIn(" & (3) \\\\", second)
+        self.assertIn(r"\label{tab:quakes:2}", second)
+        self.assertIn("Observations & 476 \\\\", second)
+
+        result = self.run_main(
+            "example_mag.toml",
+            json_filenames,
+            "--max-columns", "2",
+            "--label", "tab:quakes",
+        )
+
+        self.assertEqual(first + "\n\n" + second, result.output)
+
+    def test_streaming_output_gives_the_same_table(self):
+        json_filenames = [
+            "example_model_1.json",
+            "example_model_2.json",
+            "example_model_3.json",
+        ]
+
+        for table_format in m.TABLE_FORMATS:
+            for args in ((), ("--max-columns", "2")):
+                results = [
+                    self.run_main(
+                        "example_mag.toml",
+                        json_filenames,
+                        "--title", "Earthquake depth and magnitude",
+                        "--label", "tab:quakes",
+                        "--human-readable-numbers",
+                        "--format", table_format,
+                        *args,
+                        *streaming_args,
+                    )
+                    for streaming_args in ((), ("--streaming-output",))
+                ]
+
+                self.assertEqual(
+                    [0, 0], [result.exit_code for result in results],
+                )
+                self.assertEqual(results[0].output, results[1].output)
+
+    def test_streaming_output_is_only_written_if_it_changes(self):
+        json_filenames = [
+            "example_model_1.json",
+            "example_model_2.json",
+            "example_model_3.json",
+        ]
+        args = ("--streaming-output",)
+
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / "example_mag.tex"
+            fingerprint = Path(directory) / ".example_mag.tex.tomltable"
+
+            result = self.run_main(
+                "example_mag.toml",
+                json_filenames,
+                *args,
+                "--output", str(output),
+            )
+
+            self.assertEqual(0, result.exit_code)
+
+            mtime_ns = output.stat().st_mtime_ns
+
+            # NOTE Without the fingerprint, the table is generated again,
+            # but it is the same, so the output is left alone.
+            #
+            fingerprint.unlink()
+
+            result = self.run_main(
+                "example_mag.toml",
+                json_filenames,
+                *args,
+                "--output", str(output),
+            )
+
+            self.assertEqual(0, result.exit_code)
+            self.assertEqual(mtime_ns, output.stat().st_mtime_ns)
+            self.assertEqual(
+                sorted([output.name, fingerprint.name]),
+                sorted(path.name for path in Path(directory).iterdir()),
+            )
+            self.assertEqual(
+                self.run_main(
+                    "example_mag.toml", json_filenames, *args,
+                ).output,
+                output.read_text(),
+            )
+
+    def test_every_chunk_is_kept_up_to_date(self):
+        json_filenames = [
+            "example_model_1.json",
+            "example_model_2.json",
+            "example_model_3.json",
+        ]
+
+        with tempfile.TemporaryDirectory() as directory:
+            output = str(Path(directory) / "example_mag-{chunk}.tex")
+            chunks = [
+                Path(output.replace("{chunk}", str(number)))
+                for number in (1, 2, 3)
+            ]
+
+            def run_main(max_columns):
+                result = self.run_main(
+                    "example_mag.toml",
+                    json_filenames,
+                    "--max-columns", max_columns,
+                    "--output", output,
+                )
+
+                self.assertEqual(0, result.exit_code)
+
+            run_main("1")
+            expected = chunks[2].read_text()
+            chunks[2].unlink()
+            run_main("1")
+
+            self.assertEqual(expected, chunks[2].read_text())
+
+            # NOTE With fewer chunks, the chunk files after the last one
+            # are removed along with their fingerprints.
+            #
+            run_main("2")
+
+            self.assertTrue(chunks[1].exists())
+            self.assertFalse(chunks[2].exists())
+            self.assertEqual(
+                4, len(list(Path(directory).iterdir())),
+            )
+
+    def test_load_jobs_gives_the_same_table(self):
+        json_filenames = [
+            "example_model_1.json",
+            "example_model_2.json",
+            "example_model_1.json",
+        ]
+        results = [
+            self.run_main("example_mag.toml", json_filenames, *args)
+            for args in ((), ("--load-jobs", "4"), ("--load-jobs", "0"))
+        ]
+
+        self.assertEqual([0, 0, 0], [result.exit_code for result in results])
+        self.assertEqual(results[0].output, results[1].output)
+        self.assertEqual(results[0].output, results[2].output)
+
+    def test_jsonl_gives_the_same_table_as_json_files(self):
+        json_filenames = [
+            "example_model_1.json",
+            "example_model_2.json",
+            "example_model_3.json",
+        ]
+
+        with tempfile.TemporaryDirectory() as directory:
+            jsonl = Path(directory) / "models.jsonl"
+
+            with jsonl.open("w") as file:
+                for index, filename in enumerate(json_filenames):
+                    json_file = m.load_json_file(
+                        str(self.example_dir / filename),
+                    )
+                    json_file["sample"] = "all"
+                    file.write(json.dumps(json_file) + "\n")
+
+                    if index == 0:
+                        file.write('{"sample": "test"}\n')
+
+            result = self.run_main(
+                "example_mag.toml",
+                [],
+                "--jsonl", str(jsonl),
+                "--jsonl-where", "sample=all",
+                "--human-readable-numbers",
+            )
+
+        self.assertEqual(0, result.exit_code)
+        self.assertEqual(
+            self.run_main(
+                "example_mag.toml",
+                json_filenames,
+                "--human-readable-numbers",
+            ).output,
+            result.output,
+        )
+
+    def test_csv_gives_the_same_table_as_json_files(self):
+        json_filenames = [
+            "example_model_1.json",
+            "example_model_2.json",
+            "example_model_3.json",
+        ]
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = Path(directory) / "results.csv"
+
+            TestLongFormat.write_long_results(
+                filename,
+                {
+                    f"model{index}": m.load_json_file(
+                        str(self.example_dir / json_filename),
+                    )
+                    for index, json_filename in enumerate(json_filenames)
+                },
+            )
+
+            result = self.run_main(
+                "example_mag.toml",
+                [],
+                "--csv", str(filename),
+                "--human-readable-numbers",
+            )
+
+        self.assertEqual(0, result.exit_code)
+        self.assertEqual(
+            self.run_main(
+                "example_mag.toml",
+                json_filenames,
+                "--human-readable-numbers",
+            ).output,
+            result.output,
+        )
+
+    def test_repeated_csv_model_is_repeated_column(self):
+        json_filenames = ["example_model_1.json", "example_model_2.json"]
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = Path(directory) / "results.csv"
+
+            TestLongFormat.write_long_results(
+                filename,
+                {
+                    f"model{index}": m.load_json_file(
+                        str(self.example_dir / json_filename),
+                    )
+                    for index, json_filename in enumerate(json_filenames)
+                },
+            )
+
+            result = self.run_main(
+                "example_mag.toml",
+                [],
+                "--csv", str(filename),
+                "--csv-model", "model0",
+                "--csv-model", "model1",
+                "--csv-model", "model0",
+            )
+
+        self.assertEqual(0, result.exit_code)
+        self.assertEqual(
+            self.run_main(
+                "example_mag.toml",
+                [*json_filenames, json_filenames[0]],
+            ).output,
+            result.output,
+        )
+
+    def test_thousands_separator_choice(self):
+        result = self.run_main(
+            "example_mag.toml",
+            [
+                "example_model_1.json",
+                "example_model_2.json",
+                "example_model_3.json",
+            ],
+            "--thousands-separator", "thin-space",
+        )
+
+        self.assertEqual(0, result.exit_code)
+        self.assertIn(
+            "Observations & 1\\,000 & 524 & 476 \\\\", result.output,
+        )
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.example_dir = Path(__file__).parent.parent / "example"
+        self.directory = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_jobs(self, extra=""):
+        jobs_filename = self.output_dir / "jobs.toml"
+        jobs_filename.write_text(
+            f"""
+[[table]]
+spec = "{self.example_dir / 'example_mag.toml'}"
+json = [
+    "{self.example_dir / 'example_model_1.json'}",
+    "{self.example_dir / 'example_model_2.json'}",
+    "{self.example_dir / 'example_model_3.json'}",
+]
+title = "Earthquake depth and magnitude"
+label = "tab:quakes"
+human-readable-numbers = true
+output = "mag.tex"
+
+[[table]]
+spec = "{self.example_dir / 'example_mag_squared.toml'}"
+json = [
+    "{self.example_dir / 'example_model_1.json'}",
+    "{self.example_dir / 'example_model_4.json'}",
+]
+ignore-missing-keys = true
+output = "mag_squared.tex"
+""" + extra,
+        )
+
+        return jobs_filename
+
+    def test_example_tables(self):
+        jobs_filename = self.write_jobs()
+
+        result = CliRunner().invoke(
+            tomltable.batch.main, [str(jobs_filename)],
+        )
+
+        self.assertEqual(0, result.exit_code)
+        self.assertEqual(
+            (self.example_dir / "example_mag.tex").read_text(),
+            (self.output_dir / "mag.tex").read_text() + "\n",
+        )
+        self.assertIn(
+            "Magnitude squared & $$ & $80.605$***",
+            (self.output_dir / "mag_squared.tex").read_text(),
+        )
+
+    def test_csv_results_are_loaded_once(self):
+        filename = self.output_dir / "results.csv"
+
+        TestLongFormat.write_long_results(
+            filename,
+            {
+                f"model{index}": m.load_json_file(
+                    str(self.example_dir / f"example_model_{index}.json"),
+                )
+                for index in (1, 2, 3, 4)
+            },
+        )
+
+        jobs_filename = self.output_dir / "jobs.toml"
+        jobs_filename.write_text(
+            f"""
+[[table]]
+spec = "{self.example_dir / 'example_mag.toml'}"
+csv = "results.csv"
+models = ["model1", "model2", "model3"]
+title = "Earthquake depth and magnitude"
+label = "tab:quakes"
+human-readable-numbers = true
+output = "mag.tex"
+
+[[table]]
+spec = "{self.example_dir / 'example_mag_squared.toml'}"
+csv = "results.csv"
+models = ["model1", "model4"]
+ignore-missing-keys = true
+output = "mag_squared.tex"
+""",
+        )
+
+        with patch(
+            "tomltable.longformat.load_long_results",
+            side_effect=load_long_results,
+        ) as load:
+            result = CliRunner().invoke(
+                tomltable.batch.main, [str(jobs_filename)],
+            )
+
+        self.assertEqual(0, result.exit_code)
+        self.assertEqual(1, load.call_count)
+        self.assertEqual(
+            (self.example_dir / "example_mag.tex").read_text(),
+            (self.output_dir / "mag.tex").read_text() + "\n",
+        )
+        self.assertIn(
+            "Magnitude squared & $$ & $80.605$***",
+            (self.output_dir / "mag_squared.tex").read_text(),
+        )
+
+    def test_parallel_output_is_identical_to_serial_output(self):
+        jobs_filename = self.write_jobs(
+            f"""
+[[table]]
+spec = "{self.example_dir / 'example_mag_squared.toml'}"
+json = [
+    "{self.example_dir / 'example_model_1.json'}",
+    "{self.example_dir / 'example_model_4.json'}",
+]
+output = "failing.tex"
+""",
+        )
+        outputs = {}
+
+        for jobs in ("1", "2"):
+            result = CliRunner().invoke(
+                tomltable.batch.main, [str(jobs_filename), "--jobs", jobs],
+            )
+
+            outputs[jobs] = (
+                result.exit_code,
+                result.stderr,
+                (self.output_dir / "mag.tex").read_text(),
+                (self.output_dir / "mag_squared.tex").read_text(),
+            )
+
+            (self.output_dir / "mag.tex").unlink()
+            (self.output_dir / "mag_squared.tex").unlink()
+
+        self.assertEqual(outputs["1"], outputs["2"])
+
+        # The failing job doesn't prevent the other jobs from being
+        # rendered but it is reported.
+        #
+        self.assertEqual(1, outputs["1"][0])
+        self.assertIn("failing.tex", outputs["1"][1])
+        self.assertFalse((self.output_dir / "failing.tex").exists())
+
+    @unittest.skipUnless(
+        "fork" in multiprocessing.get_all_start_methods(),
+        "processes cannot be forked",
+    )
+    def test_forked_workers_inherit_the_loaded_json_files(self):
+        jobs_filename = self.write_jobs()
+
+        # NOTE The workers get the files from the parent process, so
+        # the files are neither stored for nor unpickled by them.
+        #
+        with patch(
+            "tomltable.parallel.write_shared_json_files",
+            side_effect=AssertionError,
+        ):
+            result = CliRunner().invoke(
+                tomltable.batch.main, [str(jobs_filename), "--jobs", "2"],
+            )
+
+        self.assertEqual(0, result.exit_code)
+        self.assertEqual(
+            (self.example_dir / "example_mag.tex").read_text(),
+            (self.output_dir / "mag.tex").read_text() + "\n",
+        )
+
+    def test_missing_files_only_fail_the_jobs_that_use_them(self):
+        filename = self.output_dir / "results.csv"
+
+        TestLongFormat.write_long_results(
+            filename,
+            {"model1": m.load_json_file(
+                str(self.example_dir / "example_model_1.json"),
+            )},
+        )
+
+        jobs_filename = self.write_jobs(
+            f"""
+[[table]]
+spec = "{self.example_dir / 'example_mag.toml'}"
+json = ["missing.json", "missing.json", "missing.json"]
+output = "missing_json.tex"
+
+[[table]]
+spec = "{self.example_dir / 'example_mag.toml'}"
+csv = "results.csv"
+models = ["model1", "model2", "model3"]
+output = "missing_model.tex"
+""",
+        )
+
+        for jobs in ("1", "2"):
+            result = CliRunner().invoke(
+                tomltable.batch.main, [str(jobs_filename), "--jobs", jobs],
+            )
+
+            self.assertEqual(1, result.exit_code)
+            self.assertIn("missing_json.tex: FileNotFoundError", result.stderr)
+            self.assertIn(
+                "missing_model.tex: ValueError: Model 'model2'", result.stderr,
+            )
+            self.assertIn("2 of 4 tables failed", result.stderr)
+            self.assertTrue((self.output_dir / "mag.tex").exists())
+            self.assertTrue((self.output_dir / "mag_squared.tex").exists())
+
+    def test_invalid_job_specifications(self):
+        for obj in (
+            {"json": "a.json", "output": "a.tex"},
+            {"spec": "a.toml", "template": "a.tmpl",
+             "json": "a.json", "output": "a.tex"},
+            {"template": "a.tmpl", "title": "A",
+             "json": "a.json", "output": "a.tex"},
+            {"spec": "a.toml", "json": [], "output": "a.tex"},
+            {"spec": "a.toml", "json": "a.json"},
+            {"spec": "a.toml", "json": "a.json", "output": "a.tex",
+             "foo": "bar"},
+            {"spec": "a.toml", "json": "a.json", "output": "a.tex",
+             "thousands-separator": "period"},
+            {"spec": "a.toml", "json": "a.json", "csv": "a.csv",
+             "output": "a.tex"},
+            {"spec": "a.toml", "json": "a.json", "models": ["ols"],
+             "output": "a.tex"},
+            {"spec": "a.toml", "csv": "a.csv", "csv-columns": ["a"],
+             "output": "a.tex"},
+        ):
+            with self.assertRaises(m.errors.BatchSpecificationError):
+                tomltable.batch.parse_toml_table_job(
+                    obj, "table.1", self.output_dir,
+                )